@@ -0,0 +1,101 @@
+"""
+HTTP Caching Helpers
+Strong content-hash ETags and conditional GET handling for downloads
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import Dict, Mapping, Optional
+
+from fastapi.responses import Response
+
+# Artifacts whose URL always names the same bytes (content-addressed
+# certificates, finished job archives) can be cached for good
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Anything that may be rewritten under the same URL is revalidated
+CACHE_REVALIDATE = "no-cache"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=65536)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """sha256 of a file; keyed by its stat so a rewritten file is hashed again"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_etag(path: str) -> str:
+    """Strong ETag of a file's content (hashed once per file version)"""
+    stat = os.stat(path)
+    return f'"{_file_digest(path, stat.st_mtime_ns, stat.st_size)}"'
+
+
+def bytes_etag(data: bytes) -> str:
+    """Strong ETag of an in-memory payload"""
+    return f'"{hashlib.sha256(data).hexdigest()}"'
+
+
+def file_last_modified(path: str) -> datetime:
+    return datetime.fromtimestamp(os.stat(path).st_mtime, tz=timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    """Format a timestamp for Last-Modified (naive values are taken as local time)"""
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request_headers: Mapping[str, str], etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Whether a conditional GET can be answered with 304 Not Modified
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the request carries no entity tags.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+
+
+def cache_headers(etag: str, cache_control: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """Validator and caching headers shared by full and 304 responses"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
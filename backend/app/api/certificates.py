@@ -1,19 +1,69 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Path, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from PIL import Image
 from ..models.certificates import (
     CertificateCreate, 
     CertificateResponse, 
     Certificate,
+    BulkCertificateItem,
+    BulkCertificateBatch,
     BulkCertificateRequest,
-    BulkCertificateResponse
+    BulkCertificateResponse,
+    BulkJobResponse,
+    BulkJobStatusResponse,
+    BulkResultsPage,
+    CertificateListItem,
+    CertificateListResponse,
+    OutputFormatName
 )
-from ..services.generator import generate_certificate
+from ..services.generator import generate_certificate_bytes, certificate_fingerprint
+from ..services.encoders import decode_pdf_image, media_type_for
+from ..services.layouts import CompiledLayout, layout_registry
+from ..services.renditions import get_rendition, rendition_media_type, snap_width
+from ..services.dispatcher import DispatcherSaturated, render_dispatcher
+from ..services.metrics import (
+    CERTIFICATE_FAILURES,
+    CERTIFICATES_DEDUPLICATED,
+    CERTIFICATES_RENDERED,
+    RENDER_SECONDS,
+    RENDERS_REJECTED,
+    span
+)
+from ..services.storage import storage
+from ..services.repository import repository, record_bulk_certificates, encode_cursor, decode_cursor
 from ..services.bulk_generator import (
-    process_csv_content, 
-    generate_bulk_certificates, 
-    create_certificates_zip
+    BULK_OUTPUT_DIR,
+    ParticipantBatch,
+    iter_csv_participants,
+    iter_csv_file_participants,
+    render_bulk_batch,
+    batch_archive_filename,
+    create_batch_archive,
+    load_batch,
+    render_cache_id,
+    iter_certificates_zip,
+    STATUS_SUCCEEDED,
+    STATUS_FAILED
+)
+from ..services.jobs import JOB_COMPLETED, job_store, submit_bulk_job
+from .caching import (
+    CACHE_IMMUTABLE,
+    CACHE_REVALIDATE,
+    bytes_etag,
+    cache_headers,
+    file_etag,
+    file_last_modified,
+    is_not_modified,
+    not_modified
 )
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+import io
+import itertools
 import os
+import shutil
+import tempfile
+import time
 import logging
 
 # Logger setup
@@ -21,8 +71,156 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# In-memory store for demo; use DB in production
-certificates = {}
+# Bulk batch ids (see new_batch_id); checked before one names a file
+BATCH_ID_PATTERN = "^[0-9a-f]{16}$"
+
+
+
+def _find_existing_certificate(content_hash: str):
+    """
+    Return the stored certificate rendered from the same inputs, if its
+    file is still available
+    """
+    record = repository.find_by_content_hash(content_hash)
+    if record is None or not storage.exists(record.filename):
+        return None
+
+    cert_obj = Certificate(
+        participant_name=record.participant_name,
+        event_name=record.event_name,
+        date_issued=record.date_issued,
+        certificate_type=record.certificate_type,
+        unique_id=record.unique_id
+    )
+    cert_obj.filename = record.filename
+    cert_obj.created_at = record.created_at
+    return cert_obj
+
+
+def _busy_error(e: DispatcherSaturated) -> HTTPException:
+    """503 asking the client to retry once the render pool has capacity"""
+    RENDERS_REJECTED.inc()
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy rendering certificates; please retry shortly.",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def _render_and_store(cert_obj: Certificate, output_format: str, layout: CompiledLayout) -> bytes:
+    """Render and encode a certificate with `layout`, save it to storage and return its bytes"""
+    start = time.perf_counter()
+    try:
+        image_bytes = generate_certificate_bytes(
+            cert_obj.participant_name,
+            cert_obj.event_name,
+            cert_obj.date_issued,
+            cert_obj.certificate_type,
+            output_format,
+            layout
+        )
+        with span("write"):
+            storage.save(cert_obj.filename, image_bytes)
+    except Exception:
+        CERTIFICATE_FAILURES.inc(kind="single")
+        raise
+    RENDER_SECONDS.observe(time.perf_counter() - start, kind="single")
+    CERTIFICATES_RENDERED.inc(kind="single", format=output_format)
+    return image_bytes
+
+
+async def _issue_certificate(cert: CertificateCreate, inline: bool = False):
+    """
+    Render a certificate, store it and record it under a new unique_id
+    Repeated requests with identical inputs return the existing record.
+    Returns the JSON record, or the image itself when `inline` is set.
+    """
+    try:
+        # Input validation
+        if not cert.participant_name.strip() or not cert.event_name.strip():
+            raise HTTPException(
+                status_code=400,
+                detail="Participant name and event name cannot be empty."
+            )
+
+        # Identical inputs render identical certificates, so a repeated or
+        # retried request returns the stored artifact instead of rendering again.
+        # The layout is looked up once: its version goes into the hash and
+        # the same compiled layout draws the certificate.
+        layout = await run_in_threadpool(layout_registry.get, cert.certificate_type)
+        content_hash = certificate_fingerprint(
+            cert.participant_name,
+            cert.event_name,
+            cert.date_issued,
+            cert.certificate_type,
+            cert.output_format,
+            layout.version
+        )
+        cert_obj = await run_in_threadpool(_find_existing_certificate, content_hash)
+        image_bytes = None
+        if cert_obj is not None and inline:
+            image_bytes = await run_in_threadpool(storage.load, cert_obj.filename)
+
+        if cert_obj is None or (inline and image_bytes is None):
+            # Create certificate object
+            cert_obj = Certificate(
+                participant_name=cert.participant_name,
+                event_name=cert.event_name,
+                date_issued=cert.date_issued,
+                certificate_type=cert.certificate_type,
+                output_format=cert.output_format
+            )
+
+            # Attempt generation; rendering happens in memory on the
+            # bounded render pool so the event loop stays responsive
+            try:
+                image_bytes = await render_dispatcher.run(_render_and_store, cert_obj, cert.output_format, layout)
+            except DispatcherSaturated as e:
+                raise _busy_error(e)
+            except FileNotFoundError as e:
+                logger.error(f"Template file missing: {e}")
+                raise HTTPException(status_code=500, detail="Certificate template not found on server.")
+            except PermissionError as e:
+                logger.error(f"Permission error writing file: {e}")
+                raise HTTPException(status_code=500, detail="Server permission error while saving certificate.")
+            except Exception as e:
+                logger.error(f"Unexpected error during certificate generation: {e}")
+                raise HTTPException(status_code=500, detail="Unexpected error during certificate generation.")
+
+            # Save persistent record
+            await run_in_threadpool(repository.add, cert_obj, storage.path(cert_obj.filename), content_hash)
+        else:
+            CERTIFICATES_DEDUPLICATED.inc()
+
+        download_url = f"/certificates/{cert_obj.unique_id}"
+        if inline:
+            return Response(
+                content=image_bytes,
+                media_type=media_type_for(cert_obj.filename),
+                headers={
+                    "Content-Disposition": f'inline; filename="{cert_obj.filename}"',
+                    "X-Certificate-Id": cert_obj.unique_id,
+                    "Location": download_url
+                }
+            )
+
+        # Successful response
+        return CertificateResponse(
+            participant_name=cert_obj.participant_name,
+            event_name=cert_obj.event_name,
+            date_issued=cert_obj.date_issued,
+            certificate_type=cert_obj.certificate_type,
+            unique_id=cert_obj.unique_id,
+            filename=cert_obj.filename,
+            download_url=download_url,
+            created_at=cert_obj.created_at
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unhandled error in POST /certificates: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while creating certificate.")
 
 
 @router.post(
@@ -33,14 +231,15 @@ certificates = {}
         400: {"description": "Invalid input (empty participant or event name)"},
         422: {"description": "Request validation error"},
         500: {"description": "Internal server error during certificate generation"},
+        503: {"description": "Render queue full; retry after `Retry-After` seconds"},
     },
 )
-async def create_certificate(cert: CertificateCreate):
+async def create_certificate(cert: CertificateCreate, inline: bool = False):
     """
     Create a new digital certificate for a participant.
 
     This endpoint generates a certificate image file based on the participant’s details
-    and stores its record temporarily in memory (use a persistent DB in production).
+    and stores its record in the certificate registry database.
 
     ---
     **Request Body Example**
@@ -69,138 +268,88 @@ async def create_certificate(cert: CertificateCreate):
     - `400`: Invalid input (empty participant or event name)
     - `422`: Request validation error (invalid format)
     - `500`: Internal server error (template missing, permission denied, etc.)
+    - `503`: Too many renders in progress; retry after `Retry-After` seconds
 
     **Notes**
-    - Certificate images are saved in the `certificates/` directory.
+    - Certificate images are saved through the configured storage backend
+      (`certificates/` on disk by default, or an in-memory LRU when
+      `CERTIFICATE_STORAGE=memory`).
+    - Pass `?inline=true` to receive the image directly in the response body;
+      the record is still stored and `X-Certificate-Id` carries its id.
+    - `output_format` selects the encoding: `png` (default), `png-fast`
+      (quicker, slightly larger), `png-optimized` (smallest PNG, slower),
+      `webp` (lossless), `webp-lossy` (smallest, fastest) or `pdf`.
     - The returned `unique_id` can be used to download the generated certificate later.
     """
-    try:
-        # Input validation
-        if not cert.participant_name.strip() or not cert.event_name.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Participant name and event name cannot be empty."
-            )
-
-        # Create certificate object
-        cert_obj = Certificate(
-            participant_name=cert.participant_name,
-            event_name=cert.event_name,
-            date_issued=cert.date_issued,
-            certificate_type=cert.certificate_type
-        )
-
-        output_dir = "certificates"
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, cert_obj.filename)
-
-        # Attempt generation
-        try:
-            generate_certificate(
-                cert_obj.participant_name,
-                cert_obj.event_name,
-                cert_obj.date_issued,
-                cert_obj.certificate_type,
-                output_path
-            )
-        except FileNotFoundError as e:
-            logger.error(f"Template file missing: {e}")
-            raise HTTPException(status_code=500, detail="Certificate template not found on server.")
-        except PermissionError as e:
-            logger.error(f"Permission error writing file: {e}")
-            raise HTTPException(status_code=500, detail="Server permission error while saving certificate.")
-        except Exception as e:
-            logger.error(f"Unexpected error during certificate generation: {e}")
-            raise HTTPException(status_code=500, detail="Unexpected error during certificate generation.")
-
-        # Save in-memory record
-        certificates[cert_obj.unique_id] = {
-            "data": cert_obj.to_dict(),
-            "file": output_path
-        }
-
-        # Successful response
-        return CertificateResponse(
-            participant_name=cert_obj.participant_name,
-            event_name=cert_obj.event_name,
-            date_issued=cert_obj.date_issued,
-            certificate_type=cert_obj.certificate_type,
-            unique_id=cert_obj.unique_id,
-            filename=cert_obj.filename,
-            download_url=f"/certificates/{cert_obj.unique_id}",
-            created_at=cert_obj.created_at
-        )
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unhandled error in POST /certificates: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error while creating certificate.")
+    return await _issue_certificate(cert, inline)
 
 @router.post("/completion", response_model=CertificateResponse)
-async def create_comp_certificate(cert: CertificateCreate):
-    try:
-        # Input validation
-        if not cert.participant_name.strip() or not cert.event_name.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Participant name and event name cannot be empty."
-            )
+async def create_comp_certificate(cert: CertificateCreate, inline: bool = False):
+    return await _issue_certificate(cert, inline)
+
+@router.get("/", response_model=CertificateListResponse)
+async def list_certificates(
+    event_name: Optional[str] = None,
+    participant: Optional[str] = Query(None, description="Participant name prefix"),
+    date_from: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    date_to: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
+):
+    """
+    List issued certificates, newest first.
 
-        # Create certificate object
-        cert_obj = Certificate(
-            participant_name=cert.participant_name,
-            event_name=cert.event_name,
-            date_issued=cert.date_issued,
-            certificate_type=cert.certificate_type
-        )
+    Results come from the certificate registry's indexes, one page at a
+    time; follow `next_cursor` until it is null to walk the whole list.
 
-        output_dir = "certificates"
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, cert_obj.filename)
+    ---
+    **Query Parameters**
+    - `event_name`: exact event name
+    - `participant`: participant name prefix
+    - `date_from`, `date_to`: inclusive `date_issued` range (YYYY-MM-DD)
+    - `cursor`: `next_cursor` from the previous page
+    - `limit`: page size (1-200, default 50)
 
-        # Attempt generation
-        try:
-            generate_certificate(
-                cert_obj.participant_name,
-                cert_obj.event_name,
-                cert_obj.date_issued,
-                cert_obj.certificate_type,
-                output_path
-            )
-        except FileNotFoundError as e:
-            logger.error(f"Template file missing: {e}")
-            raise HTTPException(status_code=500, detail="Certificate template not found on server.")
-        except PermissionError as e:
-            logger.error(f"Permission error writing file: {e}")
-            raise HTTPException(status_code=500, detail="Server permission error while saving certificate.")
-        except Exception as e:
-            logger.error(f"Unexpected error during certificate generation: {e}")
-            raise HTTPException(status_code=500, detail="Unexpected error during certificate generation.")
-
-        # Save in-memory record
-        certificates[cert_obj.unique_id] = {
-            "data": cert_obj.to_dict(),
-            "file": output_path
-        }
+    **Error Codes**
+    - `400`: Malformed cursor
+    - `422`: Invalid query parameters
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
 
-        # Successful response
-        return CertificateResponse(
-            participant_name=cert_obj.participant_name,
-            event_name=cert_obj.event_name,
-            date_issued=cert_obj.date_issued,
-            certificate_type=cert_obj.certificate_type,
-            unique_id=cert_obj.unique_id,
-            filename=cert_obj.filename,
-            download_url=f"/certificates/{cert_obj.unique_id}",
-            created_at=cert_obj.created_at
+    try:
+        rows, next_key = await run_in_threadpool(
+            repository.list_page,
+            event_name=event_name,
+            participant_prefix=participant,
+            date_from=date_from,
+            date_to=date_to,
+            after=after,
+            limit=limit
         )
-
-    except HTTPException:
-        raise
     except Exception as e:
-        logger.error(f"Unhandled error in POST /certificates: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error while creating certificate.")
+        logger.error(f"Unhandled error in GET /certificates: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while listing certificates.")
+
+    return CertificateListResponse(
+        count=len(rows),
+        certificates=[
+            CertificateListItem(
+                unique_id=row.unique_id,
+                participant_name=row.participant_name,
+                event_name=row.event_name,
+                date_issued=row.date_issued,
+                certificate_type=row.certificate_type,
+                filename=row.filename,
+                download_url=f"/certificates/{row.unique_id}",
+                created_at=row.created_at
+            )
+            for row in rows
+        ],
+        next_cursor=encode_cursor(next_key) if next_key else None
+    )
 
 @router.get(
     "/{unique_id}",
@@ -210,7 +359,11 @@ async def create_comp_certificate(cert: CertificateCreate):
         500: {"description": "Internal server error while fetching certificate"},
     },
 )
-async def get_certificate(unique_id: str):
+async def get_certificate(
+    request: Request,
+    unique_id: str,
+    width: Optional[int] = Query(None, ge=1, description="Return a preview at most this wide (snapped up to a cached size)")
+):
     """
     Retrieve a generated certificate by its unique ID.
 
@@ -221,6 +374,11 @@ async def get_certificate(unique_id: str):
     **Path Parameter**
     - `unique_id` (string): Unique identifier of the certificate.
 
+    **Query Parameters**
+    - `width` (int, optional): serve a downscaled WebP preview instead of the
+      full file. Widths snap up to the nearest of 160, 320, 480 or 640 px;
+      larger widths return the original.
+
     **Example Request**
     ```
     GET /certificates/c8b5a120-6d48-4d13-9af5-2c7ad70fef14
@@ -235,22 +393,69 @@ async def get_certificate(unique_id: str):
     - `500`: Internal server error while retrieving certificate.
 
     **Notes**
-    - This endpoint returns a `FileResponse` (image), not JSON.
+    - This endpoint returns a `FileResponse` (PNG, WebP or PDF), not JSON.
+    - Previews are generated from the stored file (PDFs included) on first
+      request and kept in a bounded in-memory cache (`RENDITION_CACHE_MB`,
+      least recently used evicted), keyed by the file's content so a
+      regenerated file never serves an old preview.
+    - Responses carry a strong `ETag` (sha256 of the content) and honour
+      `If-None-Match` / `If-Modified-Since` with `304 Not Modified`. Files
+      also support `Range` requests. Certificates issued through
+      `POST /certificates` are content-addressed and marked `immutable`.
     """
     try:
-        cert_info = certificates.get(unique_id)
+        cert_info = await run_in_threadpool(repository.get, unique_id)
         if not cert_info:
             raise HTTPException(status_code=404, detail="Certificate record not found.")
 
-        file_path = cert_info["file"]
-        if not os.path.exists(file_path):
-            logger.warning(f"File not found for certificate {unique_id}: {file_path}")
+        # Certificates issued with a content hash are never rewritten under
+        # their id; bulk files can be regenerated in place, so revalidate those
+        cache_control = CACHE_IMMUTABLE if cert_info.content_hash else CACHE_REVALIDATE
+
+        preview_width = snap_width(width) if width is not None else None
+        if preview_width is not None:
+            version, load_image = await run_in_threadpool(_rendition_source, cert_info)
+            try:
+                name, preview = await render_dispatcher.run(
+                    get_rendition,
+                    unique_id,
+                    preview_width,
+                    version,
+                    load_image
+                )
+            except DispatcherSaturated as e:
+                raise _busy_error(e)
+            headers = cache_headers(bytes_etag(preview), cache_control)
+            if is_not_modified(request.headers, headers["ETag"]):
+                return not_modified(headers)
+            return Response(
+                content=preview,
+                media_type=rendition_media_type(),
+                headers={**headers, "Content-Disposition": f'inline; filename="{name}"'}
+            )
+
+        file_path = cert_info.file_path
+        filename = cert_info.filename
+        if file_path is not None:
+            if not os.path.exists(file_path):
+                logger.warning(f"File not found for certificate {unique_id}: {file_path}")
+                raise HTTPException(status_code=404, detail="Certificate file missing on server.")
+
+            return await _file_download(request, file_path, filename, media_type_for(filename), cache_control)
+
+        # Backends without files (in-memory) hand back the encoded bytes
+        image_bytes = await run_in_threadpool(storage.load, filename)
+        if image_bytes is None:
+            logger.warning(f"Stored file not found for certificate {unique_id}: {filename}")
             raise HTTPException(status_code=404, detail="Certificate file missing on server.")
 
-        return FileResponse(
-            path=file_path,
-            filename=os.path.basename(file_path),
-            media_type="image/png"
+        headers = cache_headers(bytes_etag(image_bytes), cache_control, cert_info.created_at)
+        if is_not_modified(request.headers, headers["ETag"], cert_info.created_at):
+            return not_modified(headers)
+        return Response(
+            content=image_bytes,
+            media_type=media_type_for(filename),
+            headers={**headers, "Content-Disposition": f'attachment; filename="{filename}"'}
         )
 
     except HTTPException:
@@ -260,39 +465,118 @@ async def get_certificate(unique_id: str):
         raise HTTPException(status_code=500, detail="Internal server error while fetching certificate.")
 
 
+async def _file_download(request: Request, path: str, filename: str, media_type: str, cache_control: str) -> Response:
+    """
+    Serve a file with a content-hash ETag, answering conditional GETs with
+    304; FileResponse handles Range and If-Range against the same ETag
+    """
+    etag = await run_in_threadpool(file_etag, path)
+    last_modified = file_last_modified(path)
+    headers = cache_headers(etag, cache_control, last_modified)
+    if is_not_modified(request.headers, etag, last_modified):
+        return not_modified(headers)
+    return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers)
+
+
+def _rendition_source(cert_info) -> Tuple[str, Callable[[], Image.Image]]:
+    """
+    Version of a certificate's stored file and a loader decoding it
+    Previews are cached under the version, so a bulk file regenerated in
+    place gets new ones: issued certificates are content-addressed, any
+    other file is identified by the sha256 of its content.
+    """
+    if cert_info.file_path is not None:
+        path = cert_info.file_path
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="Certificate file missing on server.")
+        version = cert_info.content_hash or file_etag(path).strip('"')
+
+        def load_image() -> Image.Image:
+            with open(path, "rb") as f:
+                return _decode_certificate(cert_info.filename, f.read())
+        return version, load_image
+
+    data = storage.load(cert_info.filename)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Certificate file missing on server.")
+    version = cert_info.content_hash or bytes_etag(data).strip('"')
+    return version, lambda: _decode_certificate(cert_info.filename, data)
+
+
+def _decode_certificate(filename: str, data: bytes) -> Image.Image:
+    """Decode a stored certificate for resizing, PDFs included"""
+    if media_type_for(filename) == "application/pdf":
+        return decode_pdf_image(data)
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+async def _generate_bulk_batch(
+    event_name: str,
+    date_issued: str,
+    participants,
+    summary_only: bool = False,
+    output_format: str = "png"
+) -> BulkCertificateResponse:
+    """
+    Render and record a bulk batch
+    `participants` may be a list or a lazy iterable of certificate items.
+    With `summary_only` the per-participant results are left out of the
+    response; they stay available, paged, at `results_url`.
+    """
+    output_dir = BULK_OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    # Reruns of the same event only render new or changed participants
+    cache_id = render_cache_id(event_name, date_issued, "participation", output_format)
+    
+    # Generate bulk certificates off the event loop
+    batch = await run_in_threadpool(
+        render_bulk_batch,
+        event_name=event_name,
+        date_issued=date_issued,
+        participants=participants,
+        output_dir=output_dir,
+        output_format=output_format,
+        cache_id=cache_id
+    )
+    batch_id = batch.batch_id
+    await run_in_threadpool(
+        record_bulk_certificates,
+        event_name,
+        date_issued,
+        "participation",
+        batch
+    )
+    
+    # Results and the archive are served from the run's results file on
+    # disk, so they survive restarts and work from any worker
+    summary = batch.summary()
+    return BulkCertificateResponse(
+        **summary,
+        successful_certificates=None if summary_only else batch.successful(),
+        failed_certificates=None if summary_only else batch.failed(),
+        download_url=f"/certificates/bulk/batches/{batch_id}/download" if summary["success_count"] else None,
+        batch_id=batch_id,
+        reused_count=batch.reused_count,
+        results_url=f"/certificates/bulk/batches/{batch_id}/results"
+    )
+
+
 @router.post("/bulk", response_model=BulkCertificateResponse)
-async def create_bulk_certificates(request: BulkCertificateRequest):
+async def create_bulk_certificates(request: BulkCertificateRequest, summary_only: bool = False):
     """
     Generate certificates for multiple participants
+    Pass `?summary_only=true` to get counts and `results_url` instead of
+    every per-participant result.
     """
     try:
-        output_dir = "certificates/bulk"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Generate bulk certificates
-        result = generate_bulk_certificates(
-            event_name=request.event_name,
-            date_issued=request.date_issued,
-            participants=request.participants,
-            output_dir=output_dir
-        )
-        
-        download_url = None
-        if result["successful_certificates"]:
-            # Create ZIP file for download
-            zip_path = create_certificates_zip(
-                result["successful_certificates"], 
-                output_dir
-            )
-            download_url = f"/certificates/bulk/download/{os.path.basename(zip_path)}"
-        
-        return BulkCertificateResponse(
-            success_count=result["success_count"],
-            failed_count=result["failed_count"],
-            total_count=result["total_count"],
-            successful_certificates=result["successful_certificates"],
-            failed_certificates=result["failed_certificates"],
-            download_url=download_url
+        return await _generate_bulk_batch(
+            request.event_name,
+            request.date_issued,
+            request.participants,
+            summary_only,
+            request.output_format
         )
         
     except Exception as e:
@@ -300,43 +584,58 @@ async def create_bulk_certificates(request: BulkCertificateRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate bulk certificates: {str(e)}")
 
 
+def _validate_csv_upload(csv_file: UploadFile) -> None:
+    """Reject uploads that are not CSV files"""
+    if not csv_file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV file")
+
+
+async def _ensure_participants(participants: Iterator[BulkCertificateItem]) -> Iterator[BulkCertificateItem]:
+    """
+    Read ahead to the first valid participant, rejecting CSVs without one
+    Returns an iterator over all participants, including the first.
+    """
+    first = await run_in_threadpool(next, participants, None)
+    if first is None:
+        raise HTTPException(
+            status_code=400, 
+            detail="No valid participants found in CSV file"
+        )
+    return itertools.chain([first], participants)
+
+
 @router.post("/bulk/csv", response_model=BulkCertificateResponse)
 async def create_bulk_certificates_from_csv(
     event_name: str,
     date_issued: str,
-    csv_file: UploadFile = File(...)
+    csv_file: UploadFile = File(...),
+    summary_only: bool = False,
+    output_format: OutputFormatName = "png"
 ):
     """
     Generate certificates from CSV file upload
     CSV should have columns: participant_name, email (optional)
+    The upload is parsed and rendered incrementally, so there is no
+    limit on the number of rows. For large files pass
+    `?summary_only=true` and page through `results_url`.
     """
     try:
-        # Validate file type
-        if not csv_file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="File must be a CSV file")
-        
-        # Read CSV content
-        csv_content = await csv_file.read()
-        csv_text = csv_content.decode('utf-8')
+        _validate_csv_upload(csv_file)
+        batch = BulkCertificateBatch(event_name=event_name, date_issued=date_issued, output_format=output_format)
         
-        # Process CSV and extract participants
-        participants = process_csv_content(csv_text)
-        
-        if not participants:
-            raise HTTPException(
-                status_code=400, 
-                detail="No valid participants found in CSV file"
-            )
-        
-        # Create bulk request
-        bulk_request = BulkCertificateRequest(
-            event_name=event_name,
-            date_issued=date_issued,
-            participants=participants
+        # Parse rows straight from the spooled upload as the renderer consumes them
+        participants = await _ensure_participants(
+            iter_csv_participants(io.TextIOWrapper(csv_file.file, encoding='utf-8', newline=''), lightweight=True)
         )
         
         # Generate certificates
-        return await create_bulk_certificates(bulk_request)
+        return await _generate_bulk_batch(
+            batch.event_name,
+            batch.date_issued,
+            participants,
+            summary_only,
+            batch.output_format
+        )
         
     except HTTPException:
         raise
@@ -345,25 +644,246 @@ async def create_bulk_certificates_from_csv(
         raise HTTPException(status_code=500, detail=f"Failed to process CSV file: {str(e)}")
 
 
+def _spool_csv_upload(csv_file: UploadFile) -> str:
+    """Copy an upload to a temporary file that outlives the request"""
+    with tempfile.NamedTemporaryFile(mode='wb', suffix='.csv', delete=False) as spooled:
+        shutil.copyfileobj(csv_file.file, spooled)
+        return spooled.name
+
+
 @router.get("/bulk/download/{filename}")
-async def download_bulk_certificates(filename: str):
+async def download_bulk_certificates(request: Request, filename: str):
     """
     Download ZIP file containing bulk certificates
+    Supports conditional GETs and Range requests for resumable downloads.
     """
     try:
-        file_path = os.path.join("certificates/bulk", filename)
+        file_path = os.path.join(BULK_OUTPUT_DIR, filename)
         
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail="Bulk certificate file not found")
         
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type="application/zip"
-        )
+        return await _file_download(request, file_path, filename, "application/zip", CACHE_REVALIDATE)
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error downloading bulk certificates: {e}")
         raise HTTPException(status_code=500, detail="Failed to download bulk certificates")
+
+
+def _load_batch(batch_id: str):
+    batch = load_batch(BULK_OUTPUT_DIR, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Bulk batch not found")
+    return batch
+
+
+@router.get("/bulk/batches/{batch_id}/results", response_model=BulkResultsPage)
+async def get_bulk_batch_results(
+    batch_id: str = Path(..., pattern=BATCH_ID_PATTERN),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    status: Optional[str] = Query(None, pattern="^(succeeded|failed)$")
+):
+    """
+    Page through the results of a bulk batch in input order
+    Read from the batch's results file on disk. Filter with
+    `status=succeeded` or `status=failed`.
+    """
+    batch = await run_in_threadpool(_load_batch, batch_id)
+    status_code = {"succeeded": STATUS_SUCCEEDED, "failed": STATUS_FAILED}.get(status)
+    total, results = batch.page(offset, limit, status_code)
+    return BulkResultsPage(
+        batch_id=batch_id,
+        status=status,
+        offset=offset,
+        limit=limit,
+        total=total,
+        results=results
+    )
+
+
+def _resumes_download(request: Request) -> bool:
+    """Range and If-Range requests need the archive as a file on disk"""
+    return "range" in request.headers or "if-range" in request.headers
+
+
+def _stream_archive(certificates: Iterable[Dict], filename: str, cache_control: str, resumable: bool) -> StreamingResponse:
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": cache_control
+    }
+    if resumable:
+        headers["Accept-Ranges"] = "bytes"
+    return StreamingResponse(iter_certificates_zip(certificates), media_type="application/zip", headers=headers)
+
+
+def _batch_archive(batch_id: str, build: bool) -> Tuple[ParticipantBatch, Optional[str]]:
+    """
+    The batch and the path of its archive on disk, or None if the archive
+    is not there and `build` is not set
+    """
+    batch = _load_batch(batch_id)
+    path = os.path.join(batch.output_dir, batch_archive_filename(batch_id))
+    if not os.path.exists(path):
+        if not build:
+            return batch, None
+        path = create_batch_archive(batch)
+    return batch, path
+
+
+@router.get("/bulk/batches/{batch_id}/download")
+async def download_bulk_batch(request: Request, batch_id: str = Path(..., pattern=BATCH_ID_PATTERN)):
+    """
+    Download a ZIP of the certificates of a bulk batch
+    The archive is streamed from the certificates, so nothing is written
+    for batches nobody downloads. A Range or If-Range request, i.e. a
+    resumed download, writes the same bytes to disk once and is served
+    from the file with an ETag and Range support from then on. Its files
+    live in the event's render cache, where a later run can rewrite one,
+    so it is revalidated rather than cached for good.
+    """
+    filename = batch_archive_filename(batch_id)
+    batch, path = await run_in_threadpool(_batch_archive, batch_id, _resumes_download(request))
+    if path is not None:
+        return await _file_download(request, path, filename, "application/zip", CACHE_REVALIDATE)
+    return _stream_archive(batch.successful(), filename, CACHE_REVALIDATE, resumable=True)
+
+
+def _job_response(job) -> BulkJobResponse:
+    return BulkJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        total_count=job.total_count,
+        status_url=f"/certificates/bulk/jobs/{job.job_id}"
+    )
+
+
+@router.post("/bulk/jobs", response_model=BulkJobResponse, status_code=202)
+async def submit_bulk_certificates_job(request: BulkCertificateRequest):
+    """
+    Queue bulk certificate generation and return a job id immediately.
+    Poll `GET /certificates/bulk/jobs/{job_id}` for progress and the ZIP URL.
+    """
+    try:
+        job = submit_bulk_job(
+            event_name=request.event_name,
+            date_issued=request.date_issued,
+            participants=request.participants,
+            output_dir=BULK_OUTPUT_DIR,
+            output_format=request.output_format
+        )
+        return _job_response(job)
+        
+    except Exception as e:
+        logger.error(f"Error queueing bulk certificate job: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to queue bulk certificates: {str(e)}")
+
+
+@router.post("/bulk/csv/jobs", response_model=BulkJobResponse, status_code=202)
+async def submit_bulk_certificates_csv_job(
+    event_name: str,
+    date_issued: str,
+    csv_file: UploadFile = File(...),
+    output_format: OutputFormatName = "png"
+):
+    """
+    Queue certificate generation from a CSV file upload and return a job id immediately
+    CSV should have columns: participant_name, email (optional)
+    The job streams rows from a spooled copy of the upload, so there is no
+    limit on the number of rows; `total_count` is reported once it is known.
+    """
+    csv_path = None
+    try:
+        _validate_csv_upload(csv_file)
+        batch = BulkCertificateBatch(event_name=event_name, date_issued=date_issued, output_format=output_format)
+        
+        csv_path = await run_in_threadpool(_spool_csv_upload, csv_file)
+        preview = iter_csv_file_participants(csv_path)
+        try:
+            await _ensure_participants(preview)
+        finally:
+            preview.close()
+        
+        # The job owns the spooled file from here and removes it once read
+        job = submit_bulk_job(
+            event_name=batch.event_name,
+            date_issued=batch.date_issued,
+            participants=iter_csv_file_participants(csv_path, delete_after=True, lightweight=True),
+            output_dir=BULK_OUTPUT_DIR,
+            output_format=batch.output_format
+        )
+        csv_path = None
+        return _job_response(job)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing CSV file: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to process CSV file: {str(e)}")
+    finally:
+        if csv_path is not None and os.path.exists(csv_path):
+            os.remove(csv_path)
+
+
+@router.get("/bulk/jobs/{job_id}", response_model=BulkJobStatusResponse)
+async def get_bulk_certificates_job(job_id: str, summary_only: bool = False):
+    """
+    Report progress (done/failed/total), partial results and, once
+    finished, the ZIP download URL of a bulk job
+    Pass `?summary_only=true` to poll counts without the result lists.
+    """
+    job = job_store.get(job_id, BULK_OUTPUT_DIR)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    return BulkJobStatusResponse(**job.to_dict(include_results=not summary_only))
+
+
+@router.get("/bulk/jobs/{job_id}/results", response_model=BulkResultsPage)
+async def get_bulk_certificates_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    status: Optional[str] = Query(None, pattern="^(succeeded|failed)$")
+):
+    """
+    Page through a bulk job's per-participant results in input order
+    Filter with `status=succeeded` or `status=failed`.
+    """
+    job = job_store.get(job_id, BULK_OUTPUT_DIR)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    
+    status_code = {"succeeded": STATUS_SUCCEEDED, "failed": STATUS_FAILED}.get(status)
+    total, results = job.results.page(offset, limit, status_code)
+    return BulkResultsPage(
+        job_id=job_id,
+        status=status,
+        offset=offset,
+        limit=limit,
+        total=total,
+        results=results
+    )
+
+
+@router.get("/bulk/jobs/{job_id}/download")
+async def download_bulk_certificates_job(request: Request, job_id: str):
+    """
+    Download a ZIP of a bulk job's certificates
+    While the job runs, entries are streamed as soon as each certificate is
+    rendered. Once it has completed, the archive is streamed from the
+    certificates as well, unless a Range or If-Range request (a resumed
+    download) needs it as a file: that writes the same bytes to disk once,
+    and from then on the file is served with an ETag, conditional GET and
+    Range support.
+    """
+    job = job_store.get(job_id, BULK_OUTPUT_DIR)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    
+    archive_path = await run_in_threadpool(job.archive_path, _resumes_download(request))
+    if archive_path is not None:
+        return await _file_download(request, archive_path, job.archive_filename, "application/zip", CACHE_IMMUTABLE)
+    
+    return _stream_archive(job.iter_successful(), job.archive_filename, "no-store", resumable=job.status == JOB_COMPLETED)
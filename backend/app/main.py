@@ -1,10 +1,41 @@
+from contextlib import asynccontextmanager
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Relative imports within the same package
 from .api.certificates import router as certificates_router
+from .database import init_db
+from .services.bulk_generator import shutdown_bulk_executor
+from .services.jobs import shutdown_job_executor
+from .services.fonts import font_registry
+from .services.generator import warm_cache
+from .services.dispatcher import render_dispatcher
+from .services.metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
 
-app = FastAPI(title="Hacktoberfest Certificate Generator")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create the certificate registry's tables (and any columns or indexes
+    # added since the database was created)
+    init_db()
+    # Resolve font families once at startup and report which are active
+    logger.info(f"Active fonts: {font_registry.active_fonts()}")
+    # Decode templates once here; they are published as shared rasters,
+    # so render workers started later map them instead of decoding again
+    warm_cache()
+    yield
+    # Let queued bulk jobs finish, then stop the render workers
+    shutdown_job_executor()
+    shutdown_bulk_executor()
+    render_dispatcher.shutdown()
+
+
+app = FastAPI(title="Hacktoberfest Certificate Generator", lifespan=lifespan)
 
 # Include routers
 app.include_router(certificates_router, prefix="/certificates", tags=["certificates"])
@@ -14,6 +45,11 @@ app.include_router(certificates_router, prefix="/certificates", tags=["certifica
 def root():
     return {"message": "Welcome to Hacktoberfest Certificate Generator API 🚀"}
 
+# Render counters and stage timings in the Prometheus text format
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
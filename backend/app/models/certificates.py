@@ -4,11 +4,33 @@ Pydantic schemas and ORM models for certificate generation
 """
 
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from sqlalchemy import Column, String, DateTime, Index
+from typing import Dict, Literal, NamedTuple, Optional, List
 from datetime import datetime
 from uuid import uuid4
 import re
 
+from ..database import Base
+
+# Letters, spaces, hyphens, apostrophes and periods
+PARTICIPANT_NAME_PATTERN = re.compile(r"^[a-zA-Z\s\-'\.]+$")
+
+# Longest participant name the registry column holds
+PARTICIPANT_NAME_MAX_LENGTH = 100
+
+# Encodings a certificate can be delivered in (see services/encoders.py)
+OutputFormatName = Literal["png", "png-fast", "png-optimized", "webp", "webp-lossy", "pdf"]
+
+# File extension written for each output format
+OUTPUT_EXTENSIONS = {
+    "png": "png",
+    "png-fast": "png",
+    "png-optimized": "png",
+    "webp": "webp",
+    "webp-lossy": "webp",
+    "pdf": "pdf",
+}
+
 # ============================================================================
 # PYDANTIC SCHEMAS (for API request/response validation)
 # ============================================================================
@@ -18,7 +40,7 @@ class CertificateBase(BaseModel):
     participant_name: str = Field(
         ..., 
         min_length=2, 
-        max_length=100,
+        max_length=PARTICIPANT_NAME_MAX_LENGTH,
         description="Full name of the participant"
     )
     event_name: str = Field(
@@ -44,7 +66,7 @@ class CertificateBase(BaseModel):
         if not v.strip():
             raise ValueError('Participant name cannot be empty')
         # Check for valid characters (letters, spaces, hyphens, apostrophes)
-        if not re.match(r"^[a-zA-Z\s\-'\.]+$", v):
+        if not PARTICIPANT_NAME_PATTERN.match(v):
             raise ValueError('Participant name contains invalid characters')
         return v.strip()
     
@@ -75,7 +97,10 @@ class CertificateBase(BaseModel):
 
 class CertificateCreate(CertificateBase):
     """Schema for creating a new certificate"""
-    pass
+    output_format: OutputFormatName = Field(
+        "png",
+        description="Encoding of the certificate file (png, png-fast, png-optimized, webp, webp-lossy or pdf)"
+    )
 
 
 class CertificateResponse(CertificateBase):
@@ -114,23 +139,23 @@ class CertificateResponse(CertificateBase):
 
 class BulkCertificateItem(BaseModel):
     """Individual certificate item for bulk generation"""
-    participant_name: str = Field(..., description="Participant's full name")
+    participant_name: str = Field(..., max_length=PARTICIPANT_NAME_MAX_LENGTH, description="Participant's full name")
     email: Optional[str] = Field(None, description="Participant's email address")
     
     @validator('participant_name')
     def validate_participant_name(cls, v):
         if not v.strip():
             raise ValueError('Participant name cannot be empty')
-        if not re.match(r"^[a-zA-Z\s\-'\.]+$", v):
+        if not PARTICIPANT_NAME_PATTERN.match(v):
             raise ValueError('Participant name contains invalid characters')
         return v.strip()
 
 
-class BulkCertificateRequest(BaseModel):
-    """Request model for bulk certificate generation"""
+class BulkCertificateBatch(BaseModel):
+    """Event details shared by every certificate of a bulk batch"""
     event_name: str = Field(..., min_length=3, max_length=200)
     date_issued: str = Field(..., description="Date in YYYY-MM-DD format")
-    participants: List[BulkCertificateItem] = Field(..., min_items=1, max_items=100)
+    output_format: OutputFormatName = Field("png", description="Encoding of the certificate files")
     
     @validator('event_name')
     def validate_event_name(cls, v):
@@ -139,20 +164,82 @@ class BulkCertificateRequest(BaseModel):
         return v.strip()
 
 
+class BulkCertificateRequest(BulkCertificateBatch):
+    """Request model for bulk certificate generation"""
+    participants: List[BulkCertificateItem] = Field(..., min_items=1, max_items=100)
+
+
 class BulkCertificateResponse(BaseModel):
     """Response model for bulk certificate generation"""
     success_count: int
     failed_count: int
     total_count: int
-    successful_certificates: List[dict]
-    failed_certificates: List[dict]
+    successful_certificates: Optional[List[dict]] = Field(None, description="Omitted when only a summary is requested")
+    failed_certificates: Optional[List[dict]] = Field(None, description="Omitted when only a summary is requested")
+    download_url: Optional[str] = None
+    results_url: Optional[str] = Field(None, description="Paged listing of the per-participant results")
+    batch_id: Optional[str] = Field(None, description="Id of the batch manifest tracking these certificates")
+    reused_count: int = Field(0, description="Certificates unchanged since an earlier run of the batch, not re-rendered")
+
+
+class BulkJobResponse(BaseModel):
+    """Response model for a queued bulk generation job"""
+    job_id: str
+    status: str
+    total_count: Optional[int] = Field(None, description="Unknown until a streamed CSV has been read")
+    status_url: str
+
+
+class BulkJobStatusResponse(BaseModel):
+    """Progress and partial results of a bulk generation job"""
+    job_id: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    event_name: str
+    date_issued: str
+    total_count: Optional[int] = Field(None, description="Unknown until a streamed CSV has been read")
+    done_count: int
+    success_count: int
+    failed_count: int
+    reused_count: int = 0
+    batch_id: Optional[str] = None
+    successful_certificates: Optional[List[dict]] = Field(None, description="Omitted when only a summary is requested")
+    failed_certificates: Optional[List[dict]] = Field(None, description="Omitted when only a summary is requested")
+    results_url: str
+    stage_seconds: Dict[str, float] = Field(default_factory=dict, description="Render time per stage summed over the job")
     download_url: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class BulkResultsPage(BaseModel):
+    """One page of a bulk job's or batch's per-participant results"""
+    job_id: Optional[str] = None
+    batch_id: Optional[str] = None
+    status: Optional[str] = Field(None, description="Filter applied: succeeded or failed")
+    offset: int
+    limit: int
+    total: int = Field(..., description="Number of results matching the filter")
+    results: List[dict]
+
+
+class CertificateListItem(BaseModel):
+    """Registry entry returned when listing certificates"""
+    unique_id: str
+    participant_name: str
+    event_name: str
+    date_issued: str
+    certificate_type: str
+    filename: str
+    download_url: str
+    created_at: Optional[datetime] = None
 
 
 class CertificateListResponse(BaseModel):
     """Schema for listing certificates"""
-    count: int
-    certificates: list[str]
+    count: int = Field(..., description="Number of certificates in this page")
+    certificates: List[CertificateListItem]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
 
 
 class CertificateDeleteResponse(BaseModel):
@@ -166,6 +253,13 @@ class CertificateDeleteResponse(BaseModel):
 # CERTIFICATE DATA CLASS (for internal use)
 # ============================================================================
 
+def generate_unique_id() -> str:
+    """Generate a unique certificate ID"""
+    # Format: cert_<short-uuid>
+    short_uuid = str(uuid4()).replace('-', '')[:12]
+    return f"cert_{short_uuid}"
+
+
 class Certificate:
     """
     Certificate data class for internal processing
@@ -178,21 +272,21 @@ class Certificate:
         event_name: str,
         date_issued: str,
         certificate_type: str,
-        unique_id: Optional[str] = None
+        unique_id: Optional[str] = None,
+        output_format: str = "png"
     ):
         self.participant_name = participant_name
         self.event_name = event_name
         self.date_issued = date_issued
         self.certificate_type = certificate_type
+        self.output_format = output_format
         self.unique_id = unique_id or self._generate_unique_id()
         self.filename = self._generate_filename()
         self.created_at = datetime.now()
     
     def _generate_unique_id(self) -> str:
         """Generate a unique certificate ID"""
-        # Format: cert_<short-uuid>
-        short_uuid = str(uuid4()).replace('-', '')[:12]
-        return f"cert_{short_uuid}"
+        return generate_unique_id()
     
     def _generate_filename(self) -> str:
         """Generate a safe filename for the certificate"""
@@ -200,8 +294,9 @@ class Certificate:
         safe_name = self.participant_name.replace(" ", "_").replace("/", "-").replace("\\", "-")
         safe_event = self.event_name.replace(" ", "_").replace("/", "-").replace("\\", "-")
         
-        # Create filename: Name_Event_Date_UniqueID.png
-        filename = f"{safe_name}_{safe_event}_{self.date_issued}_{self.unique_id}.png"
+        # Create filename: Name_Event_Date_UniqueID.<ext>
+        extension = OUTPUT_EXTENSIONS.get(self.output_format, "png")
+        filename = f"{safe_name}_{safe_event}_{self.date_issued}_{self.unique_id}.{extension}"
         
         # Remove any remaining special characters
         filename = re.sub(r'[^\w\-_\.]', '', filename)
@@ -223,56 +318,58 @@ class Certificate:
         return f"Certificate(id={self.unique_id}, participant={self.participant_name})"
 
 
-# ============================================================================
-# ORM MODEL (stubbed for future database integration)
-# ============================================================================
-
-
-# ORM Model stub using SQLAlchemy (for future database implementation)
-# Uncomment and configure when database support is added
+class ParticipantRecord(NamedTuple):
+    """
+    Lightweight, already-validated participant used for large bulk imports
+    Interchangeable with BulkCertificateItem wherever only the fields are read
+    """
+    participant_name: str
+    email: Optional[str] = None
 
-# from sqlalchemy import Column, String, DateTime
-# from sqlalchemy.ext.declarative import declarative_base
 
-# Base = declarative_base()
+# ============================================================================
+# ORM MODEL (certificate registry)
+# ============================================================================
 
-# class CertificateORM(Base):
-#     '''SQLAlchemy ORM model for Certificate'''
+class CertificateORM(Base):
+    '''SQLAlchemy ORM model for Certificate'''
     
-#     __tablename__ = 'certificates'
+    __tablename__ = 'certificates'
+    __table_args__ = (
+        # Keyset pagination: newest first, unique_id breaks ties
+        Index("ix_certificates_created_id", "created_at", "unique_id"),
+        Index("ix_certificates_event_created_id", "event_name", "created_at", "unique_id"),
+        # Participant prefix and date range filters seek these, then page
+        Index("ix_certificates_participant_created_id", "participant_name", "created_at", "unique_id"),
+        Index("ix_certificates_date_created_id", "date_issued", "created_at", "unique_id"),
+    )
     
-#     unique_id = Column(String(50), primary_key=True, index=True)
-#     participant_name = Column(String(100), nullable=False, index=True)
-#     event_name = Column(String(200), nullable=False, index=True)
-#     date_issued = Column(String(10), nullable=False)
-#     filename = Column(String(255), nullable=False, unique=True)
-#     file_path = Column(String(500), nullable=True)
-#     created_at = Column(DateTime, default=datetime.now)
-#     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    unique_id = Column(String(50), primary_key=True)
+    participant_name = Column(String(PARTICIPANT_NAME_MAX_LENGTH), nullable=False)
+    event_name = Column(String(200), nullable=False, index=True)
+    date_issued = Column(String(10), nullable=False)
+    certificate_type = Column(String(20), nullable=False, default="participation")
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(500), nullable=True)
+    # sha256 of the render inputs and template version, for deduplication
+    content_hash = Column(String(64), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
-#     def __repr__(self):
-#         return f"<Certificate(id={self.unique_id}, participant={self.participant_name})>"
+    def __repr__(self):
+        return f"<Certificate(id={self.unique_id}, participant={self.participant_name})>"
     
-#     def to_dict(self):
-#         '''Convert ORM model to dictionary'''
-#         return {
-#             'unique_id': self.unique_id,
-#             'participant_name': self.participant_name,
-#             'event_name': self.event_name,
-#             'date_issued': self.date_issued,
-#             'filename': self.filename,
-#             'file_path': self.file_path,
-#             'created_at': self.created_at.isoformat() if self.created_at else None,
-#             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-#         }
-
-# # Database configuration (to be implemented)
-# # from sqlalchemy import create_engine
-# # from sqlalchemy.orm import sessionmaker
-
-# # DATABASE_URL = "sqlite:///./certificates.db"  # or PostgreSQL, MySQL, etc.
-# # engine = create_engine(DATABASE_URL)
-# # SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# # Create tables
-# # Base.metadata.create_all(bind=engine)
+    def to_dict(self):
+        '''Convert ORM model to dictionary'''
+        return {
+            'unique_id': self.unique_id,
+            'participant_name': self.participant_name,
+            'event_name': self.event_name,
+            'date_issued': self.date_issued,
+            'certificate_type': self.certificate_type,
+            'filename': self.filename,
+            'file_path': self.file_path,
+            'content_hash': self.content_hash,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
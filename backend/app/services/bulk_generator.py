@@ -4,128 +4,930 @@ Handles CSV processing and bulk certificate creation
 """
 
 import csv
+import glob
+import hashlib
 import io
+import itertools
+import json
+import multiprocessing
 import os
+import secrets
+import threading
+import time
 import zipfile
-from typing import List, Dict, Any
-from ..models.certificates import BulkCertificateItem, BulkCertificateRequest
-from .generator import generate_certificate
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+from ..models.certificates import (
+    BulkCertificateItem,
+    ParticipantRecord,
+    PARTICIPANT_NAME_MAX_LENGTH,
+    PARTICIPANT_NAME_PATTERN,
+    generate_unique_id
+)
+from .encoders import DEFAULT_OUTPUT_FORMAT, get_output_format
+from .generator import CertificateBatchRenderer, certificate_fingerprint, warm_cache
+from .layouts import layout_registry
+from .metrics import (
+    CERTIFICATE_FAILURES,
+    CERTIFICATES_RENDERED,
+    RENDER_SECONDS,
+    collect_stages,
+    observe_stages,
+    span
+)
 import logging
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# Where bulk batches and their ZIP archives are written
+BULK_OUTPUT_DIR = os.getenv("CERTIFICATE_BULK_DIR", os.path.join(os.getenv("CERTIFICATE_DIR", "certificates"), "bulk"))
+
+# Number of render worker processes (defaults to one per CPU)
+BULK_MAX_WORKERS = int(os.getenv("BULK_MAX_WORKERS", "0")) or os.cpu_count() or 1
+
+# Batches smaller than this are rendered inline; pool dispatch isn't worth it
+PARALLEL_THRESHOLD = int(os.getenv("BULK_PARALLEL_THRESHOLD", "8"))
+
+# Archives written for resumable downloads are deleted by prune_archives
+# after this long; a later Range request writes them again
+BULK_ARCHIVE_RETENTION_SECONDS = int(os.getenv("BULK_ARCHIVE_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# Read size used when streaming certificate files into a ZIP response
+ZIP_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Batch base images kept per process (event, date and type)
+MAX_BATCH_RENDERERS = 8
+
+_batch_renderers: Dict[Tuple[str, str, str], CertificateBatchRenderer] = {}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers: Optional[int] = None
+_executor_lock = threading.Lock()
+
+# Stands in for file locks on manifests where fcntl is unavailable
+_manifest_lock = threading.Lock()
+
+# Format of the results files written by save_batch
+BATCH_VERSION = 1
+
+
+# Participants validated and handed to the renderer at a time; bounds
+# memory when ingesting large CSV uploads
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
 
-def process_csv_content(csv_content: str) -> List[BulkCertificateItem]:
+# Recognized CSV column names, in order of preference
+NAME_FIELDS = ['participant_name', 'name', 'full_name', 'participant']
+EMAIL_FIELDS = ['email', 'email_address', 'participant_email']
+
+
+def _first_value_reader(indexes: List[int]) -> Callable[[List[str]], Optional[str]]:
     """
-    Process CSV content and return list of certificate items
+    Build an accessor returning the first non-blank value, stripped, among
+    the given column indexes of a row
+    """
+    def read(row: List[str]) -> Optional[str]:
+        for index in indexes:
+            if index < len(row):
+                value = row[index].strip()
+                if value:
+                    return value
+        return None
+    return read
+
+
+def _column_indexes(header: List[str], fields: List[str]) -> List[int]:
+    """Positions of the recognized `fields` present in `header`, in order of preference"""
+    # Like csv.DictReader, a repeated column name refers to its last occurrence
+    positions = {name: index for index, name in enumerate(header)}
+    return [positions[field] for field in fields if field in positions]
+
+
+def iter_csv_participants(
+    lines: Iterable[str],
+    lightweight: bool = False
+) -> Iterator[Union[BulkCertificateItem, ParticipantRecord]]:
+    """
+    Parse CSV rows lazily and yield a certificate item per valid row
+    `lines` can be any iterable of text lines, e.g. an open file, so large
+    uploads are never held in memory. Rows without a valid participant
+    name are logged and skipped.
+    The name and email columns are resolved once from the header and names
+    are checked with the same rules as BulkCertificateItem, so items are
+    built without re-running validation. With `lightweight`, plain
+    ParticipantRecord tuples are yielded instead of pydantic models.
     Expected CSV format: participant_name,email (optional)
     """
-    participants = []
-    csv_reader = csv.DictReader(io.StringIO(csv_content))
+    csv_reader = csv.reader(lines)
+    header = next(csv_reader, None)
+    if header is None:
+        return
+    
+    read_name = _first_value_reader(_column_indexes(header, NAME_FIELDS))
+    read_email = _first_value_reader(_column_indexes(header, EMAIL_FIELDS))
+    make_participant = ParticipantRecord if lightweight else BulkCertificateItem.model_construct
+    match_name = PARTICIPANT_NAME_PATTERN.match
     
     for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 for header
+        if not row:
+            continue
+        
+        participant_name = read_name(row)
+        if not participant_name:
+            logger.warning(f"Row {row_num}: Missing participant name, skipping")
+            continue
+        if not match_name(participant_name):
+            logger.error(f"Error processing row {row_num}: Participant name contains invalid characters")
+            continue
+        if len(participant_name) > PARTICIPANT_NAME_MAX_LENGTH:
+            logger.error(f"Error processing row {row_num}: Participant name is longer than {PARTICIPANT_NAME_MAX_LENGTH} characters")
+            continue
+        
+        yield make_participant(participant_name=participant_name, email=read_email(row))
+
+
+def iter_csv_file_participants(
+    path: str,
+    delete_after: bool = False,
+    lightweight: bool = False
+) -> Iterator[Union[BulkCertificateItem, ParticipantRecord]]:
+    """
+    Stream participants from a CSV file on disk
+    With `delete_after` the file is removed once it has been read.
+    """
+    try:
+        with open(path, newline='', encoding='utf-8') as csv_file:
+            yield from iter_csv_participants(csv_file, lightweight)
+    finally:
+        if delete_after and os.path.exists(path):
+            os.remove(path)
+
+
+def process_csv_content(csv_content: str, lightweight: bool = False) -> List[Union[BulkCertificateItem, ParticipantRecord]]:
+    """
+    Process CSV content and return list of certificate items
+    Pass `lightweight` to get ParticipantRecord tuples for large files.
+    Expected CSV format: participant_name,email (optional)
+    """
+    return list(iter_csv_participants(io.StringIO(csv_content), lightweight))
+
+
+def _iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group `items` into lists of at most `size`"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_bulk_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Return the shared render process pool, creating it on first use.
+    Workers preload templates and fonts once when they start.
+    The pool is recreated if a different worker count is requested.
+    """
+    global _executor, _executor_workers
+    max_workers = max_workers or BULK_MAX_WORKERS
+
+    with _executor_lock:
+        if _executor is not None and _executor_workers != max_workers:
+            _executor.shutdown(wait=True)
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_cache
+            )
+            _executor_workers = max_workers
+        return _executor
+
+
+def shutdown_bulk_executor() -> None:
+    """Shut down the shared render process pool, if it was started"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+            _executor_workers = None
+
+
+def get_batch_renderer(event_name: str, date_issued: str, certificate_type: str) -> CertificateBatchRenderer:
+    """
+    Return this process's renderer for a batch, baking its base image on first use
+    Pool workers keep a few recent batches warm between tasks; a renderer
+    is rebaked once its layout changes on disk.
+    """
+    key = (event_name, date_issued, certificate_type)
+    layout = layout_registry.get(certificate_type)
+    renderer = _batch_renderers.get(key)
+    if renderer is None or renderer.layout.version != layout.version:
+        _batch_renderers.pop(key, None)
+        if len(_batch_renderers) >= MAX_BATCH_RENDERERS:
+            _batch_renderers.pop(next(iter(_batch_renderers)))
+        renderer = CertificateBatchRenderer(event_name, date_issued, certificate_type, layout)
+        _batch_renderers[key] = renderer
+    return renderer
+
+
+# Per-participant status codes stored in ParticipantBatch.statuses
+STATUS_SUCCEEDED = 1
+STATUS_FAILED = 2
+
+STATUS_NAMES = {STATUS_SUCCEEDED: "succeeded", STATUS_FAILED: "failed"}
+
+
+class ParticipantBatch:
+    """
+    Columnar results of a bulk generation run
+    Rows are kept as parallel arrays (names, emails, filenames, errors,
+    unique ids and a compact status array) instead of one dict per
+    participant; dicts are only built for the rows a caller asks for.
+    Safe to append to from one thread while others read.
+    """
+
+    __slots__ = (
+        "output_dir", "names", "emails", "filenames", "errors", "unique_ids", "statuses",
+        "stage_seconds", "batch_id", "reused_count", "_lock"
+    )
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.names: List[str] = []
+        self.emails: List[Optional[str]] = []
+        # Exactly one of filename (success) or error (failure) is set per row
+        self.filenames: List[Optional[str]] = []
+        self.errors: List[Optional[str]] = []
+        # Assigned when a manifest-tracked row is rendered (and kept when it
+        # is reused), otherwise when the batch is recorded in the registry
+        self.unique_ids: List[Optional[str]] = []
+        self.statuses = array("B")
+        # Render time per stage summed over every row (see metrics.STAGES)
+        self.stage_seconds: Dict[str, float] = {}
+        # Set for runs rendered into a render cache (see render_bulk_batch);
+        # reused rows were already rendered by an earlier run and were not redrawn
+        self.batch_id: Optional[str] = None
+        self.reused_count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.statuses)
+
+    def append(
+        self,
+        participant_name: str,
+        email: Optional[str],
+        ok: bool,
+        value: str,
+        stages: Optional[Dict[str, float]] = None
+    ) -> int:
+        """
+        Add a row; `value` is the filename on success or the error otherwise
+        `stages` are the row's render stage timings. Returns its index.
+        """
+        with self._lock:
+            for stage, seconds in (stages or {}).items():
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.names.append(participant_name)
+            self.emails.append(email)
+            self.filenames.append(value if ok else None)
+            self.errors.append(None if ok else value)
+            self.unique_ids.append(None)
+            self.statuses.append(STATUS_SUCCEEDED if ok else STATUS_FAILED)
+            return len(self.statuses) - 1
+
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        """Count time spent on the batch as a whole (e.g. zipping it)"""
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def stage_breakdown(self) -> Dict[str, float]:
+        """Total seconds per render stage, rounded for reporting"""
+        with self._lock:
+            return {stage: round(seconds, 6) for stage, seconds in self.stage_seconds.items()}
+
+    @property
+    def success_count(self) -> int:
+        return self.statuses.count(STATUS_SUCCEEDED)
+
+    @property
+    def failed_count(self) -> int:
+        return self.statuses.count(STATUS_FAILED)
+
+    def succeeded(self, index: int) -> bool:
+        return self.statuses[index] == STATUS_SUCCEEDED
+
+    def file_path(self, index: int) -> str:
+        return os.path.join(self.output_dir, self.filenames[index])
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """The row at `index` as a result dict"""
+        with self._lock:
+            if self.statuses[index] != STATUS_SUCCEEDED:
+                return {
+                    "participant_name": self.names[index],
+                    "email": self.emails[index],
+                    "error": self.errors[index]
+                }
+            record = {
+                "participant_name": self.names[index],
+                "email": self.emails[index],
+                "filename": self.filenames[index],
+                "file_path": self.file_path(index)
+            }
+            if self.unique_ids[index] is not None:
+                record["unique_id"] = self.unique_ids[index]
+            return record
+
+    def indexes(self, status: Optional[int] = None) -> List[int]:
+        """Row indexes, optionally only those with `status`"""
+        with self._lock:
+            if status is None:
+                return list(range(len(self.statuses)))
+            return [i for i, code in enumerate(self.statuses) if code == status]
+
+    def successful(self) -> List[Dict[str, Any]]:
+        return [self.record(i) for i in self.indexes(STATUS_SUCCEEDED)]
+
+    def failed(self) -> List[Dict[str, Any]]:
+        return [self.record(i) for i in self.indexes(STATUS_FAILED)]
+
+    def page(self, offset: int = 0, limit: int = 100, status: Optional[int] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Return (total matching rows, result dicts for one page of them)
+        Each dict also carries the row's `index` and `status`.
+        """
+        matching = self.indexes(status)
+        page = []
+        for index in matching[offset:offset + limit]:
+            record = self.record(index)
+            record["index"] = index
+            record["status"] = STATUS_NAMES[self.statuses[index]]
+            page.append(record)
+        return len(matching), page
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "success_count": self.statuses.count(STATUS_SUCCEEDED),
+                "failed_count": self.statuses.count(STATUS_FAILED),
+                "total_count": len(self.statuses)
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary plus every result dict (the generate_bulk_certificates shape)"""
+        return {
+            "successful_certificates": self.successful(),
+            "failed_certificates": self.failed(),
+            **self.summary(),
+            "batch_id": self.batch_id,
+            "reused_count": self.reused_count
+        }
+
+
+def render_cache_id(event_name: str, date_issued: str, certificate_type: str, output_format: str) -> str:
+    """
+    Stable id of an event's render cache: every bulk run for the same
+    event, date, type and output format renders into its directory and
+    can reuse the files earlier runs left there
+    """
+    digest = hashlib.sha256()
+    for part in (event_name, date_issued, certificate_type, output_format):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def render_cache_dir(output_root: str, cache_id: str) -> str:
+    """Directory a cached run renders into; no two events share files"""
+    return os.path.join(output_root, cache_id)
+
+
+def new_batch_id() -> str:
+    """Id of one bulk run's results; never shared, even by identical uploads"""
+    return secrets.token_hex(8)
+
+
+def batch_path(output_root: str, batch_id: str) -> str:
+    """Where a cached run's results are saved (see save_batch)"""
+    return os.path.join(output_root, "runs", f"{batch_id}.json")
+
+
+def file_sha256(path: str) -> str:
+    """Hex sha256 of a file's contents"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on `path` (created if needed) across processes"""
+    with open(path, "a") as f:
+        if fcntl is None:
+            # No flock (Windows): only threads of this process are excluded
+            with _manifest_lock:
+                yield
+            return
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
         try:
-            # Handle different possible column names
-            name_fields = ['participant_name', 'name', 'full_name', 'participant']
-            email_fields = ['email', 'email_address', 'participant_email']
-            
-            participant_name = None
-            email = None
-            
-            # Find participant name
-            for field in name_fields:
-                if field in row and row[field].strip():
-                    participant_name = row[field].strip()
-                    break
-            
-            # Find email (optional)
-            for field in email_fields:
-                if field in row and row[field].strip():
-                    email = row[field].strip()
-                    break
-            
-            if not participant_name:
-                logger.warning(f"Row {row_num}: Missing participant name, skipping")
-                continue
-                
-            participants.append(BulkCertificateItem(
-                participant_name=participant_name,
-                email=email
-            ))
-            
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class BatchManifest:
+    """
+    Record of each participant rendered into a render cache directory
+    Stored as JSON in the directory (see render_cache_dir). Entries are
+    keyed by the participant's render fingerprint (name, event, date,
+    type, format and template/font versions), so a run can skip every
+    row whose inputs are unchanged and whose file is still on disk with
+    the recorded digest, and render only missing, failed or changed ones.
+    Entries keep the certificate's unique_id across runs.
+    Runs sharing the directory may overlap: save merges this run's
+    entries into the file under a lock instead of overwriting it.
+    """
+
+    VERSION = 3
+
+    def __init__(self, output_dir: str, cache_id: str):
+        self.output_dir = output_dir
+        self.cache_id = cache_id
+        self.path = os.path.join(output_dir, "manifest.json")
+        # input hash -> {"participant_name", "status", "filename" and "sha256" or "error", "unique_id"}
+        self.entries: Dict[str, Dict[str, Optional[str]]] = {}
+        # Entries written by this run since its last save
+        self._updated: Dict[str, Dict[str, Optional[str]]] = {}
+
+    def _read_entries(self) -> Dict[str, Dict[str, Optional[str]]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return {}
+        if data.get("version") != self.VERSION or data.get("cache_id") != self.cache_id:
+            return {}
+        return data.get("entries", {})
+
+    @classmethod
+    def load(cls, output_dir: str, cache_id: str) -> "BatchManifest":
+        """Read the directory's manifest, starting empty if it is missing or unreadable"""
+        manifest = cls(output_dir, cache_id)
+        manifest.entries = manifest._read_entries()
+        return manifest
+
+    def reusable(self, input_hash: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Entry of an earlier successful render of these inputs, if its file
+        is still on disk and unchanged since it was written
+        """
+        entry = self.entries.get(input_hash)
+        if entry is None or entry.get("status") != STATUS_NAMES[STATUS_SUCCEEDED]:
+            return None
+        filename = entry.get("filename")
+        if not filename:
+            return None
+        try:
+            if file_sha256(os.path.join(self.output_dir, filename)) != entry.get("sha256"):
+                return None
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def unique_id(self, input_hash: str) -> Optional[str]:
+        """Certificate id recorded for these inputs by an earlier run, if any"""
+        entry = self.entries.get(input_hash)
+        return entry.get("unique_id") if entry is not None else None
+
+    def update(
+        self,
+        input_hash: str,
+        participant_name: str,
+        ok: bool,
+        value: str,
+        sha256: Optional[str] = None,
+        unique_id: Optional[str] = None
+    ) -> None:
+        status = STATUS_SUCCEEDED if ok else STATUS_FAILED
+        entry = {
+            "participant_name": participant_name,
+            "status": STATUS_NAMES[status],
+            "filename" if ok else "error": value,
+            "unique_id": unique_id
+        }
+        if ok:
+            entry["sha256"] = sha256
+        self.entries[input_hash] = entry
+        self._updated[input_hash] = entry
+
+    def save(self) -> None:
+        """
+        Merge this run's entries into the manifest on disk and write it
+        atomically, so an interrupted run leaves the last complete version
+        behind and entries saved meanwhile by other runs are kept
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        with _file_lock(f"{self.path}.lock"):
+            entries = self._read_entries()
+            entries.update(self._updated)
+            write_json(self.path, {"version": self.VERSION, "cache_id": self.cache_id, "entries": entries})
+        self.entries = entries
+        self._updated = {}
+
+
+def write_json(path: str, data: Any) -> None:
+    """Write JSON under a temporary name and rename it into place"""
+    partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(partial_path, path)
+
+
+def batch_state(batch: ParticipantBatch, output_root: str) -> Dict[str, Any]:
+    """JSON-ready columns of `batch`, with its output_dir relative to `output_root`"""
+    with batch._lock:
+        return {
+            "output_dir": os.path.relpath(batch.output_dir, output_root),
+            "reused_count": batch.reused_count,
+            "stage_seconds": dict(batch.stage_seconds),
+            "names": list(batch.names),
+            "emails": list(batch.emails),
+            "filenames": list(batch.filenames),
+            "errors": list(batch.errors),
+            "unique_ids": list(batch.unique_ids),
+            "statuses": batch.statuses.tolist()
+        }
+
+
+def batch_from_state(data: Dict[str, Any], output_root: str) -> ParticipantBatch:
+    """Rebuild a batch from batch_state columns saved under `output_root`"""
+    batch = ParticipantBatch(os.path.join(output_root, data["output_dir"]))
+    batch.reused_count = data["reused_count"]
+    batch.stage_seconds = data.get("stage_seconds", {})
+    batch.names = data["names"]
+    batch.emails = data["emails"]
+    batch.filenames = data["filenames"]
+    batch.errors = data["errors"]
+    batch.unique_ids = data["unique_ids"]
+    batch.statuses = array("B", data["statuses"])
+    return batch
+
+
+def save_batch(output_root: str, batch: ParticipantBatch) -> None:
+    """
+    Save a cached run's results under `output_root`, so any process can
+    page and download them by the run's batch_id (see load_batch)
+    """
+    path = batch_path(output_root, batch.batch_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_json(path, {"version": BATCH_VERSION, "batch_id": batch.batch_id, **batch_state(batch, output_root)})
+
+
+class RenderResult(NamedTuple):
+    """Outcome of one participant's render, as returned from a pool worker"""
+    ok: bool
+    # Filename on success, error message on failure
+    value: str
+    # Render fingerprint, with the version of the layout actually drawn
+    input_hash: Optional[str]
+    # Digest of the written file, on success
+    sha256: Optional[str]
+    stages: Dict[str, float]
+    # End-to-end time of the task in the worker
+    seconds: float
+
+
+def certificate_filename(participant_name: str, date_issued: str, input_hash: str, output_format: str) -> str:
+    """
+    File name of a bulk certificate
+    Names differing only in punctuation ("O'Brien", "OBrien") strip to
+    the same text, so the render fingerprint keeps their files apart.
+    """
+    safe_name = "".join(c for c in participant_name if c.isalnum() or c in (' ', '-', '_')).replace(' ', '_')
+    return f"{safe_name}_{date_issued}_{input_hash[:12]}_cert.{get_output_format(output_format).extension}"
+
+
+def _render_participant(task: Tuple[str, str, str, str, str, str]) -> RenderResult:
+    """
+    Render a single participant's certificate.
+    Runs inside a pool worker, so it takes and returns only plain data,
+    including the render's stage timings for the parent to record.
+    """
+    participant_name, event_name, date_issued, certificate_type, output_dir, output_format = task
+    start = time.perf_counter()
+    input_hash = None
+    with collect_stages() as stages:
+        try:
+            # Generate certificate on the shared event/date base
+            renderer = get_batch_renderer(event_name, date_issued, certificate_type)
+            input_hash = certificate_fingerprint(
+                participant_name, event_name, date_issued, certificate_type, output_format, renderer.layout.version
+            )
+            filename = certificate_filename(participant_name, date_issued, input_hash, output_format)
+            data = renderer.generate(participant_name, os.path.join(output_dir, filename), output_format)
+            sha256 = hashlib.sha256(data).hexdigest()
+
+            return RenderResult(True, filename, input_hash, sha256, stages, time.perf_counter() - start)
+
         except Exception as e:
-            logger.error(f"Error processing row {row_num}: {e}")
-            continue
+            logger.error(f"Failed to generate certificate for {participant_name}: {e}")
+            return RenderResult(False, str(e), input_hash, None, stages, time.perf_counter() - start)
+
+
+def render_bulk_batch(
+    event_name: str,
+    date_issued: str,
+    participants: Iterable[Union[BulkCertificateItem, ParticipantRecord]],
+    output_dir: str = BULK_OUTPUT_DIR,
+    certificate_type: str = "participation",
+    max_workers: Optional[int] = None,
+    batch: Optional[ParticipantBatch] = None,
+    on_result: Optional[Callable[[int], None]] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    cache_id: Optional[str] = None
+) -> ParticipantBatch:
+    """
+    Generate certificates for multiple participants into a columnar batch
+    `participants` may be a lazy iterable (e.g. a CSV being parsed); it is
+    consumed BULK_CHUNK_SIZE items at a time, so only one chunk of inputs
+    is in flight. Chunks of at least PARALLEL_THRESHOLD are rendered on the
+    process pool; rows keep the order of `participants`. Results are
+    appended to `batch` (a new one by default) and `on_result` is called
+    with each row's index as it finishes, for progress reporting.
+    Files are written in `output_format` (see encoders.OUTPUT_FORMATS).
+    Stage timings from the workers go to the render metrics and are summed
+    into `batch.stage_seconds`.
+    With `cache_id` the run renders into that render cache directory under
+    `output_dir`, tracked in its BatchManifest (saved after every chunk):
+    rows already rendered from the same inputs by an earlier, possibly
+    interrupted, run are reused instead of redrawn, under the same
+    unique_id. The run gets a batch_id of its own, and its results are
+    saved under `output_dir` once it finishes (see load_batch).
+    """
+    get_output_format(output_format)
+    output_root = output_dir
+    if cache_id:
+        output_dir = render_cache_dir(output_root, cache_id)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max_workers or BULK_MAX_WORKERS
+    batch = batch if batch is not None else ParticipantBatch(output_dir)
+    manifest = BatchManifest.load(output_dir, cache_id) if cache_id else None
+    if manifest is not None:
+        batch.output_dir = output_dir
+        batch.batch_id = new_batch_id()
     
-    return participants
+    for chunk in _iter_chunks(participants, BULK_CHUNK_SIZE):
+        if manifest is not None:
+            # One layout lookup per chunk rather than per participant
+            layout_version = layout_registry.version(certificate_type)
+            reused = [
+                manifest.reusable(certificate_fingerprint(
+                    p.participant_name, event_name, date_issued, certificate_type, output_format, layout_version
+                ))
+                for p in chunk
+            ]
+        else:
+            reused = [None] * len(chunk)
+
+        tasks = [
+            (p.participant_name, event_name, date_issued, certificate_type, output_dir, output_format)
+            for p, entry in zip(chunk, reused) if entry is None
+        ]
+
+        if workers > 1 and len(tasks) >= PARALLEL_THRESHOLD:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            results = get_bulk_executor(workers).map(_render_participant, tasks, chunksize=chunksize)
+        else:
+            results = map(_render_participant, tasks)
+        results = iter(results)
+        
+        for participant, entry in zip(chunk, reused):
+            if entry is not None:
+                index = batch.append(participant.participant_name, participant.email, True, entry["filename"])
+                batch.unique_ids[index] = entry.get("unique_id")
+                batch.reused_count += 1
+            else:
+                result = next(results)
+                observe_stages(result.stages)
+                RENDER_SECONDS.observe(result.seconds, kind="bulk")
+                if result.ok:
+                    CERTIFICATES_RENDERED.inc(kind="bulk", format=output_format)
+                else:
+                    CERTIFICATE_FAILURES.inc(kind="bulk")
+                index = batch.append(participant.participant_name, participant.email, result.ok, result.value, result.stages)
+                # Recorded under the layout version the worker drew with,
+                # even if the layout changed on disk while the chunk rendered
+                if manifest is not None and result.input_hash is not None:
+                    unique_id = None
+                    if result.ok:
+                        # Re-rendered rows keep the id of their earlier render
+                        unique_id = manifest.unique_id(result.input_hash) or generate_unique_id()
+                        batch.unique_ids[index] = unique_id
+                    manifest.update(
+                        result.input_hash, participant.participant_name, result.ok, result.value, result.sha256, unique_id
+                    )
+            if on_result is not None:
+                on_result(index)
+
+        if manifest is not None:
+            manifest.save()
+
+    if manifest is not None:
+        save_batch(output_root, batch)
+    return batch
 
 
 def generate_bulk_certificates(
     event_name: str,
     date_issued: str,
-    participants: List[BulkCertificateItem],
-    output_dir: str = "certificates/bulk"
+    participants: Iterable[Union[BulkCertificateItem, ParticipantRecord]],
+    output_dir: str = BULK_OUTPUT_DIR,
+    certificate_type: str = "participation",
+    max_workers: Optional[int] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    resume: bool = True
 ) -> Dict[str, Any]:
     """
     Generate certificates for multiple participants
     Returns summary of successful and failed generations
+    with a dict per participant; see render_bulk_batch for the columnar form
+    Unless `resume` is False, the run renders into its event's render cache
+    (see render_cache_id), so rerunning it only renders missing or changed
+    entries.
     """
-    os.makedirs(output_dir, exist_ok=True)
-    
-    successful = []
-    failed = []
-    
-    for participant in participants:
-        try:
-            # Generate unique filename
-            safe_name = "".join(c for c in participant.participant_name if c.isalnum() or c in (' ', '-', '_')).replace(' ', '_')
-            filename = f"{safe_name}_{date_issued}_cert.png"
-            output_path = os.path.join(output_dir, filename)
-            
-            # Generate certificate
-            generate_certificate(
-                participant.participant_name,
-                event_name,
-                date_issued,
-                output_path
-            )
-            
-            successful.append({
-                "participant_name": participant.participant_name,
-                "email": participant.email,
-                "filename": filename,
-                "file_path": output_path
-            })
-            
-        except Exception as e:
-            logger.error(f"Failed to generate certificate for {participant.participant_name}: {e}")
-            failed.append({
-                "participant_name": participant.participant_name,
-                "email": participant.email,
-                "error": str(e)
-            })
-    
-    return {
-        "successful_certificates": successful,
-        "failed_certificates": failed,
-        "success_count": len(successful),
-        "failed_count": len(failed),
-        "total_count": len(participants)
-    }
+    cache_id = render_cache_id(event_name, date_issued, certificate_type, output_format) if resume else None
+    return render_bulk_batch(
+        event_name,
+        date_issued,
+        participants,
+        output_dir=output_dir,
+        certificate_type=certificate_type,
+        max_workers=max_workers,
+        output_format=output_format,
+        cache_id=cache_id
+    ).to_dict()
+
+
+def load_batch(output_root: str, batch_id: str) -> Optional[ParticipantBatch]:
+    """
+    Results of a cached run saved under `output_root`, read from disk, or
+    None if there is no such run
+    """
+    try:
+        with open(batch_path(output_root, batch_id), encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    if data.get("version") != BATCH_VERSION or data.get("batch_id") != batch_id:
+        return None
+    batch = batch_from_state(data, output_root)
+    batch.batch_id = batch_id
+    return batch
 
 
-def create_certificates_zip(certificates: List[Dict], output_dir: str) -> str:
+def create_certificates_zip(
+    certificates: List[Dict],
+    output_dir: str,
+    zip_filename: Optional[str] = None,
+    batch_id: Optional[str] = None
+) -> str:
     """
     Create a ZIP file containing all generated certificates
+    PNGs are already compressed, so entries are STORED rather than deflated
+    The archive is named after `batch_id`; without one, an id is derived
+    from the archived files' paths and versions so different batches, or
+    later renders of the same files, never share a name.
     Returns the path to the ZIP file
     """
-    zip_filename = f"certificates_bulk_{len(certificates)}_files.zip"
+    if zip_filename is None:
+        if batch_id is None:
+            digest = hashlib.sha256()
+            for cert in certificates:
+                try:
+                    stat = os.stat(cert["file_path"])
+                    version = f"{stat.st_mtime_ns}_{stat.st_size}"
+                except FileNotFoundError:
+                    version = "missing"
+                digest.update(f"{os.path.abspath(cert['file_path'])}\0{version}\0".encode("utf-8"))
+            batch_id = digest.hexdigest()[:16]
+        zip_filename = f"certificates_bulk_{batch_id}.zip"
     zip_path = os.path.join(output_dir, zip_filename)
+    # Written under a temporary name, so a download never sees a partial archive
+    partial_path = f"{zip_path}.{os.getpid()}.{threading.get_ident()}.part"
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    with span("zip"), zipfile.ZipFile(partial_path, 'w', zipfile.ZIP_STORED) as zipf:
         for cert in certificates:
             if os.path.exists(cert["file_path"]):
                 # Add file to zip with just the filename (not full path)
                 zipf.write(cert["file_path"], cert["filename"])
+    os.replace(partial_path, zip_path)
     
     return zip_path
+
+
+def batch_archive_filename(batch_id: str) -> str:
+    return f"certificates_bulk_{batch_id}.zip"
+
+
+def write_certificates_zip(certificates: Iterable[Dict], path: str) -> str:
+    """
+    Write the archive iter_certificates_zip streams for `certificates` to
+    `path`, byte for byte, so a download streamed earlier can be resumed
+    with Range requests against the file
+    Written under a temporary name, so a download never sees a partial archive.
+    """
+    partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    with span("zip"), open(partial_path, "wb") as f:
+        for chunk in iter_certificates_zip(certificates):
+            f.write(chunk)
+    os.replace(partial_path, path)
+    return path
+
+
+def create_batch_archive(batch: ParticipantBatch) -> str:
+    """
+    Write the archive of a cached run into its render cache directory and
+    return its path; archives past their retention are pruned meanwhile
+    """
+    path = write_certificates_zip(batch.successful(), os.path.join(batch.output_dir, batch_archive_filename(batch.batch_id)))
+    prune_archives(os.path.dirname(batch.output_dir))
+    return path
+
+
+def prune_archives(output_root: str, max_age: float = BULK_ARCHIVE_RETENTION_SECONDS) -> int:
+    """
+    Delete ZIP archives under `output_root` (and its batch and job
+    directories) written more than `max_age` seconds ago, along with
+    leftovers of interrupted writes. Returns the number of files removed.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    for pattern in ("*.zip", "*.zip.*part", os.path.join("*", "*.zip"), os.path.join("*", "*.zip.*part")):
+        for path in glob.glob(os.path.join(output_root, pattern)):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                # Already removed, or replaced by a concurrent rebuild
+                pass
+    return removed
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """
+    Write-only, non-seekable sink for ZipFile that lets the caller drain
+    the archive bytes as they are produced
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_certificates_zip(certificates: Iterable[Dict], chunk_size: int = ZIP_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive of the given certificates without writing it to disk
+    `certificates` may be a lazy iterable (e.g. results of a running job);
+    each entry is emitted as soon as it is available. Entries are STORED.
+    """
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+        for cert in certificates:
+            file_path = cert["file_path"]
+            if not os.path.exists(file_path):
+                continue
+            
+            info = zipfile.ZipInfo.from_file(file_path, cert["filename"])
+            info.compress_type = zipfile.ZIP_STORED
+            with open(file_path, 'rb') as src, zipf.open(info, 'w') as dest:
+                for data in iter(lambda: src.read(chunk_size), b""):
+                    dest.write(data)
+                    yield buffer.drain()
+    # Closing the archive writes the trailing data descriptor and central directory
+    data = buffer.drain()
+    if data:
+        yield data
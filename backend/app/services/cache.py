@@ -0,0 +1,115 @@
+"""
+Template and Font Cache
+Process-wide cache for decoded certificate templates and loaded fonts
+"""
+
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Tuple, Union
+
+from PIL import Image, ImageFont
+
+from .shared_rasters import private_copy, shared_raster
+
+FontType = Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]
+
+_lock = threading.Lock()
+
+# path -> (mtime_ns, pristine decoded template)
+_templates: Dict[str, Tuple[int, Image.Image]] = {}
+
+# (path, size) -> loaded font
+_fonts: Dict[Tuple[str, int], FontType] = {}
+
+
+def get_template(path: str) -> Image.Image:
+    """
+    Return a private copy of the decoded template at `path`.
+
+    The template is decoded once per process and kept as a pristine copy;
+    it is reloaded when the file's mtime changes. Raises FileNotFoundError
+    if the template does not exist.
+    """
+    return private_copy(get_template_base(path))
+
+
+def get_template_base(path: str) -> Image.Image:
+    """
+    Return the shared pristine template image for `path`.
+
+    The returned image must not be drawn on; use `get_template` for a copy.
+    Decoded pixels are published as a shared raster, so other processes
+    on the host map them instead of decoding the file again.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    mtime = stat.st_mtime_ns
+
+    cached = _templates.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _lock:
+        cached = _templates.get(path)
+        if cached is None or cached[0] != mtime:
+            image = shared_raster(
+                f"template_{hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]}",
+                f"{mtime}_{stat.st_size}",
+                lambda: _decode(path)
+            )
+            cached = (mtime, image)
+            _templates[path] = cached
+    return cached[1]
+
+
+def _decode(path: str) -> Image.Image:
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+@lru_cache(maxsize=1024)
+def _file_sha256(path: str, mtime_ns: int, size: int) -> str:
+    """sha256 of an asset file; keyed by its stat so a rewritten file is hashed again"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def file_version(path: str) -> str:
+    """
+    Version tag for an asset file: the sha256 of its content
+    Unlike its mtime, this is the same on every host and survives
+    checkouts and redeploys, so content hashes built from it stay stable.
+    Only rehashed when the file's mtime or size changes.
+    Returns "missing" if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+        return _file_sha256(path, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return "missing"
+
+
+def get_font(path: str, size: int) -> FontType:
+    """
+    Return a TrueType font for `path` at `size`, loading it once per process.
+
+    `path` may be a file path or a font name resolved by FreeType (e.g.
+    "arialbd.ttf"). Raises IOError if the font cannot be loaded.
+    """
+    key = (path, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = ImageFont.truetype(path, size)
+        with _lock:
+            font = _fonts.setdefault(key, font)
+    return font
+
+
+def clear_cache() -> None:
+    """Drop all cached templates and fonts"""
+    with _lock:
+        _templates.clear()
+        _fonts.clear()
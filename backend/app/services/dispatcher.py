@@ -0,0 +1,106 @@
+"""
+Render Dispatcher
+Runs blocking render work off the event loop on a bounded thread pool,
+rejecting work once the pool and its queue are full
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+import logging
+
+from .metrics import Gauge, registry
+
+logger = logging.getLogger(__name__)
+
+# Renders running at once; Pillow releases the GIL while drawing and
+# encoding, so threads scale with cores without pickling images
+RENDER_CONCURRENCY = int(os.getenv("RENDER_CONCURRENCY", "0")) or os.cpu_count() or 1
+
+# Renders allowed to wait for a free thread before new ones are rejected
+RENDER_QUEUE_DEPTH = int(os.getenv("RENDER_QUEUE_DEPTH", "64"))
+
+# Seconds clients are asked to wait before retrying a rejected render
+RENDER_RETRY_AFTER = int(os.getenv("RENDER_RETRY_AFTER", "1"))
+
+
+class DispatcherSaturated(Exception):
+    """Raised when a render is submitted while the pool and its queue are full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Render queue is full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RenderDispatcher:
+    """
+    Bounded executor for CPU-bound render work called from async handlers
+    At most `max_workers` renders run at once and `queue_depth` more wait;
+    beyond that `run` fails fast with DispatcherSaturated so latency stays
+    bounded under bursts instead of growing with the backlog.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = RENDER_CONCURRENCY,
+        queue_depth: int = RENDER_QUEUE_DEPTH,
+        retry_after: int = RENDER_RETRY_AFTER
+    ):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_workers + queue_depth)
+        self._in_flight = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """Renders running or waiting"""
+        return self._in_flight
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="render")
+            return self._executor
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the pool and await its result"""
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"Render queue full ({self.max_workers} running, {self.queue_depth} queued)")
+            raise DispatcherSaturated(self.retry_after)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release(None)
+            raise
+        # The slot is freed when the work finishes, even if the caller
+        # disconnects and stops awaiting it
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Wait for running renders and stop the threads"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+render_dispatcher = RenderDispatcher()
+
+registry.register(Gauge(
+    "certificate_renders_in_flight", "Single-certificate renders running or queued",
+    lambda: render_dispatcher.in_flight
+))
@@ -0,0 +1,97 @@
+"""
+Font Registry
+Resolves font families once per process and hands out cached sized fonts
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+import logging
+
+from PIL import ImageFont
+
+from .cache import file_version, get_font, FontType
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_FONT = os.path.join(os.path.dirname(__file__), "..", "..", "templates", "GoogleSans-Bold.ttf")
+
+# Candidates per family, tried in order: system fonts (Windows/macOS names
+# first, then common Linux equivalents), then the font bundled with the app
+FONT_FAMILIES: Dict[str, List[str]] = {
+    "regular": ["arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf", "DejaVuSans.ttf", BUNDLED_FONT],
+    "bold": ["arialbd.ttf", "Arial Bold.ttf", "LiberationSans-Bold.ttf", "DejaVuSans-Bold.ttf", BUNDLED_FONT],
+}
+
+
+class FontRegistry:
+    """
+    Maps font families to font files, probing candidates only once
+    A path configured in CERTIFICATE_FONT_<FAMILY> (e.g.
+    CERTIFICATE_FONT_BOLD=/fonts/Inter-Bold.ttf) is tried before the
+    built-in candidates. Families with no loadable candidate use Pillow's
+    default font.
+    """
+
+    def __init__(self, families: Dict[str, List[str]] = FONT_FAMILIES):
+        self.families = families
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._defaults: Dict[int, FontType] = {}
+        self._lock = threading.Lock()
+
+    def _candidates(self, family: str) -> List[str]:
+        configured = os.getenv(f"CERTIFICATE_FONT_{family.upper()}")
+        candidates = list(self.families.get(family, []))
+        return [configured] + candidates if configured else candidates
+
+    def resolve(self, family: str) -> Optional[str]:
+        """Return the font file used for `family`, or None for the default font"""
+        if family in self._resolved:
+            return self._resolved[family]
+
+        with self._lock:
+            if family not in self._resolved:
+                path = None
+                for candidate in self._candidates(family):
+                    try:
+                        font = get_font(candidate, 12)
+                    except IOError:
+                        continue
+                    # Keep the full path Pillow found so later sizes skip the search
+                    path = getattr(font, "path", candidate)
+                    logger.info(f"Font family '{family}' resolved to {path}")
+                    break
+                if path is None:
+                    logger.warning(f"No font found for family '{family}'; using the default font")
+                self._resolved[family] = path
+        return self._resolved[family]
+
+    def get(self, family: str, size: int) -> FontType:
+        """Return the `family` font at `size`, loaded once per process"""
+        path = self.resolve(family)
+        if path is not None:
+            return get_font(path, size)
+
+        font = self._defaults.get(size)
+        if font is None:
+            font = ImageFont.load_default(size)
+            self._defaults[size] = font
+        return font
+
+    def version(self) -> str:
+        """
+        Version tag of the resolved fonts, changing when a family resolves to
+        another file or a font file changes; for keying rasters drawn with them
+        """
+        parts = []
+        for family in sorted(self.families):
+            path = self.resolve(family)
+            parts.append(f"{family}={path}:{file_version(path)}" if path is not None else f"{family}=default")
+        return "|".join(parts)
+
+    def active_fonts(self) -> Dict[str, str]:
+        """Report the font file (or "default") in use for every family"""
+        return {family: self.resolve(family) or "default" for family in self.families}
+
+
+font_registry = FontRegistry()
@@ -1,80 +1,111 @@
-from PIL import Image, ImageDraw, ImageFont
+import hashlib
+import logging
 import os
+import threading
 from ..models.certificates import CertificateBase
+from .encoders import DEFAULT_OUTPUT_FORMAT, encode
+from .layouts import TEMPLATE_DIR, layout_registry
+from .metrics import span
+
+logger = logging.getLogger(__name__)
+
+# Bump when layout code changes so content hashes of old renders stop matching
+RENDER_VERSION = 1
+
+def warm_cache():
+    """Compile every layout (templates and fonts) so the first render in a process is not cold"""
+    for name in layout_registry.names():
+        layout_registry.get(name)
 
 def generate_certificate_from_model(cert_data: CertificateBase, output_path="certificate.png"):
     # Now you can access cert_data.name, cert_data.event, cert_data.date
     return generate_certificate(cert_data.participant_name, cert_data.event_name, cert_data.date_issued, cert_data.certificate_type, output_path)
 
 def generate_certificate(name, event, date, type, output_path="certificate.png"):
-    # Debug: show where it will save
-    print("Saving certificate at:", os.path.abspath(output_path))
-    
-    # Load the certificate template PNG
-    if type == "completion":
-        template_path = os.path.join(os.path.dirname(__file__), "..", "..", "templates", "certificate_template_completion.png")
-    else:
-        template_path = os.path.join(os.path.dirname(__file__), "..", "..", "templates", "certificate_template_participation.png")
-
-    try:
-        certificate = Image.open(template_path)
-        print(f"✅ Loaded template from: {template_path}")
-    except FileNotFoundError:
-        print(f"⚠️ Template not found at {template_path}. Creating blank certificate.")
-        # Fallback to blank certificate if template not found
-        certificate = Image.new("RGB", (1200, 850), color="#f8f9fa")
-    
-    width, height = certificate.size
-    draw = ImageDraw.Draw(certificate)
-    width, height = certificate.size
-    draw = ImageDraw.Draw(certificate)
-    
-    # Load Google Sans fonts with fallback
-    font_dir = os.path.join(os.path.dirname(__file__), "..", "..", "templates")
-    try:
-        # Google Sans Bold for name (29.07px ≈ 29pt)
-        font_name = ImageFont.truetype(os.path.join(font_dir, "GoogleSans-Bold.ttf"), 29)
-        # Google Sans Bold for event and date (16.15px ≈ 16pt)
-        font_event_date = ImageFont.truetype(os.path.join(font_dir, "GoogleSans-Bold.ttf"), 16)
-        print("✅ Google Sans fonts loaded successfully")
-    except IOError:
-        print("⚠️ Google Sans fonts not found. Using fallback fonts.")
-        try:
-            # Fallback to Arial Bold
-            font_name = ImageFont.truetype("arialbd.ttf", 29)
-            font_event_date = ImageFont.truetype("arialbd.ttf", 16)
-        except IOError:
-            print("⚠️ Arial fonts not found. Using default font.")
-            font_name = ImageFont.load_default()
-            font_event_date = ImageFont.load_default()
-    
-    # Helper function to left-align text with letter spacing at a fixed margin
-    def left_align_text(text, y, font, color="black", letter_spacing=-0.04, margin=45):
-        x = margin
-        if letter_spacing != 0:
-            for char in text:
-                draw.text((x, y), char, font=font, fill=color)
-                bbox = draw.textbbox((0, 0), char, font=font)
-                char_width = bbox[2] - bbox[0]
-                # Negative letter spacing shrinks the space between characters
-                x += char_width + (char_width * letter_spacing / len(text))
-        else:
-            draw.text((x, y), text, font=font, fill=color)
-
-    # Overlay text on the template, left-aligned at 45px margin
-    if type == "completion":
-        left_align_text(name, height // 2 - 15, font_name, "#000000")
-        left_align_text(event, height // 2 + 57, font_event_date, "#000000")
-        left_align_text(date, height // 2 + 78, font_event_date, "#000000", margin=120)
-    else:
-        left_align_text(name, height // 2 - 15, font_name, "#000000")
-        left_align_text(event, height // 2 + 57, font_event_date, "#000000")
-        left_align_text(date, height // 2 + 78, font_event_date, "#000000", margin=160)
-
-    # Save file
-    certificate.save(output_path)
+    logger.debug("Saving certificate at: %s", os.path.abspath(output_path))
+
+    certificate = render_certificate(name, event, date, type)
+
+    # Save file (Pillow picks the encoder from the extension)
+    with span("write"):
+        certificate.save(output_path)
     return output_path
 
+def generate_certificate_bytes(name, event, date, type, output_format=DEFAULT_OUTPUT_FORMAT, layout=None):
+    """Render a certificate and return it encoded without touching the filesystem"""
+    return encode_certificate(render_certificate(name, event, date, type, layout), output_format)
+
+def encode_certificate(certificate, output_format=DEFAULT_OUTPUT_FORMAT):
+    """Encode a rendered certificate image (PNG by default; see encoders.OUTPUT_FORMATS)"""
+    with span("encode"):
+        return encode(certificate, output_format)
+
+def render_certificate(name, event, date, type, layout=None):
+    """
+    Draw the participant, event and date onto a copy of the template
+    `layout` is the type's compiled layout, when the caller already looked it up.
+    """
+    layout = layout if layout is not None else layout_registry.get(type)
+    return layout.render(_field_values(name, event, date, type))
+
+def _field_values(name, event, date, type):
+    """Values for the layout's fields (see templates/layouts.json)"""
+    return {"participant_name": name, "event_name": event, "date_issued": date, "certificate_type": type}
+
+def certificate_fingerprint(name, event, date, type, output_format=DEFAULT_OUTPUT_FORMAT, layout_version=None):
+    """
+    Content hash of the render inputs, output format and layout version
+    (its spec, template and fonts). Identical fingerprints render identical certificates.
+    Pass `layout_version` when the caller already has the layout or its version.
+    """
+    if layout_version is None:
+        layout_version = layout_registry.version(type)
+    digest = hashlib.sha256()
+    parts = (RENDER_VERSION, name, event, date, type, output_format, layout_version)
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class CertificateBatchRenderer:
+    """
+    Renders many certificates that share an event, date and type
+    The layout's static fields (event and date) are baked once; each
+    certificate only copies that base and draws the participant name.
+    """
+
+    def __init__(self, event, date, type, layout=None):
+        self.event = event
+        self.date = date
+        self.type = type
+        self.layout = layout if layout is not None else layout_registry.get(type)
+        self.base = self.layout.render_base(_field_values(None, event, date, type))
+
+    def render(self, name):
+        """Return a certificate image for `name`"""
+        with span("copy"):
+            certificate = self.base.copy()
+        self.layout.draw_dynamic(certificate, {"participant_name": name})
+        return certificate
+
+    def generate(self, name, output_path, output_format=DEFAULT_OUTPUT_FORMAT):
+        """
+        Render a certificate for `name`, save it to `output_path` and return
+        the encoded bytes
+        Written to a temporary name and renamed, so workers writing the same
+        path at once never leave a torn file.
+        """
+        data = encode_certificate(self.render(name), output_format)
+        partial_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.part"
+        with span("write"):
+            with open(partial_path, "wb") as f:
+                f.write(data)
+            os.replace(partial_path, output_path)
+        return data
+
+    def __repr__(self):
+        return f"CertificateBatchRenderer(event={self.event}, date={self.date}, type={self.type})"
+
 if __name__ == "__main__":
     data = CertificateBase(
         participant_name="Jane Doe",
@@ -0,0 +1,377 @@
+"""
+Bulk Certificate Job Queue
+Runs bulk generation in the background and tracks per-job progress
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, Optional, Sized
+from uuid import uuid4
+import logging
+
+from ..models.certificates import BulkCertificateItem
+from .bulk_generator import (
+    BULK_OUTPUT_DIR,
+    ParticipantBatch,
+    batch_from_state,
+    batch_state,
+    prune_archives,
+    render_bulk_batch,
+    write_certificates_zip,
+    write_json
+)
+from .encoders import DEFAULT_OUTPUT_FORMAT
+from .metrics import BULK_JOBS, collect_stages, observe_stages, span
+from .repository import record_bulk_certificates
+
+logger = logging.getLogger(__name__)
+
+# Number of bulk jobs allowed to run at once; each job already fans out
+# to the render process pool, so one is usually enough
+BULK_JOB_CONCURRENCY = int(os.getenv("BULK_JOB_CONCURRENCY", "1"))
+
+# Finished jobs kept in memory before the oldest are dropped; dropped
+# jobs are read back from their state file when polled
+MAX_RETAINED_JOBS = int(os.getenv("BULK_MAX_RETAINED_JOBS", "200"))
+
+# Minimum seconds between saves of a running job's progress
+JOB_SAVE_INTERVAL = float(os.getenv("BULK_JOB_SAVE_INTERVAL", "1.0"))
+
+# How often a download streaming a job run by another process rereads its state
+JOB_POLL_INTERVAL = 0.5
+
+JOB_STATE_FILENAME = "job.json"
+JOB_STATE_VERSION = 1
+JOB_ID_PATTERN = re.compile(r"job_[0-9a-f]{12}")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class BulkJob:
+    """
+    State of a single background bulk generation job
+    The state is saved to JOB_STATE_FILENAME in the job's directory as the
+    job progresses, so any process can report on it (see load).
+    """
+
+    def __init__(
+        self,
+        event_name: str,
+        date_issued: str,
+        total_count: Optional[int],
+        output_root: str,
+        job_id: Optional[str] = None
+    ):
+        self.job_id = job_id or f"job_{str(uuid4()).replace('-', '')[:12]}"
+        self.event_name = event_name
+        self.date_issued = date_issued
+        self.total_count = total_count
+        self.output_root = output_root
+        # Each job renders into its own directory so concurrent jobs never collide
+        self.output_dir = os.path.join(output_root, self.job_id)
+        self.status = JOB_QUEUED
+        self.results = ParticipantBatch(self.output_dir)
+        # The archive streams entries as they are rendered, so it is
+        # downloadable as soon as the job is queued
+        self.download_url = f"/certificates/bulk/jobs/{self.job_id}/download"
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._archive_lock = threading.Lock()
+        # False for jobs loaded from disk, which are run by another process
+        self._live = True
+        self._saved_at = 0.0
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.output_dir, JOB_STATE_FILENAME)
+
+    def save(self) -> None:
+        """Write the job's status and results to its state file"""
+        with self._lock:
+            state = {
+                "version": JOB_STATE_VERSION,
+                "job_id": self.job_id,
+                "status": self.status,
+                "event_name": self.event_name,
+                "date_issued": self.date_issued,
+                "total_count": self.total_count,
+                "error": self.error,
+                "created_at": self.created_at.isoformat(),
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None
+            }
+            self._saved_at = time.monotonic()
+        state["results"] = batch_state(self.results, self.output_root)
+        os.makedirs(self.output_dir, exist_ok=True)
+        write_json(self.state_path, state)
+
+    @classmethod
+    def load(cls, output_root: str, job_id: str) -> Optional["BulkJob"]:
+        """
+        A job saved under `output_root`, read from its state file, or None
+        if there is no such job
+        """
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        job = cls("", "", None, output_root, job_id)
+        job._live = False
+        return job if job._reload() else None
+
+    def _reload(self) -> bool:
+        """Replace the job's state with its state file; False if unreadable"""
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        if state.get("version") != JOB_STATE_VERSION or state.get("job_id") != self.job_id:
+            return False
+        results = batch_from_state(state["results"], self.output_root)
+        with self._lock:
+            self.status = state["status"]
+            self.event_name = state["event_name"]
+            self.date_issued = state["date_issued"]
+            self.total_count = state["total_count"]
+            self.error = state["error"]
+            self.created_at = datetime.fromisoformat(state["created_at"])
+            self.finished_at = datetime.fromisoformat(state["finished_at"]) if state["finished_at"] else None
+            self.results = results
+        return True
+
+    @property
+    def done_count(self) -> int:
+        return len(self.results)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def start(self) -> None:
+        """Mark the job as running"""
+        with self._lock:
+            self.status = JOB_RUNNING
+        self.save()
+
+    def record_result(self, index: int) -> None:
+        """
+        Wake streaming readers once row `index` of the results has finished
+        Progress is saved at most every JOB_SAVE_INTERVAL seconds.
+        """
+        with self._lock:
+            self._changed.notify_all()
+            due = time.monotonic() - self._saved_at >= JOB_SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        """Mark the job as finished and wake any streaming readers"""
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.finished_at = datetime.now()
+            self._changed.notify_all()
+        BULK_JOBS.inc(status=status)
+        self.save()
+
+    def iter_successful(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield successful certificates in order, blocking until each one is
+        rendered; stops once the job has finished
+        A job run by another process is followed through its state file.
+        """
+        index = 0
+        while True:
+            with self._lock:
+                if self._live:
+                    while index >= len(self.results) and not self.finished:
+                        self._changed.wait()
+                pending = index >= len(self.results)
+                finished = self.finished
+            if pending:
+                if finished:
+                    return
+                time.sleep(JOB_POLL_INTERVAL)
+                self._reload()
+                continue
+            if self.results.succeeded(index):
+                yield self.results.record(index)
+            index += 1
+
+    @property
+    def archive_filename(self) -> str:
+        return f"certificates_bulk_{self.job_id}.zip"
+
+    def archive_path(self, build: bool = True) -> Optional[str]:
+        """
+        Path of the job's ZIP archive on disk, writing it if `build` is set
+        Only completed jobs have one: it holds exactly the bytes a streamed
+        download of the job sends, so a streamed download can be resumed
+        against it with Range requests. One removed by prune_archives is
+        written again, identically, when next needed.
+        Returns None while the job is still running, if it failed, or if
+        the archive is not on disk and `build` is not set.
+        """
+        if self.status != JOB_COMPLETED:
+            return None
+        path = os.path.join(self.output_dir, self.archive_filename)
+        with self._archive_lock:
+            if not os.path.exists(path):
+                if not build:
+                    return None
+                os.makedirs(self.output_dir, exist_ok=True)
+                with collect_stages() as stages:
+                    write_certificates_zip(self.iter_successful(), path)
+                observe_stages(stages)
+                self.results.add_stage_time("zip", stages["zip"])
+                self.save()
+                prune_archives(self.output_root)
+        return path
+
+    def to_dict(self, include_results: bool = True) -> dict:
+        """
+        Snapshot of the job's progress and partial results
+        Without `include_results` only the counts are reported; results can
+        then be paged through with `results.page`.
+        """
+        with self._lock:
+            summary = self.results.summary()
+            return {
+                "job_id": self.job_id,
+                "status": self.status,
+                "event_name": self.event_name,
+                "date_issued": self.date_issued,
+                "total_count": self.total_count,
+                "done_count": summary["total_count"],
+                "success_count": summary["success_count"],
+                "failed_count": summary["failed_count"],
+                "reused_count": self.results.reused_count,
+                "batch_id": self.results.batch_id,
+                "successful_certificates": self.results.successful() if include_results else None,
+                "failed_certificates": self.results.failed() if include_results else None,
+                "results_url": f"/certificates/bulk/jobs/{self.job_id}/results",
+                "stage_seconds": self.results.stage_breakdown(),
+                "download_url": self.download_url,
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at
+            }
+
+    def __repr__(self) -> str:
+        return f"BulkJob(id={self.job_id}, status={self.status}, done={self.done_count}/{self.total_count})"
+
+
+class JobStore:
+    """
+    Registry of bulk jobs
+    Jobs started by this process are kept in memory, with at most
+    MAX_RETAINED_JOBS finished ones, dropping the oldest first; any other
+    job is read from its state file each time it is asked for.
+    """
+
+    def __init__(self, max_retained: int = MAX_RETAINED_JOBS):
+        self.max_retained = max_retained
+        self._jobs: "OrderedDict[str, BulkJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, job: BulkJob) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict()
+
+    def get(self, job_id: str, output_root: str = BULK_OUTPUT_DIR) -> Optional[BulkJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        return BulkJob.load(output_root, job_id)
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_retained)]:
+            del self._jobs[job_id]
+
+
+job_store = JobStore()
+
+_job_executor: Optional[ThreadPoolExecutor] = None
+_job_executor_lock = threading.Lock()
+
+
+def _run_job(job: BulkJob, participants: Iterable[BulkCertificateItem], certificate_type: str, output_format: str) -> None:
+    """Run a bulk job to completion, recording progress on the job"""
+    job.start()
+    try:
+        render_bulk_batch(
+            event_name=job.event_name,
+            date_issued=job.date_issued,
+            participants=participants,
+            output_dir=job.output_dir,
+            certificate_type=certificate_type,
+            batch=job.results,
+            on_result=job.record_result,
+            output_format=output_format
+        )
+        job.total_count = len(job.results)
+        record_bulk_certificates(
+            job.event_name,
+            job.date_issued,
+            certificate_type,
+            job.results
+        )
+        job.finish(JOB_COMPLETED)
+    except Exception as e:
+        logger.error(f"Bulk job {job.job_id} failed: {e}")
+        job.finish(JOB_FAILED, str(e))
+
+
+def submit_bulk_job(
+    event_name: str,
+    date_issued: str,
+    participants: Iterable[BulkCertificateItem],
+    output_dir: str = BULK_OUTPUT_DIR,
+    certificate_type: str = "participation",
+    output_format: str = DEFAULT_OUTPUT_FORMAT
+) -> BulkJob:
+    """
+    Queue a bulk generation job and return it immediately
+    `participants` may be a lazy iterable (e.g. a spooled CSV), which the
+    job consumes as it renders; its total is then reported once known.
+    """
+    if isinstance(participants, Sized):
+        total_count = len(participants)
+        participants = list(participants)
+    else:
+        total_count = None
+    job = BulkJob(event_name, date_issued, total_count, output_dir)
+    job.save()
+    job_store.add(job)
+    _get_job_executor().submit(_run_job, job, participants, certificate_type, output_format)
+    return job
+
+
+def _get_job_executor() -> ThreadPoolExecutor:
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(max_workers=BULK_JOB_CONCURRENCY, thread_name_prefix="bulk-job")
+        return _job_executor
+
+
+def shutdown_job_executor() -> None:
+    """Wait for running bulk jobs and stop the job threads"""
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is not None:
+            _job_executor.shutdown(wait=True)
+            _job_executor = None
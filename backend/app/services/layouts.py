@@ -0,0 +1,260 @@
+"""
+Certificate Layouts
+Declarative per-type layout specs (templates/layouts.json), compiled once
+into ready-to-render layouts with preloaded assets and fixed coordinates
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+import logging
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .cache import FontType, file_version, get_font, get_template_base
+from .metrics import span
+from .shared_rasters import private_copy
+from .text_layout import composite_glyphs, place_glyphs
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "templates")
+LAYOUTS_PATH = os.getenv("CERTIFICATE_LAYOUTS", os.path.join(TEMPLATE_DIR, "layouts.json"))
+
+# Values a layout field can show
+FIELDS = ("participant_name", "event_name", "date_issued", "certificate_type")
+
+# Fields that differ per certificate; every other field is baked into
+# the base image shared by a batch
+DYNAMIC_FIELDS = ("participant_name",)
+
+# Where a field's `y` is measured from
+ANCHORS = ("top", "middle", "bottom")
+
+# Used when a layout's font cannot be loaded, before Pillow's default
+FALLBACK_FONT = "arialbd.ttf"
+
+# Blank page drawn on when a layout's image is missing
+FALLBACK_TEMPLATE_SIZE = (1200, 850)
+FALLBACK_TEMPLATE_COLOR = "#f8f9fa"
+
+
+class LayoutField(NamedTuple):
+    """A text field compiled to its font and absolute pen position"""
+    field: str
+    font: FontType
+    xy: Tuple[int, int]
+    color: str
+    letter_spacing: float
+
+    def draw(self, certificate: Image.Image, text: str) -> None:
+        """Draw `text` at the field's position, left-aligned"""
+        if self.letter_spacing != 0:
+            # Cached glyph advances and rasters, composited in one pass
+            with span("layout"):
+                placed = place_glyphs(self.xy, text, self.font, self.letter_spacing)
+            with span("draw"):
+                composite_glyphs(certificate, placed, self.color)
+        else:
+            with span("draw"):
+                ImageDraw.Draw(certificate).text(self.xy, text, font=self.font, fill=self.color)
+
+
+class CompiledLayout:
+    """
+    A certificate type ready to render
+    The template is decoded and every font loaded when the layout is
+    compiled, and field positions are resolved against the template size,
+    so rendering is only "copy the template, draw the fields".
+    """
+
+    def __init__(self, name: str, template: Image.Image, fields: List[LayoutField], version: str):
+        self.name = name
+        # Shared with the template cache (and possibly mapped from a shared
+        # raster); never drawn on directly
+        self.template = template
+        self.static_fields = [f for f in fields if f.field not in DYNAMIC_FIELDS]
+        self.dynamic_fields = [f for f in fields if f.field in DYNAMIC_FIELDS]
+        self.version = version
+
+    def render_base(self, values: Mapping[str, str]) -> Image.Image:
+        """Copy of the template with every field except the dynamic ones drawn"""
+        with span("copy"):
+            certificate = private_copy(self.template)
+        for field in self.static_fields:
+            field.draw(certificate, values[field.field])
+        return certificate
+
+    def draw_dynamic(self, certificate: Image.Image, values: Mapping[str, str]) -> None:
+        """Draw the per-certificate fields onto a rendered base"""
+        for field in self.dynamic_fields:
+            field.draw(certificate, values[field.field])
+
+    def render(self, values: Mapping[str, str]) -> Image.Image:
+        certificate = self.render_base(values)
+        self.draw_dynamic(certificate, values)
+        return certificate
+
+    def __repr__(self):
+        return f"CompiledLayout(name={self.name}, fields={[f.field for f in self.static_fields + self.dynamic_fields]})"
+
+
+def _asset_path(template_dir: str, name: str) -> str:
+    return name if os.path.isabs(name) else os.path.join(template_dir, name)
+
+
+def _load_layout_font(path: str, size: int) -> FontType:
+    """The layout's font at `size`, falling back to Arial Bold, then Pillow's default"""
+    try:
+        return get_font(path, size)
+    except IOError:
+        logger.warning(f"Font not found at {path}. Using fallback fonts.")
+    try:
+        return get_font(FALLBACK_FONT, size)
+    except IOError:
+        logger.warning("Arial fonts not found. Using default font.")
+        return ImageFont.load_default()
+
+
+def _load_layout_template(path: str) -> Image.Image:
+    try:
+        return get_template_base(path)
+    except FileNotFoundError:
+        logger.warning(f"Template not found at {path}. Creating blank certificate.")
+        return Image.new("RGB", FALLBACK_TEMPLATE_SIZE, color=FALLBACK_TEMPLATE_COLOR)
+
+
+def _resolve_y(anchor: str, y: int, height: int) -> int:
+    if anchor == "top":
+        return y
+    if anchor == "middle":
+        return height // 2 + y
+    return height + y
+
+
+def validate_spec(name: str, spec: Mapping[str, Any]) -> None:
+    """Check a layout spec's shape; raises ValueError describing the first problem"""
+    if not isinstance(spec.get("image"), str):
+        raise ValueError(f"Layout '{name}' needs an 'image'")
+    fields = spec.get("fields")
+    if not isinstance(fields, list) or not fields:
+        raise ValueError(f"Layout '{name}' needs at least one field")
+    for field in fields:
+        if not isinstance(field.get("field"), str) or not isinstance(field.get("size"), int):
+            raise ValueError(f"Layout '{name}' fields need a 'field' name and an integer 'size'")
+        if field["field"] not in FIELDS:
+            raise ValueError(f"Layout '{name}' field '{field['field']}' must be one of {FIELDS}")
+        if not (field.get("font") or spec.get("font")):
+            raise ValueError(f"Layout '{name}' field '{field['field']}' has no font")
+        if field.get("anchor", "top") not in ANCHORS:
+            raise ValueError(f"Layout '{name}' field '{field['field']}' anchor must be one of {ANCHORS}")
+
+
+def asset_paths(spec: Mapping[str, Any], template_dir: str = TEMPLATE_DIR) -> List[str]:
+    """Files a layout is compiled from (image first, then each distinct font)"""
+    paths = [_asset_path(template_dir, spec["image"])]
+    for field in spec["fields"]:
+        path = _asset_path(template_dir, field.get("font") or spec["font"])
+        if path not in paths:
+            paths.append(path)
+    return paths
+
+
+def compile_layout(name: str, spec: Mapping[str, Any], version: str = "", template_dir: str = TEMPLATE_DIR) -> CompiledLayout:
+    """Load a layout's template and fonts and resolve its field positions"""
+    validate_spec(name, spec)
+    with span("template_load"):
+        template = _load_layout_template(_asset_path(template_dir, spec["image"]))
+    height = template.size[1]
+
+    fields = []
+    with span("font_load"):
+        for field in spec["fields"]:
+            font = _load_layout_font(_asset_path(template_dir, field.get("font") or spec["font"]), field["size"])
+            fields.append(LayoutField(
+                field=field["field"],
+                font=font,
+                xy=(field.get("x", 0), _resolve_y(field.get("anchor", "top"), field.get("y", 0), height)),
+                color=field.get("color", "#000000"),
+                letter_spacing=field.get("letter_spacing", 0)
+            ))
+    return CompiledLayout(name, template, fields, version)
+
+
+class LayoutRegistry:
+    """
+    Compiled layouts for each certificate type in a layouts file
+    Layouts are compiled on first use and recompiled when the spec file,
+    template or fonts change on disk. Unknown types use the spec's default.
+    Lookups only stat the layout's files; the lock is taken only to reread
+    the spec file or compile a layout.
+    """
+
+    def __init__(self, path: str = LAYOUTS_PATH, template_dir: str = TEMPLATE_DIR):
+        self.path = path
+        self.template_dir = template_dir
+        # (spec file version, specs, default layout name), replaced as a whole
+        self._specs: Optional[Tuple[str, Dict[str, Any], str]] = None
+        self._compiled: Dict[str, CompiledLayout] = {}
+        self._lock = threading.Lock()
+
+    def _load_specs(self) -> Tuple[str, Dict[str, Any], str]:
+        """The layouts file as it is on disk, reread only when it changed"""
+        spec_version = file_version(self.path)
+        specs = self._specs
+        if specs is not None and specs[0] == spec_version:
+            return specs
+        with self._lock:
+            specs = self._specs
+            if specs is not None and specs[0] == spec_version:
+                return specs
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            layouts = data.get("layouts", {})
+            for name, spec in layouts.items():
+                validate_spec(name, spec)
+            default = data.get("default")
+            if default not in layouts:
+                raise ValueError(f"Default layout '{default}' is not defined in {self.path}")
+            self._specs = specs = (spec_version, layouts, default)
+            return specs
+
+    def names(self) -> List[str]:
+        return list(self._load_specs()[1])
+
+    def _resolve(self, name: str) -> Tuple[str, Dict[str, Any], str]:
+        """(layout name, spec, version) for a certificate type"""
+        spec_version, specs, default = self._load_specs()
+        if name not in specs:
+            name = default
+        spec = specs[name]
+        version = "|".join([spec_version] + [file_version(path) for path in asset_paths(spec, self.template_dir)])
+        return name, spec, version
+
+    def version(self, name: str) -> str:
+        """
+        Version tag of the layout used for `name`, changing whenever its spec,
+        template or fonts change; does not compile the layout
+        """
+        return self._resolve(name)[2]
+
+    def get(self, name: str) -> CompiledLayout:
+        """
+        Compiled layout for certificate type `name`, current as of this call
+        Its `version` is the layout's version tag, so callers that need both
+        look the layout up once.
+        """
+        name, spec, version = self._resolve(name)
+        layout = self._compiled.get(name)
+        if layout is not None and layout.version == version:
+            return layout
+        with self._lock:
+            layout = self._compiled.get(name)
+            if layout is None or layout.version != version:
+                layout = compile_layout(name, spec, version, self.template_dir)
+                self._compiled[name] = layout
+            return layout
+
+
+layout_registry = LayoutRegistry()
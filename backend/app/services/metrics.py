@@ -0,0 +1,196 @@
+"""
+Render Metrics
+Counters, histograms and stage timing spans, exported in the Prometheus
+text format at /metrics
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Render stages timed by `span`; template_load and font_load happen when a
+# layout is compiled, copy (of the compiled template or a batch's base
+# image) starts every render
+STAGES = ("template_load", "font_load", "copy", "layout", "draw", "encode", "write", "zip")
+
+# Bucket bounds in seconds; stages range from microseconds (cached font
+# lookups) to tenths of a second (optimized encoders, large archives)
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Current value read from a callback when metrics are collected"""
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def collect(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_value(self.read())}"]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(str(labels[name]) for name in self.labelnames))
+        return series[2] if series else 0
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {repr(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together for /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "certificate_stage_seconds", "Time spent in each certificate render stage", ["stage"]
+))
+CERTIFICATES_RENDERED = registry.register(Counter(
+    "certificates_rendered_total", "Certificates rendered", ["kind", "format"]
+))
+CERTIFICATE_FAILURES = registry.register(Counter(
+    "certificate_render_failures_total", "Certificate renders that failed", ["kind"]
+))
+CERTIFICATES_DEDUPLICATED = registry.register(Counter(
+    "certificates_deduplicated_total", "Single-certificate requests served from an identical earlier render"
+))
+RENDERS_REJECTED = registry.register(Counter(
+    "certificate_renders_rejected_total", "Renders rejected with 503 because the render queue was full"
+))
+BULK_JOBS = registry.register(Counter(
+    "bulk_jobs_total", "Bulk generation jobs by final status", ["status"]
+))
+RENDER_SECONDS = registry.register(Histogram(
+    "certificate_render_seconds", "End-to-end time to render and store one certificate", ["kind"]
+))
+
+# Set while a caller collects stage timings itself (e.g. a pool worker
+# that ships them back to the parent process with its result)
+_collector: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_collector", default=None)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time a render stage
+    Durations go to the active `collect_stages` block if there is one,
+    otherwise straight into the stage histogram.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        collector = _collector.get()
+        if collector is None:
+            STAGE_SECONDS.observe(elapsed, stage=stage)
+        else:
+            collector[stage] = collector.get(stage, 0.0) + elapsed
+
+
+@contextmanager
+def collect_stages() -> Iterator[Dict[str, float]]:
+    """Gather stage durations from spans in this block into a dict"""
+    timings: Dict[str, float] = {}
+    token = _collector.set(timings)
+    try:
+        yield timings
+    finally:
+        _collector.reset(token)
+
+
+def observe_stages(timings: Dict[str, float]) -> None:
+    """Record stage durations collected elsewhere (e.g. in a worker process)"""
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
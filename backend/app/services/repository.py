@@ -0,0 +1,200 @@
+"""
+Certificate Repository
+Persistent registry of issued certificates backed by SQLAlchemy
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Dict, Any, Optional, Set, Tuple
+import base64
+import json
+
+from sqlalchemy import insert, select, tuple_
+
+from ..database import SessionLocal
+from ..models.certificates import Certificate, CertificateORM, generate_unique_id
+from .bulk_generator import ParticipantBatch, STATUS_SUCCEEDED
+
+# Rows per INSERT statement when recording bulk batches
+BULK_INSERT_BATCH_SIZE = 500
+
+# Appended to a prefix to bound the names starting with it from above
+PREFIX_UPPER_BOUND = "\uffff"
+
+
+class CertificateRepository:
+    """
+    Data access for certificate records
+    Shared by every uvicorn worker through the configured database.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def add(self, cert: Certificate, file_path: Optional[str], content_hash: Optional[str] = None) -> None:
+        """Record a single issued certificate"""
+        with self.session_factory() as session:
+            session.add(CertificateORM(
+                unique_id=cert.unique_id,
+                participant_name=cert.participant_name,
+                event_name=cert.event_name,
+                date_issued=cert.date_issued,
+                certificate_type=cert.certificate_type,
+                filename=cert.filename,
+                file_path=file_path,
+                content_hash=content_hash,
+                created_at=cert.created_at,
+                updated_at=cert.created_at
+            ))
+            session.commit()
+
+    def add_many(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Record many certificates using batched multi-row INSERTs
+        Each row holds the CertificateORM column values.
+        Returns the number of rows inserted.
+        """
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        with self.session_factory() as session:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                    session.execute(insert(CertificateORM), batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                session.execute(insert(CertificateORM), batch)
+                count += len(batch)
+            session.commit()
+        return count
+
+    def get(self, unique_id: str) -> Optional[CertificateORM]:
+        """Return the certificate record for `unique_id`, if any"""
+        with self.session_factory() as session:
+            return session.get(CertificateORM, unique_id)
+
+    def existing_ids(self, unique_ids: Iterable[str]) -> Set[str]:
+        """The subset of `unique_ids` already recorded"""
+        unique_ids = list(unique_ids)
+        found: Set[str] = set()
+        with self.session_factory() as session:
+            for start in range(0, len(unique_ids), BULK_INSERT_BATCH_SIZE):
+                found.update(session.scalars(
+                    select(CertificateORM.unique_id)
+                    .where(CertificateORM.unique_id.in_(unique_ids[start:start + BULK_INSERT_BATCH_SIZE]))
+                ))
+        return found
+
+    def find_by_content_hash(self, content_hash: str) -> Optional[CertificateORM]:
+        """Return the most recent certificate rendered from identical inputs"""
+        with self.session_factory() as session:
+            return session.scalars(
+                select(CertificateORM)
+                .where(CertificateORM.content_hash == content_hash)
+                .order_by(CertificateORM.created_at.desc())
+                .limit(1)
+            ).first()
+
+    def list_page(
+        self,
+        event_name: Optional[str] = None,
+        participant_prefix: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        limit: int = 50
+    ) -> Tuple[List[CertificateORM], Optional[Tuple[datetime, str]]]:
+        """
+        Return one page of certificates, newest first, and the key to pass
+        as `after` for the next page (None on the last page)
+        Pages are found by seeking the (created_at, unique_id) index past
+        `after`, so the cost depends on the page size, not the offset.
+        `date_from` and `date_to` bound `date_issued` (YYYY-MM-DD, inclusive);
+        `participant_prefix` matches case-sensitively.
+        """
+        query = select(CertificateORM)
+        if event_name:
+            query = query.where(CertificateORM.event_name == event_name)
+        if participant_prefix:
+            # A range rather than LIKE, which SQLite matches case-insensitively
+            # and so cannot answer from the index
+            query = query.where(
+                CertificateORM.participant_name >= participant_prefix,
+                CertificateORM.participant_name < participant_prefix + PREFIX_UPPER_BOUND
+            )
+        if date_from:
+            query = query.where(CertificateORM.date_issued >= date_from)
+        if date_to:
+            query = query.where(CertificateORM.date_issued <= date_to)
+        if after is not None:
+            query = query.where(tuple_(CertificateORM.created_at, CertificateORM.unique_id) < tuple_(*after))
+        query = query.order_by(CertificateORM.created_at.desc(), CertificateORM.unique_id.desc())
+
+        with self.session_factory() as session:
+            # One extra row tells whether another page follows
+            rows = list(session.scalars(query.limit(limit + 1)))
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].created_at, rows[-1].unique_id)
+
+
+def encode_cursor(key: Tuple[datetime, str]) -> str:
+    """Opaque, URL-safe form of a list_page key"""
+    created_at, unique_id = key
+    payload = json.dumps([created_at.isoformat(), unique_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, unique_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), str(unique_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def record_bulk_certificates(
+    event_name: str,
+    date_issued: str,
+    certificate_type: str,
+    batch: ParticipantBatch
+) -> None:
+    """
+    Register a bulk batch's certificates, assigning a `unique_id` to each
+    successful row so they can be fetched individually
+    Rows that already carry an id (reused or re-rendered by a rerun of a
+    manifest-tracked batch) keep it, and are only inserted if the registry
+    does not have it yet.
+    """
+    indexes = batch.indexes(STATUS_SUCCEEDED)
+    recorded = repository.existing_ids(
+        unique_id for unique_id in (batch.unique_ids[index] for index in indexes) if unique_id is not None
+    )
+
+    def rows():
+        for index in indexes:
+            unique_id = batch.unique_ids[index]
+            if unique_id is None:
+                unique_id = generate_unique_id()
+                batch.unique_ids[index] = unique_id
+            elif unique_id in recorded:
+                continue
+            # Repeated participants share one certificate
+            recorded.add(unique_id)
+            yield {
+                "unique_id": unique_id,
+                "participant_name": batch.names[index],
+                "event_name": event_name,
+                "date_issued": date_issued,
+                "certificate_type": certificate_type,
+                "filename": batch.filenames[index],
+                "file_path": batch.file_path(index)
+            }
+    repository.add_many(rows())
+
+
+repository = CertificateRepository()
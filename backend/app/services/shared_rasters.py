@@ -0,0 +1,182 @@
+"""
+Shared Rasters
+Decoded template images published once as raw raster files and mapped
+read-only by every process on the host
+"""
+
+import getpass
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+from typing import Callable, Dict, Optional
+import logging
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Where raster files are published; every uvicorn worker and render pool
+# process on the host must see the same directory. It must be private to
+# the user running the app (see _private_dir), so the default is per user.
+_USER = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+SHARED_RASTER_DIR = os.getenv("SHARED_RASTER_DIR", os.path.join(tempfile.gettempdir(), f"certificate-rasters-{_USER}"))
+
+# Set to 0 to decode templates privately in each process instead
+SHARED_RASTERS = os.getenv("SHARED_RASTERS", "1") != "0"
+
+# Image mode -> layout of its pixels in the file; only layouts Pillow can
+# wrap without copying (RGB is padded to four bytes per pixel, as Pillow
+# holds it in memory)
+RAW_MODES = {"RGBA": "RGBA", "RGB": "RGBX", "L": "L"}
+
+MAGIC = b"CRST"
+FORMAT_VERSION = 1
+# magic, format version, source mode, width, height; padded so pixel rows start aligned
+HEADER = struct.Struct("<4sH8sII")
+HEADER_SIZE = 32
+
+_lock = threading.Lock()
+
+# Directory -> whether it passed the _private_dir checks in this process
+_checked_dirs: Dict[str, bool] = {}
+
+
+def _owned_by_us(st: os.stat_result) -> bool:
+    # Platforms without uids (Windows) rely on the directory's ACLs
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def _private_dir(path: str) -> bool:
+    """
+    Whether `path` is safe to share rasters through, creating it (0700) if needed
+    Anyone who can write there could hand every worker forged pixels, so
+    the directory must be a real directory owned by this user with no
+    group or other access. Checked once per process.
+    """
+    checked = _checked_dirs.get(path)
+    if checked is not None:
+        return checked
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.lstat(path)
+        private = stat.S_ISDIR(st.st_mode) and _owned_by_us(st) and not st.st_mode & 0o077
+    except OSError as e:
+        logger.warning(f"Cannot use shared raster directory {path}: {e}")
+        private = False
+    else:
+        if not private:
+            logger.warning(
+                f"Shared raster directory {path} is not a private directory owned by this user; "
+                "decoding templates in each process instead"
+            )
+    _checked_dirs[path] = private
+    return private
+
+
+def raster_path(key: str) -> str:
+    return os.path.join(SHARED_RASTER_DIR, f"{key}.raster")
+
+
+def publish(key: str, image: Image.Image) -> str:
+    """
+    Write `image` as a raw raster file for `key` and return its path
+    Written to a temporary name and renamed, so processes racing to
+    publish the same raster never see a partial file.
+    """
+    if not _private_dir(SHARED_RASTER_DIR):
+        raise PermissionError(f"Shared raster directory {SHARED_RASTER_DIR} is not private")
+    raw_mode = RAW_MODES[image.mode]
+    path = raster_path(key)
+    partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    with open(partial_path, "wb") as f:
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, image.mode.encode("ascii"), image.width, image.height)
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(image.tobytes("raw", raw_mode))
+    os.replace(partial_path, path)
+    return path
+
+
+def attach(key: str) -> Optional[Image.Image]:
+    """
+    Map the published raster for `key` read-only, or None if there is none
+    The pixels are not copied: pages are shared with every other process
+    that maps the file. The image is read-only; use `private_copy` to draw.
+    Only regular files owned by this user, in a private directory, are mapped.
+    """
+    if not _private_dir(SHARED_RASTER_DIR):
+        return None
+    path = raster_path(key)
+    try:
+        with open(os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0)), "rb") as f:
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode) or not _owned_by_us(st):
+                logger.warning(f"Ignoring shared raster {path} not owned by this user")
+                return None
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Missing, a symlink (ELOOP), or empty (ValueError: cannot be mapped)
+        return None
+
+    if len(mapped) < HEADER_SIZE:
+        mapped.close()
+        return None
+    magic, version, mode, width, height = HEADER.unpack_from(mapped)
+    mode = mode.rstrip(b"\0").decode("ascii")
+    raw_mode = RAW_MODES.get(mode)
+    if magic != MAGIC or version != FORMAT_VERSION or raw_mode is None \
+            or len(mapped) != HEADER_SIZE + width * height * len(raw_mode):
+        mapped.close()
+        return None
+
+    image = Image.frombuffer(raw_mode, (width, height), memoryview(mapped)[HEADER_SIZE:], "raw", raw_mode, 0, 1)
+    image.info["source_mode"] = mode
+    return image
+
+
+def _remove_stale(prefix: str, key: str) -> None:
+    """Delete older versions of a raster; processes still mapping them keep their pages"""
+    for name in os.listdir(SHARED_RASTER_DIR):
+        if name.startswith(f"{prefix}@") and name.endswith(".raster") and name != f"{key}.raster":
+            try:
+                os.remove(os.path.join(SHARED_RASTER_DIR, name))
+            except OSError:
+                pass
+
+
+def shared_raster(prefix: str, version: str, build: Callable[[], Image.Image]) -> Image.Image:
+    """
+    Return the shared raster `prefix` at `version`, building and publishing it if needed
+    `build` runs only in the first process to need this version. When
+    sharing is disabled, or the image mode or directory rules it out, the
+    built image is returned as is.
+    """
+    if not SHARED_RASTERS or not _private_dir(SHARED_RASTER_DIR):
+        return build()
+
+    key = f"{prefix}@{version}"
+    image = attach(key)
+    if image is not None:
+        return image
+
+    built = build()
+    if built.mode not in RAW_MODES:
+        return built
+    with _lock:
+        try:
+            publish(key, built)
+            _remove_stale(prefix, key)
+        except OSError as e:
+            logger.warning(f"Could not publish shared raster {key}: {e}")
+            return built
+    return attach(key) or built
+
+
+def private_copy(image: Image.Image) -> Image.Image:
+    """A writable copy of a (possibly shared) raster in its original mode"""
+    mode = image.info.get("source_mode", image.mode)
+    copy = image.convert(mode) if mode != image.mode else image.copy()
+    copy.info.pop("source_mode", None)
+    return copy
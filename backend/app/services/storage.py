@@ -0,0 +1,110 @@
+"""
+Certificate Storage Backends
+Pluggable persistence for encoded certificate files
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+
+class CertificateStorage(ABC):
+    """
+    Base class for certificate storage backends
+    Files are addressed by their generated filename.
+    """
+
+    @abstractmethod
+    def save(self, filename: str, data: bytes) -> None:
+        """Store `data` under `filename`, replacing any earlier file"""
+
+    @abstractmethod
+    def load(self, filename: str) -> Optional[bytes]:
+        """Return the stored bytes, or None if the file is not stored"""
+
+    @abstractmethod
+    def exists(self, filename: str) -> bool:
+        """Whether `filename` is stored"""
+
+    def path(self, filename: str) -> Optional[str]:
+        """Return a filesystem path for the file, if this backend has one"""
+        return None
+
+
+class DiskStorage(CertificateStorage):
+    """Stores certificates as files under a directory"""
+
+    def __init__(self, root: str = "certificates"):
+        self.root = root
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.root, filename)
+
+    def save(self, filename: str, data: bytes) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.path(filename), "wb") as f:
+            f.write(data)
+
+    def load(self, filename: str) -> Optional[bytes]:
+        try:
+            with open(self.path(filename), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, filename: str) -> bool:
+        return os.path.exists(self.path(filename))
+
+
+class MemoryStorage(CertificateStorage):
+    """
+    Bounded in-memory LRU of encoded certificates
+    The least recently used files are evicted once `max_bytes` is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._files: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, filename: str, data: bytes) -> None:
+        with self._lock:
+            old = self._files.pop(filename, None)
+            if old is not None:
+                self.size -= len(old)
+            self._files[filename] = data
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self._files) > 1:
+                _, evicted = self._files.popitem(last=False)
+                self.size -= len(evicted)
+
+    def load(self, filename: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._files.get(filename)
+            if data is not None:
+                self._files.move_to_end(filename)
+            return data
+
+    def exists(self, filename: str) -> bool:
+        with self._lock:
+            return filename in self._files
+
+
+def create_storage(backend: Optional[str] = None) -> CertificateStorage:
+    """
+    Create the storage backend named by `backend` or CERTIFICATE_STORAGE
+    ("disk", the default, or "memory")
+    """
+    backend = (backend or os.getenv("CERTIFICATE_STORAGE", "disk")).lower()
+    if backend == "memory":
+        max_mb = int(os.getenv("CERTIFICATE_MEMORY_STORAGE_MB", "256"))
+        return MemoryStorage(max_bytes=max_mb * 1024 * 1024)
+    if backend == "disk":
+        return DiskStorage(os.getenv("CERTIFICATE_DIR", "certificates"))
+    raise ValueError(f"Unknown certificate storage backend: {backend}")
+
+
+storage = create_storage()
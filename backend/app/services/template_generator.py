@@ -3,9 +3,17 @@ Enhanced Certificate Templates
 Multiple certificate template designs for different events
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+from functools import lru_cache
+import hashlib
 import os
 
+from .fonts import font_registry
+from .shared_rasters import private_copy, shared_raster
+
+# Bump when a style's static layer changes so persisted backgrounds are rebuilt
+BACKGROUND_VERSION = 1
+
 
 def get_modern_certificate_template(
     name: str, 
@@ -29,55 +37,123 @@ def get_modern_certificate_template(
         return _create_modern_template(name, event, date, output_path, width, height)
 
 
-def _create_modern_template(name, event, date, output_path, width, height):
-    """Modern gradient design"""
-    certificate = Image.new("RGB", (width, height), color="#f8f9fa")
-    draw = ImageDraw.Draw(certificate)
-    
-    # Modern gradient background
+@lru_cache(maxsize=8)
+def _vertical_gradient(width, height, top, bottom):
+    """
+    Top-to-bottom linear gradient between two RGB colours
+    One pixel column is computed and stretched to full width, which gives
+    the same pixels as drawing each row. Cached; callers must copy.
+    """
+    column = bytearray()
     for y in range(height):
         color_ratio = y / height
-        r = int(248 + (67 - 248) * color_ratio)
-        g = int(249 + (56 - 249) * color_ratio) 
-        b = int(250 + (101 - 250) * color_ratio)
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
-    
-    # Load fonts
-    try:
-        font_title = ImageFont.truetype("arial.ttf", 72)
-        font_subtitle = ImageFont.truetype("arial.ttf", 36)
-        font_name = ImageFont.truetype("arialbd.ttf", 56)
-        font_body = ImageFont.truetype("arial.ttf", 32)
-        font_small = ImageFont.truetype("arial.ttf", 24)
-    except IOError:
-        font_title = ImageFont.load_default()
-        font_subtitle = ImageFont.load_default()
-        font_name = ImageFont.load_default()
-        font_body = ImageFont.load_default()
-        font_small = ImageFont.load_default()
+        column += bytes(int(start + (end - start) * color_ratio) for start, end in zip(top, bottom))
+    return Image.frombytes("RGB", (1, height), bytes(column)).resize((width, height), Image.NEAREST)
+
+
+def get_style_background(style, width, height):
+    """
+    Participant-independent layer of a template style: background, borders,
+    ornaments and fixed captions. Built once per host (or loaded from
+    TEMPLATE_BACKGROUND_DIR when set) and shared; callers must take a
+    `private_copy`.
+    """
+    return _get_style_background(style if style in _BACKGROUND_BUILDERS else "modern", width, height)
+
+
+def _background_version():
+    """
+    BACKGROUND_VERSION plus the fonts the captions are drawn with, so a
+    background persisted under other fonts is never reused
+    """
+    fonts = hashlib.sha1(font_registry.version().encode("utf-8")).hexdigest()[:12]
+    return f"v{BACKGROUND_VERSION}_{fonts}"
+
+
+@lru_cache(maxsize=16)
+def _get_style_background(style, width, height):
+    # Published as a shared raster so each worker process maps the same
+    # pixels instead of building (or decoding) its own copy
+    version = _background_version()
+    return shared_raster(
+        f"style_{style}_{width}x{height}",
+        version,
+        lambda: _build_style_background(style, width, height, version)
+    )
+
+
+def _build_style_background(style, width, height, version):
+    builder = _BACKGROUND_BUILDERS[style]
+    cache_dir = os.getenv("TEMPLATE_BACKGROUND_DIR")
+    if not cache_dir:
+        return builder(width, height)
+
+    # Pre-rendered asset; the version in the name invalidates stale files
+    path = os.path.join(cache_dir, f"{style}_{width}x{height}_{version}.png")
+    if os.path.exists(path):
+        with Image.open(path) as image:
+            return image.convert("RGB")
+
+    background = builder(width, height)
+    os.makedirs(cache_dir, exist_ok=True)
+    background.save(path)
+    return background
+
+
+def _load_fonts(title_size, subtitle_size, name_size, body_size, small_size):
+    """Return a style's fonts from the font registry (resolved once per process)"""
+    return (
+        font_registry.get("regular", title_size),
+        font_registry.get("regular", subtitle_size),
+        font_registry.get("bold", name_size),
+        font_registry.get("regular", body_size),
+        font_registry.get("regular", small_size),
+    )
+
+
+def _center_text(draw, width, text, y, font, color="black"):
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    x = (width - text_width) // 2
+    draw.text((x, y), text, font=font, fill=color)
+
+
+# Modern style
+
+MODERN_FONT_SIZES = (72, 36, 56, 32, 24)
+
+
+def _modern_background(width, height):
+    # Modern gradient background
+    certificate = _vertical_gradient(width, height, (248, 249, 250), (67, 56, 101)).copy()
+    draw = ImageDraw.Draw(certificate)
+    font_title, font_subtitle, _, _, font_small = _load_fonts(*MODERN_FONT_SIZES)
     
     # Modern border
     draw.rectangle([40, 40, width-40, height-40], outline="#2c3e50", width=8)
     draw.rectangle([50, 50, width-50, height-50], outline="#3498db", width=3)
     
-    # Helper function
-    def center_text(text, y, font, color="black"):
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        x = (width - text_width) // 2
-        draw.text((x, y), text, font=font, fill=color)
-    
     # Title
-    center_text("CERTIFICATE", 120, font_title, "#2c3e50")
-    center_text("OF ACHIEVEMENT", 200, font_subtitle, "#34495e")
+    _center_text(draw, width, "CERTIFICATE", 120, font_title, "#2c3e50")
+    _center_text(draw, width, "OF ACHIEVEMENT", 200, font_subtitle, "#34495e")
     
     # Decorative elements
     draw.ellipse([width//2-100, 300, width//2+100, 500], outline="#3498db", width=4)
-    center_text("🏆", 370, font_title)
+    _center_text(draw, width, "🏆", 370, font_title)
+    
+    _center_text(draw, width, "This is to certify that", 550, font_small, "#7f8c8d")
+    _center_text(draw, width, "has successfully completed", 720, font_small, "#7f8c8d")
+    return certificate
+
+
+def _create_modern_template(name, event, date, output_path, width, height):
+    """Modern gradient design"""
+    certificate = private_copy(get_style_background("modern", width, height))
+    draw = ImageDraw.Draw(certificate)
+    _, _, font_name, font_body, font_small = _load_fonts(*MODERN_FONT_SIZES)
     
     # Content
-    center_text("This is to certify that", 550, font_small, "#7f8c8d")
-    center_text(name, 600, font_name, "#2c3e50")
+    _center_text(draw, width, name, 600, font_name, "#2c3e50")
     
     # Underline
     bbox = draw.textbbox((0, 0), name, font=font_name)
@@ -85,18 +161,22 @@ def _create_modern_template(name, event, date, output_path, width, height):
     name_x = (width - name_width) // 2
     draw.line([name_x, 670, name_x + name_width, 670], fill="#3498db", width=3)
     
-    center_text("has successfully completed", 720, font_small, "#7f8c8d")
-    center_text(event, 770, font_body, "#2c3e50")
-    center_text(f"Date: {date}", 850, font_small, "#7f8c8d")
+    _center_text(draw, width, event, 770, font_body, "#2c3e50")
+    _center_text(draw, width, f"Date: {date}", 850, font_small, "#7f8c8d")
     
     certificate.save(output_path)
     return output_path
 
 
-def _create_elegant_template(name, event, date, output_path, width, height):
-    """Elegant design with classic styling"""
+# Elegant style
+
+ELEGANT_FONT_SIZES = (68, 34, 52, 30, 22)
+
+
+def _elegant_background(width, height):
     certificate = Image.new("RGB", (width, height), color="#fdfefe")
     draw = ImageDraw.Draw(certificate)
+    font_title, font_subtitle, _, _, font_small = _load_fonts(*ELEGANT_FONT_SIZES)
     
     # Elegant border design
     border_color = "#8b4513"
@@ -110,36 +190,32 @@ def _create_elegant_template(name, event, date, output_path, width, height):
         draw.ellipse([corner[0], corner[1], corner[0]+corner_size, corner[1]+corner_size], 
                     outline="#d4af37", width=3)
     
-    # Load fonts
-    try:
-        font_title = ImageFont.truetype("arial.ttf", 68)
-        font_subtitle = ImageFont.truetype("arial.ttf", 34)
-        font_name = ImageFont.truetype("arialbd.ttf", 52)
-        font_body = ImageFont.truetype("arial.ttf", 30)
-        font_small = ImageFont.truetype("arial.ttf", 22)
-    except IOError:
-        font_title = ImageFont.load_default()
-        font_subtitle = ImageFont.load_default()
-        font_name = ImageFont.load_default()
-        font_body = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-    
-    def center_text(text, y, font, color="black"):
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        x = (width - text_width) // 2
-        draw.text((x, y), text, font=font, fill=color)
-    
     # Title
-    center_text("CERTIFICATE", 140, font_title, "#8b4513")
-    center_text("OF EXCELLENCE", 220, font_subtitle, "#d4af37")
+    _center_text(draw, width, "CERTIFICATE", 140, font_title, "#8b4513")
+    _center_text(draw, width, "OF EXCELLENCE", 220, font_subtitle, "#d4af37")
     
     # Decorative line
     draw.line([200, 300, width-200, 300], fill="#d4af37", width=3)
     
+    _center_text(draw, width, "This certifies that", 350, font_small, "#5d4e37")
+    _center_text(draw, width, "has demonstrated exceptional skill in", 540, font_small, "#5d4e37")
+    
+    # Signature lines
+    sig_y = 800
+    draw.line([200, sig_y, 450, sig_y], fill="#8b4513", width=2)
+    draw.line([width-450, sig_y, width-200, sig_y], fill="#8b4513", width=2)
+    _center_text(draw, width, "Authorized Signature", sig_y + 15, font_small, "#5d4e37")
+    return certificate
+
+
+def _create_elegant_template(name, event, date, output_path, width, height):
+    """Elegant design with classic styling"""
+    certificate = private_copy(get_style_background("elegant", width, height))
+    draw = ImageDraw.Draw(certificate)
+    _, _, font_name, font_body, font_small = _load_fonts(*ELEGANT_FONT_SIZES)
+    
     # Content
-    center_text("This certifies that", 350, font_small, "#5d4e37")
-    center_text(name, 420, font_name, "#8b4513")
+    _center_text(draw, width, name, 420, font_name, "#8b4513")
     
     # Name underline with decorative ends
     bbox = draw.textbbox((0, 0), name, font=font_name)
@@ -147,24 +223,22 @@ def _create_elegant_template(name, event, date, output_path, width, height):
     name_x = (width - name_width) // 2
     draw.line([name_x-20, 490, name_x + name_width + 20, 490], fill="#d4af37", width=2)
     
-    center_text("has demonstrated exceptional skill in", 540, font_small, "#5d4e37")
-    center_text(event, 590, font_body, "#8b4513")
-    center_text(f"Awarded on {date}", 700, font_small, "#5d4e37")
-    
-    # Signature lines
-    sig_y = 800
-    draw.line([200, sig_y, 450, sig_y], fill="#8b4513", width=2)
-    draw.line([width-450, sig_y, width-200, sig_y], fill="#8b4513", width=2)
-    center_text("Authorized Signature", sig_y + 15, font_small, "#5d4e37")
+    _center_text(draw, width, event, 590, font_body, "#8b4513")
+    _center_text(draw, width, f"Awarded on {date}", 700, font_small, "#5d4e37")
     
     certificate.save(output_path)
     return output_path
 
 
-def _create_tech_template(name, event, date, output_path, width, height):
-    """Technology-focused design"""
+# Tech style
+
+TECH_FONT_SIZES = (70, 35, 54, 32, 24)
+
+
+def _tech_background(width, height):
     certificate = Image.new("RGB", (width, height), color="#1a1a1a")
     draw = ImageDraw.Draw(certificate)
+    font_title, font_subtitle, _, _, font_small = _load_fonts(*TECH_FONT_SIZES)
     
     # Tech-style grid background
     grid_color = "#333333"
@@ -178,43 +252,30 @@ def _create_tech_template(name, event, date, output_path, width, height):
     draw.rectangle([40, 40, width-40, height-40], outline=neon_color, width=6)
     draw.rectangle([48, 48, width-48, height-48], outline="#0099ff", width=2)
     
-    # Load fonts
-    try:
-        font_title = ImageFont.truetype("arial.ttf", 70)
-        font_subtitle = ImageFont.truetype("arial.ttf", 35)
-        font_name = ImageFont.truetype("arialbd.ttf", 54)
-        font_body = ImageFont.truetype("arial.ttf", 32)
-        font_small = ImageFont.truetype("arial.ttf", 24)
-    except IOError:
-        font_title = ImageFont.load_default()
-        font_subtitle = ImageFont.load_default()
-        font_name = ImageFont.load_default()
-        font_body = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-    
-    def center_text(text, y, font, color="white"):
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        x = (width - text_width) // 2
-        draw.text((x, y), text, font=font, fill=color)
-    
     # Title with glow effect
-    center_text("DIGITAL CERTIFICATE", 120, font_title, "#00ff41")
-    center_text("TECHNOLOGY ACHIEVEMENT", 200, font_subtitle, "#0099ff")
-    
-    # Tech hexagon
-    hex_center = (width//2, 340)
-    hex_size = 60
-    hex_points = []
-    for i in range(6):
-        angle = i * 60
-        x = hex_center[0] + hex_size * 0.866  # cos(30°)
-        y = hex_center[1] + hex_size * 0.5    # sin(30°)
-        hex_points.append((x, y))
+    _center_text(draw, width, "DIGITAL CERTIFICATE", 120, font_title, "#00ff41")
+    _center_text(draw, width, "TECHNOLOGY ACHIEVEMENT", 200, font_subtitle, "#0099ff")
+    
+    _center_text(draw, width, "CERTIFIED THAT", 420, font_small, "#cccccc")
+    _center_text(draw, width, "HAS SUCCESSFULLY COMPLETED", 600, font_small, "#cccccc")
+    
+    # Tech corner elements
+    corner_size = 40
+    corners = [(60, 60), (width-100, 60), (60, height-100), (width-100, height-100)]
+    for corner in corners:
+        draw.rectangle([corner[0], corner[1], corner[0]+corner_size, corner[1]+corner_size], 
+                      outline="#00ff41", width=2)
+    return certificate
+
+
+def _create_tech_template(name, event, date, output_path, width, height):
+    """Technology-focused design"""
+    certificate = private_copy(get_style_background("tech", width, height))
+    draw = ImageDraw.Draw(certificate)
+    _, _, font_name, font_body, font_small = _load_fonts(*TECH_FONT_SIZES)
     
     # Content
-    center_text("CERTIFIED THAT", 420, font_small, "#cccccc")
-    center_text(name, 480, font_name, "#00ff41")
+    _center_text(draw, width, name, 480, font_name, "#00ff41")
     
     # Neon underline
     bbox = draw.textbbox((0, 0), name, font=font_name)
@@ -222,16 +283,15 @@ def _create_tech_template(name, event, date, output_path, width, height):
     name_x = (width - name_width) // 2
     draw.line([name_x, 550, name_x + name_width, 550], fill="#00ff41", width=3)
     
-    center_text("HAS SUCCESSFULLY COMPLETED", 600, font_small, "#cccccc")
-    center_text(event, 650, font_body, "#0099ff")
-    center_text(f"COMPLETION DATE: {date}", 750, font_small, "#cccccc")
-    
-    # Tech corner elements
-    corner_size = 40
-    corners = [(60, 60), (width-100, 60), (60, height-100), (width-100, height-100)]
-    for corner in corners:
-        draw.rectangle([corner[0], corner[1], corner[0]+corner_size, corner[1]+corner_size], 
-                      outline="#00ff41", width=2)
+    _center_text(draw, width, event, 650, font_body, "#0099ff")
+    _center_text(draw, width, f"COMPLETION DATE: {date}", 750, font_small, "#cccccc")
     
     certificate.save(output_path)
     return output_path
+
+
+_BACKGROUND_BUILDERS = {
+    "modern": _modern_background,
+    "elegant": _elegant_background,
+    "tech": _tech_background,
+}
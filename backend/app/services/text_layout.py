@@ -0,0 +1,134 @@
+"""
+Text Layout
+Cached glyph metrics and rasters for drawing letter-spaced text in one pass
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageChops, ImageColor, ImageDraw
+
+# FreeType positions glyphs in 26.6 fixed point, so 1/64 px offsets
+# reproduce Pillow's subpixel rendering exactly (Pillow rounds the
+# fractional pen position to the nearest step)
+SUBPIXEL_STEPS = 64
+
+# Blank margin around each cached glyph raster; antialiasing at a
+# fractional offset can spill a pixel past the glyph's bbox
+GLYPH_PADDING = 2
+
+_lock = threading.Lock()
+
+# (font key, char) -> ink width used as the glyph's advance
+_advances: Dict[tuple, int] = {}
+
+# (font key, char, subpixel step) -> (offset x, offset y, inverted coverage) or None for blank glyphs
+_glyphs: Dict[tuple, Optional[Tuple[int, int, Image.Image]]] = {}
+
+
+def _font_key(font) -> tuple:
+    path = getattr(font, "path", None)
+    if path is not None:
+        return (path, font.size, getattr(font, "index", 0))
+    return (id(font),)
+
+
+def char_width(font, char: str) -> int:
+    """Ink width of `char` in `font` (same as textbbox right - left), cached"""
+    key = (_font_key(font), char)
+    width = _advances.get(key)
+    if width is None:
+        bbox = font.getbbox(char)
+        width = bbox[2] - bbox[0]
+        _advances[key] = width
+    return width
+
+
+def layout_line(text: str, font, x: float, letter_spacing: float = 0) -> List[float]:
+    """
+    Return the x position of each character of `text` starting at `x`
+    Negative letter spacing shrinks the space between characters.
+    """
+    positions = []
+    for char in text:
+        positions.append(x)
+        width = char_width(font, char)
+        x += width + (width * letter_spacing / len(text))
+    return positions
+
+
+def _glyph(font, char: str, step: int) -> Optional[Tuple[int, int, Image.Image]]:
+    """
+    Rasterize `char` at a subpixel offset of step / SUBPIXEL_STEPS px
+    Returns the raster's offset from the pen position and its inverted
+    coverage (255 = no ink), or None if the glyph has no ink.
+    """
+    key = (_font_key(font), char, step)
+    if key in _glyphs:
+        return _glyphs[key]
+
+    left, top, right, bottom = font.getbbox(char)
+    origin_x = GLYPH_PADDING - min(0, left)
+    origin_y = GLYPH_PADDING - min(0, top)
+    canvas = Image.new("L", (origin_x + right + GLYPH_PADDING + 1, origin_y + bottom + GLYPH_PADDING), 0)
+    ImageDraw.Draw(canvas).text((origin_x + step / SUBPIXEL_STEPS, origin_y), char, font=font, fill=255)
+
+    ink_box = canvas.getbbox()
+    if ink_box is None:
+        glyph = None
+    else:
+        coverage = canvas.crop(ink_box)
+        glyph = (ink_box[0] - origin_x, ink_box[1] - origin_y, ImageChops.invert(coverage))
+
+    with _lock:
+        _glyphs[key] = glyph
+    return glyph
+
+
+def place_glyphs(xy: Tuple[float, int], text: str, font, letter_spacing: float = 0) -> List[Tuple[int, int, Image.Image]]:
+    """Return (x, y, inverted coverage) of each inked glyph of `text` laid out from `xy`"""
+    x, y = xy
+    placed = []
+    for pen_x, char in zip(layout_line(text, font, x, letter_spacing), text):
+        whole = int(pen_x)
+        step = round((pen_x - whole) * SUBPIXEL_STEPS)
+        if step == SUBPIXEL_STEPS:
+            whole, step = whole + 1, 0
+        glyph = _glyph(font, char, step)
+        if glyph is not None:
+            offset_x, offset_y, inverted = glyph
+            placed.append((whole + offset_x, int(y) + offset_y, inverted))
+    return placed
+
+
+def composite_glyphs(image: Image.Image, placed: List[Tuple[int, int, Image.Image]], fill="black") -> None:
+    """Paint placed glyphs onto `image` through one combined coverage strip"""
+    if not placed:
+        return
+
+    left = min(gx for gx, _, _ in placed)
+    top = min(gy for _, gy, _ in placed)
+    right = max(gx + g.width for gx, _, g in placed)
+    bottom = max(gy + g.height for _, gy, g in placed)
+
+    # Overlapping glyphs combine like successive draws: the uncovered
+    # fraction of each pixel is the product of each glyph's uncovered fraction
+    strip = Image.new("L", (right - left, bottom - top), 255)
+    for gx, gy, inverted in placed:
+        box = (gx - left, gy - top, gx - left + inverted.width, gy - top + inverted.height)
+        strip.paste(ImageChops.multiply(strip.crop(box), inverted), box)
+
+    image.paste(ImageColor.getcolor(fill, image.mode), (left, top, right, bottom), ImageChops.invert(strip))
+
+
+def draw_spaced_text(image: Image.Image, xy: Tuple[float, int], text: str, font, fill="black", letter_spacing: float = 0) -> None:
+    """
+    Draw `text` with per-character letter spacing in a single composite
+    Glyphs come from the raster cache and are combined into one coverage
+    strip, which is then painted onto `image` with one paste. Glyphs land
+    exactly where drawing each character separately with ImageDraw.text
+    puts them; where antialiased edges of neighbouring glyphs overlap,
+    blending them in one pass can differ from successive draws by one
+    level.
+    """
+    composite_glyphs(image, place_glyphs(xy, text, font, letter_spacing), fill)
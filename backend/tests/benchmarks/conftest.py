@@ -0,0 +1,83 @@
+"""
+Benchmark suite configuration
+
+Benchmarks use pytest-benchmark and only run when asked for, so the
+regular test run stays fast. Timings are only comparable on the machine
+that recorded them (the bulk benchmarks only use the render pool with
+more than one CPU), so comparisons are opt-in and against runs saved
+locally under .benchmarks/, which is not committed:
+
+    # before a change
+    pytest tests/benchmarks --benchmark-only --benchmark-autosave
+
+    # after it: compare with the latest saved run; fails when a benchmark's
+    # median is more than REGRESSION_THRESHOLD slower
+    pytest tests/benchmarks --benchmark-only --benchmark-compare
+
+Set BENCHMARK_LARGE=1 to include the 1000-participant bulk runs.
+"""
+
+import csv
+import io
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from pytest_benchmark.utils import parse_compare_fail
+
+from app.models.certificates import BulkCertificateItem
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Slowdown against the compared run that fails it; the median rides out
+# the odd slow round, and run-to-run noise on small VMs reaches 15-20%
+REGRESSION_THRESHOLD = "median:25%"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Fail comparisons on REGRESSION_THRESHOLD unless a threshold is given"""
+    option = config.option
+    if option.benchmark_compare and not option.benchmark_compare_fail:
+        option.benchmark_compare_fail = [parse_compare_fail(REGRESSION_THRESHOLD)]
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmarks unless --benchmark-only or --benchmark-enable is given"""
+    if config.getoption("benchmark_only") or config.getoption("benchmark_enable"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark-only")
+    for item in items:
+        if str(item.fspath).startswith(BENCHMARK_DIR):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def make_participants():
+    """Factory for distinct, valid participants for bulk benchmarks"""
+    def make(count, prefix="Participant"):
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        participants = []
+        for i in range(count):
+            suffix = letters[i % 26] + letters[(i // 26) % 26] + letters[(i // 676) % 26]
+            participants.append(BulkCertificateItem(
+                participant_name=f"{prefix} {suffix.title()}",
+                email=f"participant{i}@example.com"
+            ))
+        return participants
+    return make
+
+
+@pytest.fixture(scope="session")
+def make_csv(make_participants):
+    """Factory for CSV upload bodies with `rows` participants"""
+    def make(rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["participant_name", "email"])
+        for participant in make_participants(rows):
+            writer.writerow([participant.participant_name, participant.email])
+        return buffer.getvalue()
+    return make
@@ -0,0 +1,83 @@
+"""
+Benchmarks for CSV ingestion and bulk generation
+"""
+
+import os
+
+import pytest
+
+from app.services.bulk_generator import (
+    process_csv_content,
+    generate_bulk_certificates,
+    create_certificates_zip,
+    iter_certificates_zip
+)
+
+BULK_SIZES = [10, 100] + ([1000] if os.getenv("BENCHMARK_LARGE") else [])
+
+
+def test_bench_process_csv_content_10k(benchmark, make_csv):
+    """Parsing and validating a 10k-row CSV upload"""
+    csv_content = make_csv(10_000)
+    participants = benchmark(process_csv_content, csv_content)
+    assert len(participants) == 10_000
+
+
+def test_bench_process_csv_content_10k_lightweight(benchmark, make_csv):
+    """Parsing a 10k-row CSV upload into lightweight records"""
+    csv_content = make_csv(10_000)
+    participants = benchmark(process_csv_content, csv_content, lightweight=True)
+    assert len(participants) == 10_000
+
+
+@pytest.mark.parametrize("count", BULK_SIZES)
+def test_bench_generate_bulk_certificates(benchmark, tmp_path, make_participants, count):
+    """Rendering a batch end to end (pool start-up excluded by a warm-up round)"""
+    participants = make_participants(count)
+    output_dir = str(tmp_path / "bulk")
+
+    result = benchmark.pedantic(
+        generate_bulk_certificates,
+        args=("GDG Babcock Hacktoberfest 2025", "2025-10-03", participants),
+        kwargs={"output_dir": output_dir, "resume": False},
+        rounds=3,
+        warmup_rounds=1
+    )
+    assert result["success_count"] == count
+
+
+def test_bench_rerun_bulk_certificates_with_manifest(benchmark, tmp_path, make_participants):
+    """Rerunning a 200-person batch where only 3 participants changed"""
+    participants = make_participants(200)
+    output_dir = str(tmp_path / "bulk")
+    generate_bulk_certificates("GDG Babcock Hacktoberfest 2025", "2025-10-03", participants, output_dir=output_dir)
+
+    changed = participants[:-3] + make_participants(3, prefix="Changed")
+    result = benchmark.pedantic(
+        generate_bulk_certificates,
+        args=("GDG Babcock Hacktoberfest 2025", "2025-10-03", changed),
+        kwargs={"output_dir": output_dir},
+        rounds=1
+    )
+    assert result["reused_count"] == 197
+
+
+@pytest.fixture(scope="module")
+def rendered_batch(tmp_path_factory, make_participants):
+    output_dir = str(tmp_path_factory.mktemp("zip"))
+    result = generate_bulk_certificates(
+        "GDG Babcock Hacktoberfest 2025", "2025-10-03", make_participants(100), output_dir=output_dir
+    )
+    return output_dir, result["successful_certificates"]
+
+
+def test_bench_create_certificates_zip(benchmark, rendered_batch):
+    """Writing a 100-certificate archive to disk"""
+    output_dir, certificates = rendered_batch
+    benchmark(create_certificates_zip, certificates, output_dir)
+
+
+def test_bench_iter_certificates_zip(benchmark, rendered_batch):
+    """Streaming a 100-certificate archive"""
+    _, certificates = rendered_batch
+    benchmark(lambda: sum(len(chunk) for chunk in iter_certificates_zip(certificates)))
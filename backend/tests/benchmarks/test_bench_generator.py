@@ -0,0 +1,34 @@
+"""
+Benchmarks for single certificate rendering
+"""
+
+import pytest
+
+from app.services.generator import generate_certificate, render_certificate, encode_certificate
+from app.services.template_generator import get_modern_certificate_template
+
+
+@pytest.mark.parametrize("cert_type", ["completion", "participation"])
+def test_bench_generate_certificate(benchmark, tmp_path, cert_type):
+    """Full render, PNG encode and write"""
+    output_path = str(tmp_path / "certificate.png")
+    benchmark(generate_certificate, "Jane Doe", "GDG Babcock Hacktoberfest 2025", "2025-10-03", cert_type, output_path)
+
+
+@pytest.mark.parametrize("cert_type", ["completion", "participation"])
+def test_bench_render_certificate(benchmark, cert_type):
+    """Render only, no encoding"""
+    benchmark(render_certificate, "Jane Doe", "GDG Babcock Hacktoberfest 2025", "2025-10-03", cert_type)
+
+
+def test_bench_encode_certificate(benchmark):
+    """PNG encoding of a rendered certificate"""
+    image = render_certificate("Jane Doe", "GDG Babcock Hacktoberfest 2025", "2025-10-03", "completion")
+    benchmark(encode_certificate, image)
+
+
+@pytest.mark.parametrize("style", ["modern", "elegant", "tech"])
+def test_bench_template_generator(benchmark, tmp_path, style):
+    """Generated template styles"""
+    output_path = str(tmp_path / f"{style}.png")
+    benchmark(get_modern_certificate_template, "Jane Doe", "GDG Babcock Hacktoberfest 2025", "2025-10-03", output_path, style)
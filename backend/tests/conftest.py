@@ -0,0 +1,46 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# add backend/ to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the registry at a throwaway database before any app module creates
+# its engine, so tests never write to ./certificates.db
+_database_dir = tempfile.mkdtemp(prefix="certificates-test-db-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'certificates.db')}"
+
+# Likewise publish shared rasters (decoded templates, one per template file
+# a test writes) to a private directory of our own, seen by the render pool
+# processes too, rather than the host-wide one
+_raster_dir = tempfile.mkdtemp(prefix="certificates-test-rasters-")
+os.environ["SHARED_RASTER_DIR"] = _raster_dir
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """
+    Create the schema once (the test clients don't run the app lifespan),
+    and remove the session's database and rasters afterwards
+    """
+    from app.database import engine, init_db
+    init_db()
+    yield
+    engine.dispose()
+    shutil.rmtree(_database_dir, ignore_errors=True)
+    shutil.rmtree(_raster_dir, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def output_dirs(tmp_path, monkeypatch):
+    """Write certificates and bulk batches under the test's tmp_path, not backend/certificates/"""
+    from app.api import certificates as certificates_api
+    from app.services.storage import DiskStorage, storage
+    root = tmp_path / "certificates"
+    if isinstance(storage, DiskStorage):
+        monkeypatch.setattr(storage, "root", str(root))
+    monkeypatch.setattr(certificates_api, "BULK_OUTPUT_DIR", str(root / "bulk"))
+    return root
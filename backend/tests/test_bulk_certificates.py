@@ -3,12 +3,33 @@ Tests for bulk certificate generation functionality
 """
 
 import pytest
+import io
 import tempfile
 import os
+import time
+import zipfile
 from fastapi.testclient import TestClient
 from app.main import app
-from app.services.bulk_generator import process_csv_content, generate_bulk_certificates
-from app.models.certificates import BulkCertificateItem
+from app.api import certificates as certificates_api
+from app.services import bulk_generator
+from app.services.bulk_generator import (
+    process_csv_content,
+    generate_bulk_certificates,
+    render_bulk_batch,
+    shutdown_bulk_executor,
+    create_certificates_zip,
+    BatchManifest,
+    ParticipantBatch,
+    STATUS_SUCCEEDED,
+    batch_archive_filename,
+    load_batch,
+    prune_archives,
+    render_cache_dir,
+    render_cache_id
+)
+from app.services.jobs import BulkJob, job_store
+from app.services.repository import record_bulk_certificates, repository
+from app.models.certificates import BulkCertificateItem, ParticipantRecord
 
 client = TestClient(app)
 
@@ -57,6 +78,37 @@ Mike Johnson,mike@example.com"""
         assert participants[0].participant_name == "John Doe"
         assert participants[1].participant_name == "Mike Johnson"
 
+    def test_process_csv_content_alternate_columns(self):
+        """Test header resolution with fallback columns and invalid names"""
+        csv_content = """email_address,name,full_name
+a@example.com,,Ada Lovelace
+b@example.com,Grace Hopper,Ignored Name
+c@example.com,Bad#Name,
+d@example.com
+e@example.com,AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA,"""
+        
+        participants = process_csv_content(csv_content)
+        
+        assert [p.participant_name for p in participants] == ["Ada Lovelace", "Grace Hopper"]
+        assert [p.email for p in participants] == ["a@example.com", "b@example.com"]
+        assert all(isinstance(p, BulkCertificateItem) for p in participants)
+
+    def test_process_csv_content_lightweight_records(self):
+        """Test that lightweight parsing yields plain records with the same fields"""
+        csv_content = """participant_name,email
+John Doe,john@example.com
+Jane Smith,"""
+        
+        records = process_csv_content(csv_content, lightweight=True)
+        
+        assert records == [
+            ParticipantRecord("John Doe", "john@example.com"),
+            ParticipantRecord("Jane Smith", None)
+        ]
+        assert [r.participant_name for r in records] == [
+            p.participant_name for p in process_csv_content(csv_content)
+        ]
+
     def test_bulk_certificate_api_json_payload(self):
         """Test bulk certificate generation via JSON API"""
         payload = {
@@ -78,6 +130,12 @@ Mike Johnson,mike@example.com"""
         assert "successful_certificates" in data
         assert "failed_certificates" in data
 
+        if data["success_count"]:
+            download = client.get(data["download_url"])
+            assert download.status_code == 200
+            with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+                assert len(archive.namelist()) == data["success_count"]
+
     def test_bulk_certificate_api_csv_upload(self):
         """Test bulk certificate generation via CSV upload"""
         # Create a temporary CSV file
@@ -170,6 +228,463 @@ Jane Smith,jane@example.com"""
         with pytest.raises(ValueError):
             BulkCertificateItem(participant_name="John@#$", email="john@example.com")
 
+        # Longer than the registry's participant_name column
+        with pytest.raises(ValueError):
+            BulkCertificateItem(participant_name="A" * 101)
+
+    def test_generate_bulk_certificates_parallel_keeps_order(self):
+        """Test that pooled rendering keeps participant order and result shape"""
+        names = ["Alice Doe", "Bob Doe", "Carol Doe", "Dan Doe", "Eve Doe",
+                 "Frank Doe", "Grace Doe", "Heidi Doe", "Ivan Doe", "Judy Doe"]
+        participants = [BulkCertificateItem(participant_name=name) for name in names]
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            result = generate_bulk_certificates(
+                "Test Event 2025", "2025-10-22", participants,
+                output_dir=output_dir, max_workers=2
+            )
+
+            assert result["total_count"] == len(names)
+            assert result["success_count"] == len(names)
+            assert [c["participant_name"] for c in result["successful_certificates"]] == names
+            for cert in result["successful_certificates"]:
+                assert os.path.exists(cert["file_path"])
+
+        shutdown_bulk_executor()
+
+    def test_generate_bulk_certificates_consumes_iterable_in_chunks(self, monkeypatch):
+        """Test that a lazy participant stream is rendered chunk by chunk"""
+        monkeypatch.setattr(bulk_generator, "BULK_CHUNK_SIZE", 4)
+        names = [f"Person {chr(ord('A') + i)}" for i in range(10)]
+        consumed = []
+
+        def stream():
+            for name in names:
+                consumed.append(name)
+                yield BulkCertificateItem(participant_name=name)
+
+        seen = []
+
+        def on_result(index):
+            # Inputs are read at most one chunk ahead of rendering
+            assert len(consumed) - len(seen) <= 4
+            seen.append(batch.names[index])
+
+        batch = ParticipantBatch("unused")
+        with tempfile.TemporaryDirectory() as output_dir:
+            batch.output_dir = output_dir
+            render_bulk_batch(
+                "Test Event 2025", "2025-10-22", stream(),
+                output_dir=output_dir, max_workers=1, batch=batch, on_result=on_result
+            )
+
+        assert len(batch) == len(names)
+        assert seen == names
+
+    def test_generate_bulk_certificates_rerun_renders_only_changes(self):
+        """Test that a rerun reuses unchanged renders recorded in the batch manifest"""
+        names = ["Alice Doe", "Bob Doe", "Carol Doe"]
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            first = generate_bulk_certificates(
+                "Test Event 2025", "2025-10-22",
+                [BulkCertificateItem(participant_name=name) for name in names],
+                output_dir=output_dir, max_workers=1
+            )
+            assert first["reused_count"] == 0
+            cache_id = render_cache_id("Test Event 2025", "2025-10-22", "participation", "png")
+            cache_dir = render_cache_dir(output_dir, cache_id)
+            assert all(os.path.dirname(c["file_path"]) == cache_dir for c in first["successful_certificates"])
+            manifest = BatchManifest.load(cache_dir, cache_id)
+            assert len(manifest.entries) == 3
+            assert all(entry["sha256"] and entry["unique_id"] for entry in manifest.entries.values())
+
+            # One changed name and one deleted file are rendered again
+            os.remove(first["successful_certificates"][1]["file_path"])
+            rerun = generate_bulk_certificates(
+                "Test Event 2025", "2025-10-22",
+                [BulkCertificateItem(participant_name=name) for name in ["Alice Doe", "Bob Doe", "Dave Doe"]],
+                output_dir=output_dir, max_workers=1
+            )
+            assert rerun["success_count"] == 3
+            assert rerun["reused_count"] == 1
+            assert [c["participant_name"] for c in rerun["successful_certificates"]] == ["Alice Doe", "Bob Doe", "Dave Doe"]
+            # Reused and re-rendered rows keep their certificate ids
+            first_ids = [c["unique_id"] for c in first["successful_certificates"]]
+            assert [c["unique_id"] for c in rerun["successful_certificates"]][:2] == first_ids[:2]
+            assert all(os.path.exists(c["file_path"]) for c in rerun["successful_certificates"])
+
+            # Each run keeps its own results
+            assert rerun["batch_id"] != first["batch_id"]
+            assert [r["participant_name"] for r in load_batch(output_dir, first["batch_id"]).successful()] == names
+            assert len(BatchManifest.load(cache_dir, cache_id).entries) == 4
+
+            # A different output format renders into a different cache
+            other = generate_bulk_certificates(
+                "Test Event 2025", "2025-10-22",
+                [BulkCertificateItem(participant_name="Alice Doe")],
+                output_dir=output_dir, max_workers=1, output_format="webp-lossy"
+            )
+            assert os.path.dirname(other["successful_certificates"][0]["file_path"]) != cache_dir
+            assert other["reused_count"] == 0
+
+    def test_overlapping_runs_merge_their_manifest_entries(self, tmp_path):
+        """Test that saving one run's manifest keeps entries another run saved meanwhile"""
+        first = BatchManifest.load(str(tmp_path), "cache")
+        second = BatchManifest.load(str(tmp_path), "cache")
+        first.update("hash_a", "Alice Doe", True, "alice.png", "a" * 64, "cert_a")
+        second.update("hash_b", "Bob Doe", True, "bob.png", "b" * 64, "cert_b")
+        first.save()
+        second.save()
+
+        assert set(BatchManifest.load(str(tmp_path), "cache").entries) == {"hash_a", "hash_b"}
+        assert set(second.entries) == {"hash_a", "hash_b"}
+
+    def test_names_differing_in_punctuation_get_separate_files(self):
+        """Test that names stripping to the same text never share a file"""
+        participants = [BulkCertificateItem(participant_name=name) for name in ("O'Brien", "OBrien")]
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            result = generate_bulk_certificates("Test Event 2025", "2025-10-22", participants, output_dir=output_dir, max_workers=1)
+            paths = [c["file_path"] for c in result["successful_certificates"]]
+            assert len(set(paths)) == 2
+            assert all(os.path.exists(path) for path in paths)
+            assert not [name for name in os.listdir(os.path.dirname(paths[0])) if name.endswith(".part")]
+
+    def test_rerun_never_reuses_another_events_render(self):
+        """Test that batches for different events on the same date keep separate files"""
+        alice = [BulkCertificateItem(participant_name="Alice Doe")]
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            alpha = generate_bulk_certificates("Event Alpha", "2025-10-22", alice, output_dir=output_dir, max_workers=1)
+            beta = generate_bulk_certificates("Event Beta", "2025-10-22", alice, output_dir=output_dir, max_workers=1)
+            rerun = generate_bulk_certificates("Event Alpha", "2025-10-22", alice, output_dir=output_dir, max_workers=1)
+
+            alpha_path = alpha["successful_certificates"][0]["file_path"]
+            beta_path = beta["successful_certificates"][0]["file_path"]
+            assert alpha_path != beta_path
+            assert rerun["reused_count"] == 1
+            assert rerun["successful_certificates"][0]["file_path"] == alpha_path
+            with open(alpha_path, "rb") as a, open(beta_path, "rb") as b:
+                assert a.read() != b.read()
+
+    def test_rerun_renders_again_when_file_changed_on_disk(self):
+        """Test that a file whose digest no longer matches its manifest entry is not reused"""
+        alice = [BulkCertificateItem(participant_name="Alice Doe")]
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            first = generate_bulk_certificates("Test Event 2025", "2025-10-22", alice, output_dir=output_dir, max_workers=1)
+            file_path = first["successful_certificates"][0]["file_path"]
+            with open(file_path, "rb") as f:
+                rendered = f.read()
+            with open(file_path, "wb") as f:
+                f.write(b"not a certificate")
+
+            rerun = generate_bulk_certificates("Test Event 2025", "2025-10-22", alice, output_dir=output_dir, max_workers=1)
+            assert rerun["reused_count"] == 0
+            with open(file_path, "rb") as f:
+                assert f.read() == rendered
+
+    def test_recording_a_rerun_keeps_certificate_ids(self, tmp_path):
+        """Test that recording a rerun does not register reused certificates again"""
+        participants = [BulkCertificateItem(participant_name=name) for name in ("Alice Doe", "Alice Doe", "Bob Doe")]
+        runs = []
+        for _ in range(2):
+            batch = render_bulk_batch(
+                "Recorded Event 2025", "2025-10-22", participants, output_dir=str(tmp_path), max_workers=1,
+                cache_id="recorded_batch"
+            )
+            record_bulk_certificates("Recorded Event 2025", "2025-10-22", "participation", batch)
+            runs.append(list(batch.unique_ids))
+
+        assert runs[0] == runs[1]
+        assert runs[0][0] == runs[0][1]
+        assert repository.existing_ids(runs[0]) == set(runs[0])
+        rows, _ = repository.list_page(event_name="Recorded Event 2025", limit=10)
+        assert sorted(row.unique_id for row in rows) == sorted(set(runs[0]))
+
+    def test_create_certificates_zip_names_archive_by_batch(self):
+        """Test that batches of the same size no longer share an archive name"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            first = generate_bulk_certificates(
+                "Test Event 2025", "2025-10-22", [BulkCertificateItem(participant_name="Alice Doe")],
+                output_dir=output_dir, max_workers=1
+            )
+            second = generate_bulk_certificates(
+                "Other Event 2025", "2025-10-22", [BulkCertificateItem(participant_name="Bob Doe")],
+                output_dir=output_dir, max_workers=1
+            )
+            first_zip = create_certificates_zip(first["successful_certificates"], output_dir, batch_id=first["batch_id"])
+            second_zip = create_certificates_zip(second["successful_certificates"], output_dir)
+            assert first_zip.endswith(f"certificates_bulk_{first['batch_id']}.zip")
+            assert first_zip != second_zip
+
+    def test_participant_batch_pages_and_summaries(self):
+        """Test the columnar batch's summary, records and paging"""
+        batch = ParticipantBatch("out")
+        batch.append("John Doe", "john@example.com", True, "John_Doe_cert.png")
+        batch.append("Bad Name", None, False, "render failed")
+        batch.append("Jane Smith", None, True, "Jane_Smith_cert.png")
+
+        assert batch.summary() == {"success_count": 2, "failed_count": 1, "total_count": 3}
+        assert batch.record(0) == {
+            "participant_name": "John Doe",
+            "email": "john@example.com",
+            "filename": "John_Doe_cert.png",
+            "file_path": os.path.join("out", "John_Doe_cert.png")
+        }
+        assert batch.record(1) == {"participant_name": "Bad Name", "email": None, "error": "render failed"}
+
+        total, page = batch.page(offset=1, limit=1, status=STATUS_SUCCEEDED)
+        assert total == 2
+        assert [(r["index"], r["status"], r["participant_name"]) for r in page] == [(2, "succeeded", "Jane Smith")]
+
+        result = batch.to_dict()
+        assert [c["participant_name"] for c in result["successful_certificates"]] == ["John Doe", "Jane Smith"]
+        assert result["failed_count"] == 1
+
+    def test_bulk_output_format(self):
+        """Test that bulk batches are written in the requested format"""
+        payload = {
+            "event_name": "Test Event 2025",
+            "date_issued": "2025-10-22",
+            "output_format": "webp-lossy",
+            "participants": [{"participant_name": "John Doe"}, {"participant_name": "Jane Smith"}]
+        }
+
+        response = client.post("/certificates/bulk", json=payload)
+        assert response.status_code == 200
+        certificates = response.json()["successful_certificates"]
+        assert [c["filename"][:20] for c in certificates] == ["John_Doe_2025-10-22_", "Jane_Smith_2025-10-2"]
+        assert all(c["filename"].endswith("_cert.webp") for c in certificates)
+        for cert in certificates:
+            with open(cert["file_path"], "rb") as f:
+                assert f.read(4) == b"RIFF"
+
+    def test_bulk_summary_only_with_paged_results(self):
+        """Test a summary-only bulk response and paging through its results"""
+        payload = {
+            "event_name": "Test Event 2025",
+            "date_issued": "2025-10-22",
+            "participants": [
+                {"participant_name": "John Doe"},
+                {"participant_name": "Jane Smith"},
+                {"participant_name": "Mike Johnson"}
+            ]
+        }
+
+        response = client.post("/certificates/bulk", json=payload, params={"summary_only": True})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success_count"] == 3
+        assert data["successful_certificates"] is None
+        assert data["results_url"] == f"/certificates/bulk/batches/{data['batch_id']}/results"
+
+        page = client.get(data["results_url"], params={"offset": 1, "limit": 5}).json()
+        assert page["total"] == 3
+        assert [r["participant_name"] for r in page["results"]] == ["Jane Smith", "Mike Johnson"]
+        assert all(r["status"] == "succeeded" and r["unique_id"] for r in page["results"])
+
+        failed = client.get(data["results_url"], params={"status": "failed"}).json()
+        assert failed["total"] == 0 and failed["results"] == []
+
+        # Results and downloads are read back from the batch's manifest on
+        # disk, so they do not depend on the process that rendered them
+        batch = load_batch(certificates_api.BULK_OUTPUT_DIR, data["batch_id"])
+        assert [r["unique_id"] for r in batch.successful()[1:]] == [r["unique_id"] for r in page["results"]]
+        assert batch.summary() == {"success_count": 3, "failed_count": 0, "total_count": 3}
+        # Nothing is written until a download needs a file: a plain download
+        # is streamed, and a resumed one writes the same bytes to disk
+        archive_path = os.path.join(batch.output_dir, batch_archive_filename(data["batch_id"]))
+        assert not os.path.exists(archive_path)
+        download = client.get(data["download_url"])
+        assert download.status_code == 200
+        assert download.headers["cache-control"] == "no-cache"
+        assert download.headers["accept-ranges"] == "bytes"
+        assert not os.path.exists(archive_path)
+        with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+            assert sorted(archive.namelist()) == sorted(r["filename"] for r in batch.successful())
+
+        resumed = client.get(data["download_url"], headers={"Range": "bytes=100-"})
+        assert resumed.status_code == 206
+        assert resumed.content == download.content[100:]
+        assert os.path.exists(archive_path)
+        # Once on disk, it is served from the file; a rerun can rewrite it,
+        # so it is revalidated rather than cached
+        from_file = client.get(data["download_url"])
+        assert from_file.content == download.content
+        assert from_file.headers["cache-control"] == "no-cache"
+        revalidated = client.get(data["download_url"], headers={"If-None-Match": from_file.headers["etag"]})
+        assert revalidated.status_code == 304
+
+        # Pruned archives are streamed again, and written again when resumed
+        assert prune_archives(certificates_api.BULK_OUTPUT_DIR, max_age=-1) >= 1
+        assert not os.path.exists(archive_path)
+        assert client.get(data["download_url"]).content == download.content
+        assert client.get(data["download_url"], headers={"Range": "bytes=0-"}).content == download.content
+
+        assert client.get("/certificates/bulk/batches/0123456789abcdef/results").status_code == 404
+        assert client.get("/certificates/bulk/batches/not-a-batch/download").status_code == 422
+
+    def test_later_upload_for_the_same_event_keeps_earlier_results(self):
+        """Test that each upload gets its own results and archive"""
+        def upload(names):
+            response = client.post("/certificates/bulk", json={
+                "event_name": "Shared Event 2025",
+                "date_issued": "2025-10-22",
+                "participants": [{"participant_name": name} for name in names]
+            })
+            assert response.status_code == 200
+            return response.json()
+
+        first = upload(["Alice Doe", "Bob Doe"])
+        second = upload(["Carol Doe"])
+        assert first["batch_id"] != second["batch_id"]
+
+        for data, names in ((first, ["Alice Doe", "Bob Doe"]), (second, ["Carol Doe"])):
+            page = client.get(data["results_url"]).json()
+            assert [r["participant_name"] for r in page["results"]] == names
+            download = client.get(data["download_url"])
+            with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+                assert sorted(archive.namelist()) == sorted(c["filename"] for c in data["successful_certificates"])
+
+    def test_bulk_csv_upload_beyond_item_limit(self):
+        """Test that CSV uploads are not capped at the JSON batch size"""
+        names = [f"Person {chr(ord('A') + i // 26)}{chr(ord('a') + i % 26)}" for i in range(120)]
+        csv_content = "participant_name,email\n" + "".join(f"{name},\n" for name in names)
+
+        response = client.post(
+            "/certificates/bulk/csv",
+            params={"event_name": "Test Event 2025", "date_issued": "2025-10-22"},
+            files={"csv_file": ("alumni.csv", csv_content.encode(), "text/csv")}
+        )
+        shutdown_bulk_executor()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] == 120
+        assert data["success_count"] == 120
+        assert [c["participant_name"] for c in data["successful_certificates"]] == names
+
+    def test_bulk_csv_upload_without_participants(self):
+        """Test that a CSV with no valid rows is rejected"""
+        response = client.post(
+            "/certificates/bulk/csv",
+            params={"event_name": "Test Event 2025", "date_issued": "2025-10-22"},
+            files={"csv_file": ("empty.csv", b"participant_name,email\n,a@example.com\n", "text/csv")}
+        )
+        assert response.status_code == 400
+        assert "No valid participants" in response.json()["detail"]
+
+    def test_bulk_csv_job_reports_total_once_read(self):
+        """Test a CSV job streaming rows from its spooled upload"""
+        response = client.post(
+            "/certificates/bulk/csv/jobs",
+            params={"event_name": "Test Event 2025", "date_issued": "2025-10-22"},
+            files={"csv_file": ("people.csv", b"name\nJohn Doe\nJane Smith\nBad#Name\n", "text/csv")}
+        )
+        assert response.status_code == 202
+        job = response.json()
+
+        deadline = time.time() + 30
+        while True:
+            status = client.get(job["status_url"]).json()
+            if status["status"] in ("completed", "failed") or time.time() > deadline:
+                break
+            time.sleep(0.05)
+
+        assert status["status"] == "completed"
+        assert status["total_count"] == 2
+        assert [c["participant_name"] for c in status["successful_certificates"]] == ["John Doe", "Jane Smith"]
+
+    def test_bulk_certificate_job_lifecycle(self):
+        """Test queueing a bulk job and polling it to completion"""
+        payload = {
+            "event_name": "Test Event 2025",
+            "date_issued": "2025-10-22",
+            "participants": [
+                {"participant_name": "John Doe", "email": "john@example.com"},
+                {"participant_name": "Jane Smith", "email": "jane@example.com"}
+            ]
+        }
+
+        response = client.post("/certificates/bulk/jobs", json=payload)
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] in ("queued", "running", "completed")
+        assert job["total_count"] == 2
+
+        deadline = time.time() + 30
+        while True:
+            status = client.get(job["status_url"]).json()
+            if status["status"] in ("completed", "failed") or time.time() > deadline:
+                break
+            time.sleep(0.05)
+
+        assert status["status"] == "completed"
+        assert status["done_count"] == 2
+        assert status["success_count"] == 2
+        assert [c["participant_name"] for c in status["successful_certificates"]] == ["John Doe", "Jane Smith"]
+        assert status["download_url"] is not None
+        assert {"layout", "draw", "encode", "write"} <= set(status["stage_seconds"])
+
+        download = client.get(status["download_url"])
+        assert download.status_code == 200
+        assert download.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+            assert archive.testzip() is None
+            assert len(archive.namelist()) == 2
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+
+        # A finished job's archive is streamed; resuming the download writes
+        # the same bytes to disk, and the file is served from then on
+        assert download.headers["cache-control"] == "no-store"
+        assert download.headers["accept-ranges"] == "bytes"
+        assert "zip" not in client.get(job["status_url"]).json()["stage_seconds"]
+        resumed = client.get(status["download_url"], headers={"Range": "bytes=100-"})
+        assert resumed.status_code == 206
+        assert resumed.content == download.content[100:]
+        assert "immutable" in resumed.headers["cache-control"]
+        etag = resumed.headers["etag"]
+        assert client.get(status["download_url"], headers={"If-None-Match": etag}).status_code == 304
+        assert "zip" in client.get(job["status_url"]).json()["stage_seconds"]
+
+    def test_bulk_certificate_job_served_from_its_state_file(self):
+        """Test that a job is reported from disk by a process that did not run it"""
+        payload = {
+            "event_name": "Test Event 2025",
+            "date_issued": "2025-10-22",
+            "participants": [
+                {"participant_name": "John Doe"},
+                {"participant_name": "Jane Smith"}
+            ]
+        }
+        job = client.post("/certificates/bulk/jobs", json=payload).json()
+        deadline = time.time() + 30
+        while client.get(job["status_url"]).json()["status"] not in ("completed", "failed") and time.time() < deadline:
+            time.sleep(0.05)
+        live = client.get(job["status_url"]).json()
+        download = client.get(live["download_url"]).content
+
+        # As seen from another worker: the job is not in its memory
+        with job_store._lock:
+            del job_store._jobs[job["job_id"]]
+        loaded = BulkJob.load(certificates_api.BULK_OUTPUT_DIR, job["job_id"])
+        assert loaded is not None and loaded.status == "completed"
+
+        assert client.get(job["status_url"]).json() == live
+        page = client.get(live["results_url"], params={"offset": 1}).json()
+        assert [r["participant_name"] for r in page["results"]] == ["Jane Smith"]
+        assert client.get(live["download_url"]).content == download
+
+        assert BulkJob.load(certificates_api.BULK_OUTPUT_DIR, "job_000000000000") is None
+        assert BulkJob.load(certificates_api.BULK_OUTPUT_DIR, "../" + job["job_id"]) is None
+
+    def test_bulk_certificate_job_not_found(self):
+        """Test polling an unknown bulk job"""
+        response = client.get("/certificates/bulk/jobs/job_missing")
+        assert response.status_code == 404
+
     def test_download_bulk_certificates_not_found(self):
         """Test downloading non-existent bulk certificate file"""
         response = client.get("/certificates/bulk/download/nonexistent.zip")
@@ -4,6 +4,12 @@ from httpx import ASGITransport
 import sys
 import os
 import uuid
+import io
+import hashlib
+import asyncio
+import threading
+
+from PIL import Image
 
 # add the full project path to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -15,6 +21,10 @@ sys.path.insert(0, project_root)  # backend/
 sys.path.insert(0, parent_dir)    # gdg-babcock-hacktoberfest-2025/
 
 from app.main import app
+from app.api import certificates as certificates_api
+from app.services.dispatcher import RenderDispatcher
+from app.services.encoders import encode
+from app.services.layouts import layout_registry
 
 class TestCertificateEndpoints:
     """
@@ -214,3 +224,376 @@ class TestGetCertificateEndpoints:
             # attempt to GET certificate again
             get_response = await client.get(f"/certificates/{unique_id}")
             assert get_response.status_code == 404, f"Expected 404 for missing file, got {get_response.status_code}"
+
+
+class TestInlineCertificateEndpoints:
+    """
+    Automated tests for POST /certificates/?inline=true
+    """
+
+    @pytest.mark.asyncio
+    async def test_post_certificate_inline_returns_png(self):
+        """
+        Test that inline mode returns the rendered PNG in the POST response
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            data = {
+                "participant_name": "Lionel Messi",
+                "event_name": "GDG Babcock Hacktoberfest 2025",
+                "date_issued": "2025-10-08",
+                "certificate_type": "completion"
+            }
+
+            response = await client.post("/certificates/?inline=true", json=data)
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "image/png"
+            assert response.content[:8] == b'\x89PNG\r\n\x1a\n', "Not a valid PNG file"
+
+            # the stored record can still be fetched by id
+            unique_id = response.headers["x-certificate-id"]
+            get_response = await client.get(f"/certificates/{unique_id}")
+            assert get_response.status_code == 200
+            assert get_response.content == response.content
+
+
+class TestCertificateOutputFormats:
+    """
+    Automated tests for the output_format option
+    """
+
+    @pytest.mark.asyncio
+    async def test_post_certificate_in_each_format(self):
+        """
+        Test that non-PNG formats are served with matching type and extension
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            for output_format, media_type, magic in (
+                ("pdf", "application/pdf", b"%PDF"),
+                ("webp-lossy", "image/webp", b"RIFF"),
+            ):
+                data = {
+                    "participant_name": "Lionel Messi",
+                    "event_name": "GDG Babcock Hacktoberfest 2025",
+                    "date_issued": "2025-10-08",
+                    "certificate_type": "completion",
+                    "output_format": output_format
+                }
+
+                response = await client.post("/certificates/", json=data)
+                assert response.status_code == 200
+                body = response.json()
+                assert body["filename"].endswith("." + media_type.split("/")[1])
+
+                get_response = await client.get(body["download_url"])
+                assert get_response.status_code == 200
+                assert get_response.headers["content-type"] == media_type
+                assert get_response.content.startswith(magic)
+
+    @pytest.mark.asyncio
+    async def test_post_certificate_rejects_unknown_format(self):
+        """
+        Test that an unsupported output format is a validation error
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            data = {
+                "participant_name": "Lionel Messi",
+                "event_name": "GDG Babcock Hacktoberfest 2025",
+                "date_issued": "2025-10-08",
+                "certificate_type": "completion",
+                "output_format": "gif"
+            }
+            response = await client.post("/certificates/", json=data)
+            assert response.status_code == 422
+
+
+class TestCertificatePreviews:
+    """
+    Automated tests for GET /certificates/{unique_id}?width=
+    """
+
+    @pytest.mark.asyncio
+    async def test_get_certificate_preview(self):
+        """
+        Test that a width returns a small WebP preview and large widths the original
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            for output_format in ("png", "pdf"):
+                data = {
+                    "participant_name": "Grace Hopper",
+                    "event_name": "GDG Babcock Hacktoberfest 2025",
+                    "date_issued": "2025-10-08",
+                    "certificate_type": "completion",
+                    "output_format": output_format
+                }
+                response = await client.post("/certificates/", json=data)
+                download_url = response.json()["download_url"]
+
+                preview = await client.get(download_url, params={"width": 300})
+                assert preview.status_code == 200
+                assert preview.headers["content-type"] == "image/webp"
+                with Image.open(io.BytesIO(preview.content)) as image:
+                    assert image.width == 320
+
+                full = await client.get(download_url)
+                assert len(preview.content) < len(full.content)
+
+                original = await client.get(download_url, params={"width": 4000})
+                assert original.content == full.content
+
+    @pytest.mark.asyncio
+    async def test_preview_follows_file_regenerated_in_place(self):
+        """
+        Test that a bulk file rewritten under the same id gets a new preview
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            response = await client.post("/certificates/bulk", json={
+                "event_name": "Preview Refresh Event",
+                "date_issued": "2025-10-08",
+                "output_format": "pdf",
+                "participants": [{"participant_name": "Ada Lovelace"}]
+            })
+            certificate = response.json()["successful_certificates"][0]
+            page = (await client.get(response.json()["results_url"])).json()
+            download_url = f"/certificates/{page['results'][0]['unique_id']}"
+
+            first = await client.get(download_url, params={"width": 160})
+            assert first.status_code == 200
+
+            with open(certificate["file_path"], "wb") as f:
+                f.write(encode(Image.new("RGB", (842, 595), "black"), "pdf"))
+            second = await client.get(download_url, params={"width": 160})
+            assert second.status_code == 200
+            assert second.headers["etag"] != first.headers["etag"]
+            # The preview shows the stored file, not a fresh render
+            with Image.open(io.BytesIO(second.content)) as image:
+                assert image.convert("L").getextrema()[1] < 16
+
+
+class TestCertificateHttpCaching:
+    """
+    Automated tests for ETag, conditional GET and Range on downloads
+    """
+
+    @pytest.mark.asyncio
+    async def test_get_certificate_validators_and_ranges(self):
+        """
+        Test strong ETags, 304 responses and partial content
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            data = {
+                "participant_name": "Katherine Johnson",
+                "event_name": "GDG Babcock Hacktoberfest 2025",
+                "date_issued": "2025-10-08",
+                "certificate_type": "completion"
+            }
+            response = await client.post("/certificates/", json=data)
+            download_url = response.json()["download_url"]
+
+            full = await client.get(download_url)
+            assert full.status_code == 200
+            etag = full.headers["etag"]
+            assert etag == f'"{hashlib.sha256(full.content).hexdigest()}"'
+            assert "immutable" in full.headers["cache-control"]
+            assert "last-modified" in full.headers
+
+            cached = await client.get(download_url, headers={"If-None-Match": etag})
+            assert cached.status_code == 304
+            assert cached.content == b""
+            assert cached.headers["etag"] == etag
+
+            since = await client.get(download_url, headers={"If-Modified-Since": full.headers["last-modified"]})
+            assert since.status_code == 304
+
+            changed = await client.get(download_url, headers={"If-None-Match": '"other"'})
+            assert changed.status_code == 200
+
+            partial = await client.get(download_url, headers={"Range": "bytes=0-9"})
+            assert partial.status_code == 206
+            assert partial.content == full.content[:10]
+
+            preview = await client.get(download_url, params={"width": 160})
+            preview_cached = await client.get(
+                download_url, params={"width": 160}, headers={"If-None-Match": preview.headers["etag"]}
+            )
+            assert preview_cached.status_code == 304
+
+
+class TestCertificateBackpressure:
+    """
+    Automated tests for 503 responses when the render pool is saturated
+    """
+
+    @pytest.mark.asyncio
+    async def test_post_certificate_when_saturated(self, monkeypatch):
+        """
+        Test that a full render queue returns 503 with Retry-After
+        """
+        saturated = RenderDispatcher(max_workers=1, queue_depth=0, retry_after=2)
+        monkeypatch.setattr(certificates_api, "render_dispatcher", saturated)
+        release = threading.Event()
+        blocker = asyncio.ensure_future(saturated.run(release.wait))
+        try:
+            async with httpx.AsyncClient(
+                transport=ASGITransport(app=app),
+                base_url="http://test"
+            ) as client:
+                data = {
+                    "participant_name": "Dorothy Vaughan",
+                    "event_name": f"Busy Event {uuid.uuid4().hex[:8]}",
+                    "date_issued": "2025-10-08",
+                    "certificate_type": "completion"
+                }
+                response = await client.post("/certificates/", json=data)
+
+                assert response.status_code == 503
+                assert response.headers["retry-after"] == "2"
+        finally:
+            release.set()
+            await blocker
+            saturated.shutdown()
+
+
+class TestCertificateDeduplication:
+    """
+    Automated tests for idempotent POST /certificates/
+    """
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_return_existing_certificate(self):
+        """
+        Test that repeating a request returns the stored certificate
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            data = {
+                "participant_name": "Ada Lovelace",
+                "event_name": f"Dedup Event {uuid.uuid4().hex[:8]}",
+                "date_issued": "2025-10-08",
+                "certificate_type": "participation"
+            }
+
+            first = await client.post("/certificates/", json=data)
+            second = await client.post("/certificates/", json=data)
+
+            assert first.status_code == 200
+            assert second.status_code == 200
+            assert second.json()["unique_id"] == first.json()["unique_id"]
+            assert second.json()["filename"] == first.json()["filename"]
+
+            # different inputs still render a new certificate
+            data["certificate_type"] = "completion"
+            third = await client.post("/certificates/", json=data)
+            assert third.json()["unique_id"] != first.json()["unique_id"]
+
+
+class TestListCertificateEndpoints:
+    """
+    Automated tests for GET /certificates/
+    """
+
+    @pytest.mark.asyncio
+    async def test_list_certificates_by_event_with_cursor(self):
+        """
+        Test filtering the listing by event and following next_cursor
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            event_name = f"Listing Event {uuid.uuid4().hex[:8]}"
+            created = []
+            for name in ("Ada Lovelace", "Alan Turing", "Grace Hopper"):
+                response = await client.post("/certificates/", json={
+                    "participant_name": name,
+                    "event_name": event_name,
+                    "date_issued": "2025-10-08",
+                    "certificate_type": "participation"
+                })
+                assert response.status_code == 200
+                created.append(response.json()["unique_id"])
+
+            first = await client.get("/certificates/", params={"event_name": event_name, "limit": 2})
+            assert first.status_code == 200
+            first_page = first.json()
+            assert first_page["count"] == 2
+            assert first_page["next_cursor"] is not None
+
+            second = await client.get("/certificates/", params={
+                "event_name": event_name, "limit": 2, "cursor": first_page["next_cursor"]
+            })
+            second_page = second.json()
+            assert second_page["next_cursor"] is None
+
+            listed = [c["unique_id"] for c in first_page["certificates"] + second_page["certificates"]]
+            assert sorted(listed) == sorted(created)
+            assert all(c["download_url"] == f"/certificates/{c['unique_id']}" for c in first_page["certificates"])
+
+            prefixed = await client.get("/certificates/", params={"event_name": event_name, "participant": "A"})
+            assert {c["participant_name"] for c in prefixed.json()["certificates"]} == {"Ada Lovelace", "Alan Turing"}
+
+    @pytest.mark.asyncio
+    async def test_list_certificates_rejects_bad_cursor(self):
+        """
+        Test that a malformed cursor is a client error
+        """
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            response = await client.get("/certificates/", params={"cursor": "not-a-cursor"})
+            assert response.status_code == 400
+
+
+class TestMetricsEndpoint:
+    """
+    Automated tests for GET /metrics
+    """
+
+    @pytest.mark.asyncio
+    async def test_metrics_report_render_stages(self, monkeypatch):
+        """
+        Test that a render shows up in the exported counters and stage histograms
+        """
+        # Recompile the layout so its template and font loads are timed too
+        monkeypatch.setattr(layout_registry, "_compiled", {})
+        async with httpx.AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            response = await client.post("/certificates/", json={
+                "participant_name": "Mae Metrics",
+                "event_name": "Metrics Event",
+                "date_issued": "2025-10-08",
+                "certificate_type": "participation"
+            })
+            assert response.status_code == 200
+
+            metrics = await client.get("/metrics")
+            assert metrics.status_code == 200
+            assert metrics.headers["content-type"].startswith("text/plain")
+            text = metrics.text
+            assert 'certificates_rendered_total{kind="single",format="png"}' in text
+            for stage in ("template_load", "font_load", "copy", "layout", "draw", "encode", "write"):
+                assert f'certificate_stage_seconds_count{{stage="{stage}"}}' in text
+            assert "certificate_renders_in_flight 0" in text
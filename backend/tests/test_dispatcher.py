@@ -0,0 +1,45 @@
+"""
+Tests for the bounded render dispatcher
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.dispatcher import DispatcherSaturated, RenderDispatcher
+
+
+class TestRenderDispatcher:
+    """Test cases for running renders off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_runs_work_on_pool_threads(self):
+        dispatcher = RenderDispatcher(max_workers=2, queue_depth=0)
+        try:
+            name = await dispatcher.run(lambda: threading.current_thread().name)
+            assert name.startswith("render")
+            assert dispatcher.in_flight == 0
+        finally:
+            dispatcher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_work_beyond_queue_depth(self):
+        dispatcher = RenderDispatcher(max_workers=1, queue_depth=1, retry_after=3)
+        release = threading.Event()
+        try:
+            running = asyncio.ensure_future(dispatcher.run(release.wait))
+            queued = asyncio.ensure_future(dispatcher.run(release.wait))
+            await asyncio.sleep(0)
+
+            with pytest.raises(DispatcherSaturated) as excinfo:
+                await dispatcher.run(lambda: None)
+            assert excinfo.value.retry_after == 3
+
+            release.set()
+            await asyncio.gather(running, queued)
+            # Capacity is returned once the work finishes
+            assert await dispatcher.run(lambda: "done") == "done"
+        finally:
+            release.set()
+            dispatcher.shutdown()
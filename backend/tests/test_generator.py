@@ -0,0 +1,309 @@
+"""
+Tests for the certificate rendering service
+"""
+
+import io
+import json
+import os
+import random
+import string
+
+import pytest
+
+from PIL import Image, ImageChops, ImageDraw
+
+from app.models.certificates import OUTPUT_EXTENSIONS
+from app.services.bulk_generator import get_batch_renderer
+from app.services import cache
+from app.services.encoders import OUTPUT_FORMATS, decode_pdf_image, encode, media_type_for
+from app.services import renditions
+from app.services.generator import (
+    CertificateBatchRenderer,
+    generate_certificate,
+    render_certificate,
+    TEMPLATE_DIR
+)
+from app.services.layouts import LAYOUTS_PATH, LayoutRegistry, layout_registry
+from app.services.storage import MemoryStorage
+from app.services.text_layout import char_width, draw_spaced_text
+
+
+class TestTemplateCache:
+    """Test cases for the process-wide template and font cache"""
+
+    def test_get_template_returns_independent_copies(self):
+        """Each render gets its own copy of the pristine template"""
+        path = os.path.join(TEMPLATE_DIR, "certificate_template_completion.png")
+
+        first = cache.get_template(path)
+        second = cache.get_template(path)
+
+        assert first is not second
+        first.putpixel((0, 0), (1, 2, 3, 255))
+        assert second.getpixel((0, 0)) != (1, 2, 3, 255)
+        assert cache.get_template_base(path).getpixel((0, 0)) != (1, 2, 3, 255)
+
+    def test_get_template_reloads_on_mtime_change(self, tmp_path):
+        """A modified template file is decoded again"""
+        path = str(tmp_path / "template.png")
+        Image.new("RGB", (10, 10), "red").save(path)
+        assert cache.get_template(path).getpixel((0, 0)) == (255, 0, 0)
+
+        Image.new("RGB", (10, 10), "blue").save(path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert cache.get_template(path).getpixel((0, 0)) == (0, 0, 255)
+
+    def test_get_font_is_cached_per_path_and_size(self):
+        """Fonts are loaded once per (path, size)"""
+        path = os.path.join(TEMPLATE_DIR, "GoogleSans-Bold.ttf")
+
+        assert cache.get_font(path, 29) is cache.get_font(path, 29)
+        assert cache.get_font(path, 29) is not cache.get_font(path, 16)
+
+
+class TestGenerateCertificate:
+    """Test cases for generate_certificate"""
+
+    def test_generate_certificate_writes_png(self, tmp_path):
+        """Both certificate types render to a PNG file"""
+        for cert_type in ("completion", "participation"):
+            output_path = str(tmp_path / f"{cert_type}.png")
+            result = generate_certificate("Jane Doe", "Hacktoberfest 2025", "2025-10-03", cert_type, output_path)
+
+            assert result == output_path
+            with Image.open(output_path) as image:
+                assert image.format == "PNG"
+
+
+class TestTextLayout:
+    """Test cases for the cached glyph layout engine"""
+
+    def _draw_per_character(self, image, text, y, font, letter_spacing=-0.04, margin=45):
+        # Reference implementation: one draw.text call per character
+        draw = ImageDraw.Draw(image)
+        x = margin
+        for char in text:
+            draw.text((x, y), char, font=font, fill="#000000")
+            bbox = draw.textbbox((0, 0), char, font=font)
+            char_width = bbox[2] - bbox[0]
+            x += char_width + (char_width * letter_spacing / len(text))
+
+    def test_draw_spaced_text_matches_per_character_drawing(self):
+        """One-pass rendering is pixel-identical to drawing each character"""
+        template = cache.get_template(os.path.join(TEMPLATE_DIR, "certificate_template_completion.png"))
+        for size, text in ((29, "Jane Doe-O'Connor"), (16, "GDG Babcock Hacktoberfest 2025")):
+            font = cache.get_font(os.path.join(TEMPLATE_DIR, "GoogleSans-Bold.ttf"), size)
+            expected = template.copy()
+            actual = template.copy()
+
+            self._draw_per_character(expected, text, 280, font)
+            draw_spaced_text(actual, (45, 280), text, font, "#000000", -0.04)
+
+            assert ImageChops.difference(expected, actual).getbbox() is None
+
+    def test_random_names_match_per_character_drawing(self):
+        """Glyphs land on the same pixels for arbitrary names and offsets"""
+        rng = random.Random(7)
+        font = cache.get_font(os.path.join(TEMPLATE_DIR, "GoogleSans-Bold.ttf"), 29)
+        alphabet = string.ascii_letters + string.digits + " '-."
+        for _ in range(200):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 30)))
+            x = 45 + rng.random()
+            expected = Image.new("RGB", (1000, 60), "white")
+            actual = expected.copy()
+
+            self._draw_per_character(expected, text, 10, font, margin=x)
+            draw_spaced_text(actual, (x, 10), text, font, "#000000", -0.04)
+
+            # Overlapping antialiased edges may blend one level apart
+            assert max(high for _, high in ImageChops.difference(expected, actual).getextrema()) <= 1, text
+
+    def test_char_width_matches_textbbox(self):
+        font = cache.get_font(os.path.join(TEMPLATE_DIR, "GoogleSans-Bold.ttf"), 29)
+        draw = ImageDraw.Draw(Image.new("RGBA", (10, 10)))
+        for char in "Aj W.":
+            bbox = draw.textbbox((0, 0), char, font=font)
+            assert char_width(font, char) == bbox[2] - bbox[0]
+
+
+class TestCertificateBatchRenderer:
+    """Test cases for rendering on a pre-baked event/date base"""
+
+    def test_batch_render_matches_single_render(self):
+        for cert_type in ("completion", "participation"):
+            renderer = CertificateBatchRenderer("Hacktoberfest 2025", "2025-10-03", cert_type)
+            for name in ("Jane Doe", "Mike Johnson"):
+                expected = render_certificate(name, "Hacktoberfest 2025", "2025-10-03", cert_type)
+                assert ImageChops.difference(expected, renderer.render(name)).getbbox() is None
+
+
+class TestLayouts:
+    """Test cases for declarative layouts compiled from layouts.json"""
+
+    def _write_spec(self, tmp_path, layouts, default):
+        path = tmp_path / "layouts.json"
+        path.write_text(json.dumps({"default": default, "layouts": layouts}))
+        return str(path)
+
+    def test_bundled_layouts_resolve_field_positions(self):
+        completion = layout_registry.get("completion")
+        height = completion.template.size[1]
+        positions = {f.field: f.xy for f in completion.static_fields + completion.dynamic_fields}
+        assert positions == {
+            "event_name": (45, height // 2 + 57),
+            "date_issued": (120, height // 2 + 78),
+            "participant_name": (45, height // 2 - 15)
+        }
+        assert [f.field for f in completion.dynamic_fields] == ["participant_name"]
+        assert layout_registry.get("participation").static_fields[1].xy[0] == 160
+        # Unknown types use the default layout
+        assert layout_registry.get("unknown").name == "participation"
+
+    def test_new_type_renders_from_spec_alone(self, tmp_path):
+        font = os.path.join(TEMPLATE_DIR, "GoogleSans-Bold.ttf")
+        Image.new("RGB", (400, 300), "white").save(tmp_path / "badge.png")
+        path = self._write_spec(tmp_path, {
+            "badge": {"image": "badge.png", "font": font, "fields": [
+                {"field": "certificate_type", "size": 12, "x": 10, "y": 10},
+                {"field": "participant_name", "size": 24, "x": 20, "y": -40, "anchor": "bottom", "letter_spacing": -0.04}
+            ]}
+        }, "badge")
+        registry = LayoutRegistry(path, str(tmp_path))
+
+        layout = registry.get("badge")
+        assert layout.dynamic_fields[0].xy == (20, 260)
+        certificate = layout.render({"participant_name": "Jane Doe", "certificate_type": "badge"})
+        assert certificate.size == (400, 300)
+        assert certificate.getbbox() is not None
+        assert ImageChops.difference(certificate, Image.new("RGB", (400, 300), "white")).getbbox() is not None
+
+    def test_layout_is_recompiled_when_spec_changes(self, tmp_path):
+        Image.new("RGB", (100, 100), "white").save(tmp_path / "plain.png")
+        font = os.path.join(TEMPLATE_DIR, "GoogleSans-Bold.ttf")
+        spec = {"image": "plain.png", "font": font, "fields": [{"field": "participant_name", "size": 12, "x": 5}]}
+        path = self._write_spec(tmp_path, {"plain": spec}, "plain")
+        registry = LayoutRegistry(path, str(tmp_path))
+        first = registry.get("plain")
+        assert registry.get("plain") is first
+
+        spec["fields"][0]["x"] = 9
+        self._write_spec(tmp_path, {"plain": spec}, "plain")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert registry.version("plain") != first.version
+        assert registry.get("plain").dynamic_fields[0].xy == (9, 0)
+
+    def test_layout_version_follows_content_not_mtime(self, tmp_path):
+        """A checkout or redeploy that only touches files keeps fingerprints"""
+        Image.new("RGB", (100, 100), "white").save(tmp_path / "plain.png")
+        font = os.path.join(TEMPLATE_DIR, "GoogleSans-Bold.ttf")
+        spec = {"image": "plain.png", "font": font, "fields": [{"field": "participant_name", "size": 12}]}
+        registry = LayoutRegistry(self._write_spec(tmp_path, {"plain": spec}, "plain"), str(tmp_path))
+        version = registry.version("plain")
+
+        image = tmp_path / "plain.png"
+        stat = os.stat(image)
+        os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert registry.version("plain") == version
+
+        Image.new("RGB", (100, 100), "black").save(image)
+        assert registry.version("plain") != version
+
+    def test_warm_batch_renderer_follows_layout_edits(self, tmp_path, monkeypatch):
+        with open(LAYOUTS_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        spec = data["layouts"]["participation"]
+        spec["image"] = os.path.join(TEMPLATE_DIR, spec["image"])
+        spec["font"] = os.path.join(TEMPLATE_DIR, spec["font"])
+        path = self._write_spec(tmp_path, data["layouts"], data["default"])
+        monkeypatch.setattr(layout_registry, "path", path)
+        first = get_batch_renderer("Layout Edit Event", "2025-10-03", "participation")
+
+        spec["fields"][0]["x"] += 40
+        self._write_spec(tmp_path, data["layouts"], data["default"])
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        renderer = get_batch_renderer("Layout Edit Event", "2025-10-03", "participation")
+        assert renderer is not first
+        assert renderer.layout.version == layout_registry.version("participation")
+        expected = render_certificate("Jane Doe", "Layout Edit Event", "2025-10-03", "participation")
+        assert renderer.render("Jane Doe").tobytes() == expected.tobytes()
+        assert first.render("Jane Doe").tobytes() != expected.tobytes()
+
+    def test_invalid_spec_is_rejected(self, tmp_path):
+        path = self._write_spec(tmp_path, {
+            "broken": {"image": "plain.png", "font": "x.ttf", "fields": [{"field": "signature", "size": 12}]}
+        }, "broken")
+        with pytest.raises(ValueError):
+            LayoutRegistry(path, str(tmp_path)).get("broken")
+
+
+class TestEncoders:
+    """Test cases for the certificate output formats"""
+
+    def test_every_format_encodes_a_certificate(self):
+        certificate = render_certificate("Jane Doe", "Hacktoberfest 2025", "2025-10-03", "completion")
+        for name, output_format in OUTPUT_FORMATS.items():
+            data = encode(certificate, name)
+            if output_format.extension == "pdf":
+                assert data.startswith(b"%PDF")
+            else:
+                with Image.open(io.BytesIO(data)) as decoded:
+                    assert decoded.format.lower() == output_format.extension
+                    assert decoded.size == certificate.size
+
+    def test_lossless_formats_round_trip(self):
+        certificate = render_certificate("Jane Doe", "Hacktoberfest 2025", "2025-10-03", "completion")
+        for name in ("png", "png-fast", "png-optimized", "webp"):
+            with Image.open(io.BytesIO(encode(certificate, name))) as decoded:
+                assert ImageChops.difference(decoded.convert(certificate.mode), certificate).getbbox() is None, name
+
+    def test_pdf_image_decodes_back_to_the_certificate(self):
+        certificate = render_certificate("Jane Doe", "Hacktoberfest 2025", "2025-10-03", "completion")
+        flattened = Image.new("RGB", certificate.size, "white")
+        flattened.paste(certificate, mask=certificate.getchannel("A"))
+
+        decoded = decode_pdf_image(encode(certificate, "pdf"))
+        assert decoded.tobytes() == flattened.tobytes()
+        with pytest.raises(ValueError):
+            decode_pdf_image(b"%PDF-1.4 no images here")
+
+    def test_formats_match_model_extensions(self):
+        assert OUTPUT_EXTENSIONS == {name: fmt.extension for name, fmt in OUTPUT_FORMATS.items()}
+        assert media_type_for("cert.webp") == "image/webp"
+        assert media_type_for("cert.PDF") == "application/pdf"
+
+
+class TestRenditions:
+    """Test cases for cached certificate previews"""
+
+    def test_widths_snap_up_to_rendition_sizes(self):
+        assert renditions.snap_width(1) == 160
+        assert renditions.snap_width(320) == 320
+        assert renditions.snap_width(321) == 480
+        assert renditions.snap_width(5000) is None
+
+    def test_rendition_is_generated_once_then_cached(self, monkeypatch):
+        monkeypatch.setattr(renditions, "rendition_cache", MemoryStorage(max_bytes=1024 * 1024))
+        certificate = render_certificate("Jane Doe", "Hacktoberfest 2025", "2025-10-03", "completion")
+        loads = []
+
+        def load_image():
+            loads.append(1)
+            return certificate
+
+        name, data = renditions.get_rendition("cert_abc", 320, "v1", load_image)
+        again = renditions.get_rendition("cert_abc", 320, "v1", load_image)
+
+        assert name == "cert_abc_w320.webp"
+        assert again == (name, data)
+        assert len(loads) == 1
+
+        # A new version of the stored file is previewed afresh
+        renditions.get_rendition("cert_abc", 320, "v2", load_image)
+        assert len(loads) == 2
+        with Image.open(io.BytesIO(data)) as preview:
+            assert preview.size == (320, round(certificate.height * 320 / certificate.width))
@@ -0,0 +1,45 @@
+"""
+Tests for render metrics and stage timing spans
+"""
+
+from app.services.metrics import Counter, Histogram, MetricsRegistry, STAGE_SECONDS, collect_stages, span
+
+
+class TestMetrics:
+    """Test cases for metric collection and the Prometheus text format"""
+
+    def test_counter_and_histogram_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("renders_total", "Renders", ["kind"]))
+        histogram = registry.register(Histogram("render_seconds", "Render time", buckets=(0.1, 1.0)))
+
+        counter.inc(kind="single")
+        counter.inc(2, kind="bulk")
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        text = registry.render()
+        assert "# TYPE renders_total counter" in text
+        assert 'renders_total{kind="bulk"} 2' in text
+        assert 'renders_total{kind="single"} 1' in text
+        assert 'render_seconds_bucket{le="0.1"} 1' in text
+        assert 'render_seconds_bucket{le="1.0"} 2' in text
+        assert 'render_seconds_bucket{le="+Inf"} 2' in text
+        assert "render_seconds_count 2" in text
+
+    def test_spans_feed_the_stage_histogram(self):
+        before = STAGE_SECONDS.count(stage="encode")
+        with span("encode"):
+            pass
+        assert STAGE_SECONDS.count(stage="encode") == before + 1
+
+    def test_collected_spans_bypass_the_histogram(self):
+        before = STAGE_SECONDS.count(stage="draw")
+        with collect_stages() as stages:
+            with span("draw"):
+                pass
+            with span("draw"):
+                pass
+        assert set(stages) == {"draw"}
+        assert stages["draw"] >= 0
+        assert STAGE_SECONDS.count(stage="draw") == before
@@ -0,0 +1,101 @@
+"""
+Tests for template rasters shared between processes
+"""
+
+import multiprocessing
+import os
+
+from PIL import Image, ImageChops
+
+from app.services import shared_rasters
+from app.services.shared_rasters import attach, private_copy, publish, shared_raster
+
+
+def _checksum_in_child(raster_dir, key, queue):
+    # Runs in a spawned process: maps the raster published by the parent
+    shared_rasters.SHARED_RASTER_DIR = raster_dir
+    image = attach(key)
+    queue.put(None if image is None else (image.size, private_copy(image).tobytes()))
+
+
+class TestSharedRasters:
+    """Test cases for publishing and mapping decoded rasters"""
+
+    def test_attached_raster_is_read_only_and_matches_source(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(shared_rasters, "SHARED_RASTER_DIR", str(tmp_path))
+        for mode, color in (("RGBA", (10, 20, 30, 40)), ("RGB", (10, 20, 30)), ("L", 99)):
+            source = Image.new(mode, (7, 5), color)
+            publish(f"sample_{mode}@1", source)
+
+            mapped = attach(f"sample_{mode}@1")
+            assert mapped.readonly
+            copy = private_copy(mapped)
+            assert copy.mode == mode
+            assert "source_mode" not in copy.info
+            assert ImageChops.difference(copy, source).getbbox() is None
+
+            # Copies are writable and never touch the shared pixels
+            copy.putpixel((0, 0), 0 if mode == "L" else (0,) * len(mode))
+            assert private_copy(mapped).getpixel((0, 0)) == source.getpixel((0, 0))
+
+    def test_build_runs_once_and_stale_versions_are_removed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(shared_rasters, "SHARED_RASTER_DIR", str(tmp_path))
+        builds = []
+
+        def build():
+            builds.append(1)
+            return Image.new("RGB", (4, 4), "red")
+
+        first = shared_raster("background", "v1", build)
+        second = shared_raster("background", "v1", build)
+        assert len(builds) == 1
+        assert first.readonly and second.readonly
+
+        shared_raster("background", "v2", build)
+        assert [p.name for p in tmp_path.glob("*.raster")] == ["background@v2.raster"]
+
+    def test_unpublished_or_corrupt_raster_is_not_attached(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(shared_rasters, "SHARED_RASTER_DIR", str(tmp_path))
+        assert attach("missing@1") is None
+        (tmp_path / "corrupt@1.raster").write_bytes(b"not a raster")
+        assert attach("corrupt@1") is None
+
+    def test_other_processes_map_the_published_raster(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(shared_rasters, "SHARED_RASTER_DIR", str(tmp_path))
+        source = Image.new("RGBA", (16, 8), (1, 2, 3, 4))
+        publish("shared@1", source)
+
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+
+        child = context.Process(target=_checksum_in_child, args=(str(tmp_path), "shared@1", queue))
+        child.start()
+        result = queue.get(timeout=30)
+        child.join(timeout=30)
+        assert result == ((16, 8), source.tobytes())
+
+    def test_directory_open_to_others_is_not_used(self, tmp_path, monkeypatch):
+        raster_dir = tmp_path / "rasters"
+        raster_dir.mkdir(mode=0o777)
+        raster_dir.chmod(0o777)
+        monkeypatch.setattr(shared_rasters, "SHARED_RASTER_DIR", str(raster_dir))
+        builds = []
+
+        def build():
+            builds.append(1)
+            return Image.new("RGB", (4, 4), "red")
+
+        assert not shared_raster("background", "v1", build).readonly
+        assert not shared_raster("background", "v1", build).readonly
+        assert len(builds) == 2
+        assert list(raster_dir.iterdir()) == []
+
+    def test_new_directory_is_private_and_symlinks_are_not_mapped(self, tmp_path, monkeypatch):
+        raster_dir = tmp_path / "rasters"
+        monkeypatch.setattr(shared_rasters, "SHARED_RASTER_DIR", str(raster_dir))
+        publish("real@1", Image.new("L", (2, 2), 7))
+        assert raster_dir.stat().st_mode & 0o777 == 0o700
+
+        os.symlink(raster_dir / "real@1.raster", raster_dir / "link@1.raster")
+        assert attach("real@1") is not None
+        assert attach("link@1") is None
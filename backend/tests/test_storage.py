@@ -0,0 +1,173 @@
+"""
+Tests for certificate storage backends and the certificate registry
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, init_db
+from app.models.certificates import Certificate
+from app.services.repository import CertificateRepository, decode_cursor, encode_cursor
+from app.services.storage import DiskStorage, MemoryStorage, create_storage
+
+
+class TestMemoryStorage:
+    """Test cases for the in-memory LRU backend"""
+
+    def test_save_and_load(self):
+        storage = MemoryStorage()
+        storage.save("a.png", b"abc")
+
+        assert storage.exists("a.png")
+        assert storage.load("a.png") == b"abc"
+        assert storage.load("missing.png") is None
+        assert storage.path("a.png") is None
+
+    def test_evicts_least_recently_used(self):
+        storage = MemoryStorage(max_bytes=10)
+        storage.save("a.png", b"1234")
+        storage.save("b.png", b"1234")
+        storage.load("a.png")  # a is now most recently used
+        storage.save("c.png", b"1234")
+
+        assert storage.exists("a.png")
+        assert not storage.exists("b.png")
+        assert storage.exists("c.png")
+        assert storage.size == 8
+
+
+class TestDiskStorage:
+    """Test cases for the filesystem backend"""
+
+    def test_save_and_load(self, tmp_path):
+        storage = DiskStorage(str(tmp_path / "certs"))
+        storage.save("a.png", b"abc")
+
+        assert storage.exists("a.png")
+        assert storage.load("a.png") == b"abc"
+        assert storage.path("a.png") == str(tmp_path / "certs" / "a.png")
+        assert storage.load("missing.png") is None
+
+    def test_create_storage_by_name(self):
+        assert isinstance(create_storage("memory"), MemoryStorage)
+        assert isinstance(create_storage("disk"), DiskStorage)
+
+
+class TestCertificateRepository:
+    """Test cases for the persistent certificate registry"""
+
+    def _repository(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'registry.db'}")
+        Base.metadata.create_all(bind=engine)
+        return CertificateRepository(sessionmaker(bind=engine, expire_on_commit=False))
+
+    def test_add_and_get(self, tmp_path):
+        repository = self._repository(tmp_path)
+        cert = Certificate("Jane Doe", "Hacktoberfest 2025", "2025-10-03", "completion")
+
+        repository.add(cert, "certificates/jane.png")
+        record = repository.get(cert.unique_id)
+
+        assert record.participant_name == "Jane Doe"
+        assert record.certificate_type == "completion"
+        assert record.file_path == "certificates/jane.png"
+        assert repository.get("cert_missing") is None
+
+    def test_add_many_inserts_in_batches(self, tmp_path):
+        repository = self._repository(tmp_path)
+        rows = [
+            {
+                "unique_id": f"cert_{i:012d}",
+                "participant_name": f"Person {i}",
+                "event_name": "Hacktoberfest 2025",
+                "date_issued": "2025-10-03",
+                "certificate_type": "participation",
+                "filename": f"person_{i}.png",
+                "file_path": None
+            }
+            for i in range(1200)
+        ]
+
+        assert repository.add_many(rows) == 1200
+        assert repository.get("cert_000000001199").participant_name == "Person 1199"
+
+    def test_list_page_walks_filtered_pages(self, tmp_path):
+        repository = self._repository(tmp_path)
+        created = datetime(2025, 10, 3, 12, 0, 0)
+        repository.add_many(
+            {
+                "unique_id": f"cert_{i:012d}",
+                "participant_name": ("Ada " if i % 2 else "Grace ") + str(i),
+                "event_name": "Hacktoberfest 2025" if i < 20 else "DevFest 2025",
+                "date_issued": f"2025-10-{1 + i % 9:02d}",
+                "certificate_type": "participation",
+                "filename": f"person_{i}.png",
+                "file_path": None,
+                # Pairs share a timestamp so unique_id has to break ties
+                "created_at": created + timedelta(seconds=i // 2)
+            }
+            for i in range(30)
+        )
+
+        seen, after = [], None
+        while True:
+            rows, after = repository.list_page(event_name="Hacktoberfest 2025", participant_prefix="Ada", after=after, limit=3)
+            seen.extend(row.unique_id for row in rows)
+            if after is None:
+                break
+            # Cursors survive the round trip through their encoded form
+            after = decode_cursor(encode_cursor(after))
+
+        assert seen == [f"cert_{i:012d}" for i in range(19, 0, -2)]
+
+        rows, after = repository.list_page(date_from="2025-10-02", date_to="2025-10-03", limit=100)
+        assert after is None
+        assert {row.date_issued for row in rows} == {"2025-10-02", "2025-10-03"}
+
+        # Prefixes are matched literally, not as LIKE patterns
+        assert repository.list_page(participant_prefix="%")[0] == []
+
+    def test_list_page_filters_seek_an_index(self, tmp_path):
+        repository = self._repository(tmp_path)
+        engine = repository.session_factory.kw["bind"]
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, params, *args: statements.append((sql, params)))
+
+        plans = {}
+        for name, filters in {
+            "participant": {"participant_prefix": "Ada"},
+            "date": {"date_from": "2025-10-02", "date_to": "2025-10-03"}
+        }.items():
+            statements.clear()
+            repository.list_page(**filters, limit=10)
+            sql, params = statements[-1]
+            with engine.connect() as connection:
+                plans[name] = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params))
+
+        assert "ix_certificates_participant_created_id" in plans["participant"]
+        assert "ix_certificates_date_created_id" in plans["date"]
+        assert all(" SCAN " not in f" {plan} " for plan in plans.values())
+
+    def test_init_db_adds_columns_missing_from_older_databases(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as connection:
+            # The registry as first created, before content_hash existed
+            connection.execute(text(
+                "CREATE TABLE certificates (unique_id VARCHAR(50) PRIMARY KEY, participant_name VARCHAR(100) NOT NULL, "
+                "event_name VARCHAR(200) NOT NULL, date_issued VARCHAR(10) NOT NULL, certificate_type VARCHAR(20) NOT NULL, "
+                "filename VARCHAR(255) NOT NULL, file_path VARCHAR(500), created_at DATETIME, updated_at DATETIME)"
+            ))
+            connection.execute(text(
+                "INSERT INTO certificates (unique_id, participant_name, event_name, date_issued, certificate_type, filename) "
+                "VALUES ('cert_000000000001', 'Jane Doe', 'Hacktoberfest 2025', '2025-10-03', 'participation', 'jane.png')"
+            ))
+
+        init_db(engine)
+
+        inspector = inspect(engine)
+        assert "content_hash" in {column["name"] for column in inspector.get_columns("certificates")}
+        assert "ix_certificates_content_hash" in {index["name"] for index in inspector.get_indexes("certificates")}
+        repository = CertificateRepository(sessionmaker(bind=engine, expire_on_commit=False))
+        assert repository.get("cert_000000000001").content_hash is None
@@ -0,0 +1,107 @@
+"""
+Tests for the generated certificate template styles
+"""
+
+import os
+
+from PIL import Image, ImageChops, ImageDraw
+
+from app.services import shared_rasters
+from app.services.fonts import BUNDLED_FONT, FontRegistry
+from app.services.template_generator import (
+    _get_style_background,
+    _vertical_gradient,
+    get_modern_certificate_template,
+    get_style_background
+)
+
+
+class TestModernTemplate:
+    """Test cases for the modern gradient style"""
+
+    def test_gradient_matches_row_by_row_drawing(self):
+        width, height = 1400, 1000
+        expected = Image.new("RGB", (width, height))
+        draw = ImageDraw.Draw(expected)
+        for y in range(height):
+            color_ratio = y / height
+            r = int(248 + (67 - 248) * color_ratio)
+            g = int(249 + (56 - 249) * color_ratio)
+            b = int(250 + (101 - 250) * color_ratio)
+            draw.line([(0, y), (width, y)], fill=(r, g, b))
+
+        gradient = _vertical_gradient(width, height, (248, 249, 250), (67, 56, 101))
+
+        assert ImageChops.difference(expected, gradient).getbbox() is None
+        assert _vertical_gradient(width, height, (248, 249, 250), (67, 56, 101)) is gradient
+
+
+class TestTemplateStyles:
+    """Test cases shared by every style"""
+
+    def test_each_style_writes_png(self, tmp_path):
+        for style in ("modern", "elegant", "tech"):
+            output_path = str(tmp_path / f"{style}.png")
+            assert get_modern_certificate_template("Jane Doe", "Hacktoberfest 2025", "2025-10-03", output_path, style) == output_path
+            with Image.open(output_path) as image:
+                assert image.size == (1400, 1000)
+
+
+class TestStyleBackgrounds:
+    """Test cases for cached static style layers"""
+
+    def test_background_is_cached_per_style_and_size(self):
+        for style in ("modern", "elegant", "tech"):
+            assert get_style_background(style, 1400, 1000) is get_style_background(style, 1400, 1000)
+        assert get_style_background("unknown", 1400, 1000) is get_style_background("modern", 1400, 1000)
+
+    def test_background_is_persisted_when_configured(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TEMPLATE_BACKGROUND_DIR", str(tmp_path))
+        # A background already shared by an earlier run would skip the build
+        monkeypatch.setattr(shared_rasters, "SHARED_RASTER_DIR", str(tmp_path / "rasters"))
+        _get_style_background.cache_clear()
+        try:
+            built = get_style_background("tech", 700, 500)
+            assert len(list(tmp_path.glob("tech_700x500_*.png"))) == 1
+
+            _get_style_background.cache_clear()
+            loaded = get_style_background("tech", 700, 500)
+            assert ImageChops.difference(built, loaded).getbbox() is None
+        finally:
+            _get_style_background.cache_clear()
+
+
+class TestFontRegistry:
+    """Test cases for one-time font resolution"""
+
+    def test_falls_back_to_bundled_font(self):
+        registry = FontRegistry({"bold": ["missing-font.ttf", BUNDLED_FONT]})
+        assert registry.resolve("bold") == BUNDLED_FONT
+        assert registry.get("bold", 40) is registry.get("bold", 40)
+        assert registry.get("bold", 40).size == 40
+
+    def test_version_follows_resolved_font_files(self, tmp_path):
+        font = tmp_path / "Custom-Bold.ttf"
+        with open(BUNDLED_FONT, "rb") as f:
+            font.write_bytes(f.read())
+        registry = FontRegistry({"bold": [str(font)], "regular": ["missing-font.ttf"]})
+        version = registry.version()
+        assert "regular=default" in version
+
+        with open(font, "ab") as f:
+            f.write(b"\0")
+        stat = os.stat(font)
+        os.utime(font, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert registry.version() != version
+        assert FontRegistry({"bold": [BUNDLED_FONT]}).version() != version
+
+    def test_unresolvable_family_uses_default_font(self):
+        registry = FontRegistry({"regular": ["missing-font.ttf"]})
+        assert registry.resolve("regular") is None
+        assert registry.active_fonts() == {"regular": "default"}
+        assert registry.get("regular", 20) is registry.get("regular", 20)
+
+    def test_environment_override_is_tried_first(self, monkeypatch):
+        monkeypatch.setenv("CERTIFICATE_FONT_REGULAR", BUNDLED_FONT)
+        registry = FontRegistry({"regular": ["missing-font.ttf"]})
+        assert registry.active_fonts() == {"regular": BUNDLED_FONT}